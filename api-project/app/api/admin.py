@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, Query, Response
+from starlette.concurrency import run_in_threadpool
+
+from app.api.dependencies import get_profiler, require_admin
+from app.observability.profiler import SamplingProfiler
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/profile", response_class=Response, summary="Sample live traffic")
+async def profile(
+    seconds: float = Query(default=10.0, gt=0, le=60, description="Sampling duration."),
+    idle: bool = Query(default=False, description="Include threads waiting for work."),
+    profiler: SamplingProfiler = Depends(get_profiler),
+) -> Response:
+    stacks = await run_in_threadpool(profiler.profile, seconds, idle)
+    return Response(stacks, media_type="text/plain; charset=utf-8")
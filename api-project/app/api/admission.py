@@ -0,0 +1,202 @@
+"""
+Admission control in front of the routers.
+
+Requests are classified as reads, writes or bulk (collection scans, stats and
+batch reads). Each class has a concurrency cap and a bounded FIFO wait queue:
+
+- below the cap a request is admitted immediately
+- at the cap it waits in the queue for up to `queue_timeout_seconds`; if no slot
+  frees up in time it is shed with 503
+- when the queue is full it is shed immediately with 429
+
+Shed responses carry `Retry-After`. Health, metrics, docs and admin endpoints are
+never throttled, so probes and diagnostics keep working under overload. Long-poll
+watches (`GET /serviceOrder/{id}?waitFor=state|change`) are not admitted here
+either; the watch registry caps them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from time import perf_counter
+
+from starlette.datastructures import QueryParams
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.error_handlers import ApiError
+from app.observability.metrics import ADMISSION_DECISIONS, ADMISSION_QUEUE_WAIT
+from app.settings import Settings
+
+READ, WRITE, BULK = "read", "write", "bulk"
+_DECISIONS = ("admitted", "queued", "rejected_queue_full", "rejected_timeout")
+_EXEMPT_PREFIXES = ("/health", "/metrics", "/admin", "/docs", "/redoc", "/openapi.json")
+# Collection scans and multi-order reads, by method.
+_BULK_ROUTES = {
+    ("GET", "/serviceOrder"),
+    ("GET", "/serviceOrder/changes"),
+    ("GET", "/serviceOrder/stats"),
+    ("POST", "/serviceOrder/batchGet"),
+}
+# Fixed routes under /serviceOrder/ that are not an order id.
+_COLLECTION_ROUTES = {"changes", "stats", "batchGet"}
+_WATCH_TARGETS = {"state", "change"}
+
+
+@dataclass(frozen=True)
+class AdmissionLimits:
+    max_concurrent: int
+    max_queue: int
+
+
+class RouteClassLimiter:
+    """Concurrency cap with a bounded FIFO queue; slots are handed over directly to waiters."""
+
+    def __init__(self, name: str, limits: AdmissionLimits, queue_timeout_seconds: float) -> None:
+        self.name = name
+        self._limits = limits
+        self._queue_timeout_seconds = queue_timeout_seconds
+        self._active = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._decisions = {
+            decision: ADMISSION_DECISIONS.labels(name, decision) for decision in _DECISIONS
+        }
+        self._queue_wait = ADMISSION_QUEUE_WAIT.labels(name)
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> str:
+        """Return the admission decision; only `admitted`/`queued` hold a slot to release."""
+
+        if self._active < self._limits.max_concurrent and not self._waiters:
+            self._active += 1
+            return self._decide("admitted")
+        if len(self._waiters) >= self._limits.max_queue:
+            return self._decide("rejected_queue_full")
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self._queue_timeout_seconds)
+        except TimeoutError:
+            self._waiters.remove(waiter)
+            return self._decide("rejected_timeout")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+        self._queue_wait.observe(perf_counter() - started)
+        return self._decide("queued")
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot passes to the next waiter, so `_active` stays the same.
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def _decide(self, decision: str) -> str:
+        self._decisions[decision].inc()
+        return decision
+
+
+class AdmissionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        limits: dict[str, AdmissionLimits],
+        queue_timeout_seconds: float = 5.0,
+        retry_after_seconds: int = 1,
+    ) -> None:
+        self.app = app
+        self.limiters = {
+            name: RouteClassLimiter(name, class_limits, queue_timeout_seconds)
+            for name, class_limits in limits.items()
+        }
+        self._retry_after = str(retry_after_seconds).encode()
+
+    @classmethod
+    def limits_from_settings(cls, settings: Settings) -> dict[str, AdmissionLimits]:
+        depth = settings.admission_queue_depth
+        return {
+            READ: AdmissionLimits(settings.admission_read_concurrency, depth),
+            WRITE: AdmissionLimits(settings.admission_write_concurrency, depth),
+            BULK: AdmissionLimits(settings.admission_bulk_concurrency, depth),
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        route_class = classify_request(scope) if scope["type"] == "http" else None
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters[route_class]
+        decision = await limiter.acquire()
+        if decision == "rejected_queue_full":
+            await self._reject(send, 429, "TOO_MANY_REQUESTS", f"{route_class} queue is full")
+            return
+        if decision == "rejected_timeout":
+            await self._reject(
+                send, 503, "SERVICE_UNAVAILABLE", f"No {route_class} capacity became available"
+            )
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    async def _reject(self, send: Send, status: int, code: str, reason: str) -> None:
+        body = ApiError(
+            code=code,
+            reason=reason,
+            message="The server is overloaded; retry after the indicated delay.",
+            status=str(status),
+        ).model_dump_json().encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", self._retry_after),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def classify_request(scope: Scope) -> str | None:
+    path: str = scope["path"]
+    if path.startswith(_EXEMPT_PREFIXES):
+        return None
+    if _is_watch(scope):
+        # Parked long-polls hold no thread; they are bounded by the watch registry instead.
+        return None
+    method = "GET" if scope["method"] == "HEAD" else scope["method"]
+    if (method, path.rstrip("/")) in _BULK_ROUTES:
+        return BULK
+    return READ if method == "GET" else WRITE
+
+
+def _is_watch(scope: Scope) -> bool:
+    if scope["method"] != "GET":
+        return False
+    parent, _, service_order_id = scope["path"].rstrip("/").rpartition("/")
+    if parent != "/serviceOrder" or service_order_id in _COLLECTION_ROUTES:
+        return False
+    # Parsed like the route parses it: the last value of the parameter wins.
+    return QueryParams(scope["query_string"]).get("waitFor") in _WATCH_TARGETS
@@ -0,0 +1,278 @@
+"""
+Negotiated response compression (zstd, br, gzip).
+
+JSON and text responses larger than `minimum_size` are compressed with the best
+encoding the client accepts. gzip is always available; `br` and `zstd` are used
+when the `brotli` / `zstandard` packages of the `compression` extra are
+installed. Bodies larger than `offload_size` are compressed in the thread pool
+so the event loop keeps serving other requests. Streamed responses are
+compressed chunk by chunk, with a flush after every chunk so clients can start
+parsing before the stream ends.
+"""
+
+from __future__ import annotations
+
+import importlib
+import zlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from time import thread_time
+from typing import Any, Protocol
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.observability.metrics import COMPRESSION_BYTES, COMPRESSION_CPU
+
+_COMPRESSIBLE_TYPES = ("application/json", "text/")
+_UNCOMPRESSED_STATUSES = {204, 206, 304}
+
+
+def _optional_module(name: str) -> Any | None:
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+brotli = _optional_module("brotli")
+zstandard = _optional_module("zstandard")
+
+
+class StreamCompressor(Protocol):
+    def chunk(self, data: bytes) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+@dataclass(frozen=True)
+class Codec:
+    name: str
+    compress: Callable[[bytes], bytes]
+    stream: Callable[[], StreamCompressor]
+
+
+class _GzipStream:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality: int) -> None:
+        assert brotli is not None
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return bytes(self._compressor.process(data) + self._compressor.flush())
+
+    def finish(self) -> bytes:
+        return bytes(self._compressor.finish())
+
+
+class _ZstdStream:
+    def __init__(self, level: int) -> None:
+        assert zstandard is not None
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def chunk(self, data: bytes) -> bytes:
+        assert zstandard is not None
+        flushed = self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return bytes(self._compressor.compress(data) + flushed)
+
+    def finish(self) -> bytes:
+        return bytes(self._compressor.flush())
+
+
+def available_codecs(
+    gzip_level: int = 6, brotli_quality: int = 4, zstd_level: int = 3
+) -> dict[str, Codec]:
+    """Codecs usable in this environment, in server preference order."""
+
+    codecs: dict[str, Codec] = {}
+    if zstandard is not None:
+        # ZstdCompressor instances must not be shared between threads, so one per body.
+        codecs["zstd"] = Codec(
+            "zstd",
+            lambda body: bytes(zstandard.ZstdCompressor(level=zstd_level).compress(body)),
+            lambda: _ZstdStream(zstd_level),
+        )
+    if brotli is not None:
+        codecs["br"] = Codec(
+            "br",
+            lambda body: bytes(brotli.compress(body, quality=brotli_quality)),
+            lambda: _BrotliStream(brotli_quality),
+        )
+    codecs["gzip"] = Codec(
+        "gzip",
+        lambda body: _gzip_compress(body, gzip_level),
+        lambda: _GzipStream(gzip_level),
+    )
+    return codecs
+
+
+def negotiate_encoding(accept_encoding: str, codecs: dict[str, Codec]) -> Codec | None:
+    """Pick the preferred codec among those the client accepts with q > 0 (RFC 9110)."""
+
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    candidates = [
+        codec for name, codec in codecs.items() if accepted.get(name, wildcard) > 0
+    ]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda codec: accepted.get(codec.name, wildcard))
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        offload_size: int = 256 * 1024,
+        codecs: dict[str, Codec] | None = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.codecs = available_codecs() if codecs is None else codecs
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codec = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.codecs)
+        if codec is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, codec, self.minimum_size, self.offload_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send: Send, codec: Codec, minimum_size: int, offload_size: int) -> None:
+        self._send = send
+        self._codec = codec
+        self._minimum_size = minimum_size
+        self._offload_size = offload_size
+        self._start: Message | None = None
+        self._mode = "pending"
+        self._stream: StreamCompressor | None = None
+        self._bytes_in = COMPRESSION_BYTES.labels(codec.name, "in")
+        self._bytes_out = COMPRESSION_BYTES.labels(codec.name, "out")
+        self._cpu = COMPRESSION_CPU.labels(codec.name)
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self._start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self._mode == "pending":
+            await self._first_body(message)
+        elif self._mode == "stream":
+            await self._stream_body(message)
+        else:
+            await self._send(message)
+
+    async def _first_body(self, message: Message) -> None:
+        assert self._start is not None
+        start = self._start
+        headers = MutableHeaders(scope=start)
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+
+        if not self._compressible(start, headers):
+            self._mode = "identity"
+            await self._send(start)
+            await self._send(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        declared_length = headers.get("content-length")
+        too_small = (
+            len(body) < self._minimum_size
+            if not more_body
+            else declared_length is not None and int(declared_length) < self._minimum_size
+        )
+        if too_small:
+            self._mode = "identity"
+            await self._send(start)
+            await self._send(message)
+            return
+
+        headers["Content-Encoding"] = self._codec.name
+        if not more_body:
+            self._mode = "done"
+            compressed = await self._run(self._codec.compress, body)
+            headers["Content-Length"] = str(len(compressed))
+            await self._send(start)
+            await self._send({"type": "http.response.body", "body": compressed})
+            return
+
+        self._mode = "stream"
+        self._stream = self._codec.stream()
+        del headers["Content-Length"]
+        await self._send(start)
+        await self._stream_body(message)
+
+    async def _stream_body(self, message: Message) -> None:
+        assert self._stream is not None
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+        compressed = await self._run(self._stream.chunk, body) if body else b""
+        if not more_body:
+            compressed += self._stream.finish()
+        await self._send(
+            {"type": "http.response.body", "body": compressed, "more_body": more_body}
+        )
+
+    def _compressible(self, start: Message, headers: MutableHeaders) -> bool:
+        content_type = headers.get("content-type", "")
+        return (
+            start["status"] not in _UNCOMPRESSED_STATUSES
+            and "content-encoding" not in headers
+            and (content_type.startswith(_COMPRESSIBLE_TYPES) or "+json" in content_type)
+        )
+
+    async def _run(self, compress: Callable[[bytes], bytes], body: bytes) -> bytes:
+        if len(body) >= self._offload_size:
+            return await anyio.to_thread.run_sync(self._measured, compress, body)
+        return self._measured(compress, body)
+
+    def _measured(self, compress: Callable[[bytes], bytes], body: bytes) -> bytes:
+        started = thread_time()
+        compressed = compress(body)
+        self._cpu.observe(thread_time() - started)
+        self._bytes_in.inc(len(body))
+        self._bytes_out.inc(len(compressed))
+        return compressed
+
+
+def _gzip_compress(body: bytes, level: int) -> bytes:
+    # zlib with a gzip header (wbits=31) and no timestamp, so equal bodies compress equally.
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
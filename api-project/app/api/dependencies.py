@@ -0,0 +1,60 @@
+"""FastAPI dependency providers resolving components from the app container."""
+
+import secrets
+
+from fastapi import Header, HTTPException, Request, status
+
+from app.container import AppContainer, get_app_container
+from app.observability.profiler import SamplingProfiler
+from app.repositories.base import Repository, ResponseCache
+from app.services.hub_service import HubService
+from app.services.notification_service import NotificationService
+from app.services.service_order_service import ServiceOrderService
+from app.settings import Settings
+
+
+def get_container(request: Request) -> AppContainer:
+    return get_app_container(request.app)
+
+
+def get_app_settings(request: Request) -> Settings:
+    return get_container(request).settings
+
+
+def get_store(request: Request) -> Repository:
+    return get_container(request).store
+
+
+def get_service_order_service(request: Request) -> ServiceOrderService:
+    return get_container(request).service_order_service
+
+
+def get_hub_service(request: Request) -> HubService:
+    return get_container(request).hub_service
+
+
+def get_notification_service(request: Request) -> NotificationService:
+    return get_container(request).notification_service
+
+
+def get_idempotency_cache(request: Request) -> ResponseCache:
+    return get_container(request).idempotency_cache
+
+
+def get_profiler(request: Request) -> SamplingProfiler:
+    return get_container(request).profiler
+
+
+def require_admin(
+    request: Request,
+    admin_token: str | None = Header(default=None, alias="X-Admin-Token"),
+) -> None:
+    """Admin endpoints are hidden (404) unless APP_ADMIN_TOKEN is configured."""
+
+    expected = get_app_settings(request).admin_token
+    if expected is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if admin_token is None or not secrets.compare_digest(admin_token, expected):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="A valid X-Admin-Token is required."
+        )
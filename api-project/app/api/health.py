@@ -1,9 +1,10 @@
 from datetime import UTC, datetime
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 
-from app.settings import get_settings
+from app.api.dependencies import get_app_settings
+from app.settings import Settings
 
 router = APIRouter(tags=["Health"])
 
@@ -16,8 +17,7 @@ class HealthResponse(BaseModel):
 
 
 @router.get("/health", response_model=HealthResponse, summary="Health check")
-def get_health() -> HealthResponse:
-    settings = get_settings()
+def get_health(settings: Settings = Depends(get_app_settings)) -> HealthResponse:
     return HealthResponse(
         status="ok",
         service=settings.app_name,
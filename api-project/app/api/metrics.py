@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends, Response
+
+from app.api.dependencies import get_container
+from app.container import AppContainer
+from app.observability.metrics import REGISTRY
+
+router = APIRouter(tags=["Health"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=Response, summary="Prometheus metrics")
+def get_metrics(container: AppContainer = Depends(get_container)) -> Response:
+    return Response(
+        REGISTRY.render() + container.metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE
+    )
@@ -0,0 +1,16 @@
+from typing import Any, cast
+
+from fastapi.responses import JSONResponse
+
+
+class RawJSONResponse(JSONResponse):
+    """
+    JSON response whose body is already serialized.
+
+    Service-order routes render models straight to bytes, so the body is sent as-is
+    instead of going through jsonable_encoder and the stdlib json encoder again.
+    Subclassing JSONResponse keeps the routes' `response_model` schemas in OpenAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return cast(bytes, content)
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, Response, status
 
+from app.api.dependencies import get_hub_service
 from app.models.hub import Hub, HubCreate
-from app.services.hub_service import HubService, get_hub_service
+from app.services.hub_service import HubService
 
 router = APIRouter(tags=["Hub"])
 
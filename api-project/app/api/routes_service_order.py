@@ -1,58 +1,213 @@
+"""
+Service order routes.
+
+Routes return pre-rendered RawJSONResponse bytes, which FastAPI passes through as-is;
+their `response_model` only documents the schema in OpenAPI. With `fields=` the
+returned orders are partial.
+"""
+
 from typing import Any
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from starlette.concurrency import run_in_threadpool
 
-from app.models.service_order import ServiceOrderCreate
-from app.services.query_service import parse_fields
-from app.services.service_order_service import ServiceOrderService, get_service_order_service
+from app.api.dependencies import get_service_order_service
+from app.api.responses import RawJSONResponse
+from app.models.service_order import (
+    ServiceOrder,
+    ServiceOrderBatchGet,
+    ServiceOrderBatchGetResponse,
+    ServiceOrderCreate,
+    ServiceOrderItem,
+)
+from app.services.query_service import StatsBucket, parse_fields, parse_sort
+from app.services.service_order_service import ServiceOrderService, WatchTarget
 
 router = APIRouter(tags=["Service Order"])
 
 _SUPPORTED_PATCH_MEDIA_TYPES = {"application/merge-patch+json"}
+# List query parameters that are not order filters.
+_LIST_PARAMETERS = {"fields", "q", "sort", "limit", "includeArchived"}
 
 
-@router.get("/serviceOrder", summary="List service orders")
+@router.get(
+    "/serviceOrder",
+    response_class=RawJSONResponse,
+    response_model=list[ServiceOrder],
+    summary="List service orders",
+)
 def list_service_orders(
     request: Request,
     fields: str | None = Query(
         default=None,
         description="Comma separated list of first-level fields to include in response.",
     ),
+    q: str | None = Query(
+        default=None,
+        description=(
+            "Full-text search: orders whose description, notes, service names or string "
+            "service characteristic values contain every word."
+        ),
+    ),
+    sort: str | None = Query(
+        default=None,
+        description="Comma separated sort fields, e.g. '-orderDate,priority' ('-': descending).",
+    ),
+    limit: int | None = Query(default=None, ge=1, description="Maximum orders to return."),
+    include_archived: bool = Query(
+        default=False,
+        alias="includeArchived",
+        description="Also list archived (old terminal-state) orders; scans the archive.",
+    ),
+    service: ServiceOrderService = Depends(get_service_order_service),
+) -> RawJSONResponse:
+    selected_fields = parse_fields(fields)
+    sort_keys = parse_sort(sort)
+    filters = {
+        key: value for key, value in request.query_params.items() if key not in _LIST_PARAMETERS
+    }
+    return RawJSONResponse(
+        service.list_service_orders(
+            filters=filters,
+            fields=selected_fields,
+            q=q,
+            sort=sort_keys,
+            limit=limit,
+            include_archived=include_archived,
+        )
+    )
+
+
+@router.get(
+    "/serviceOrder/changes",
+    response_class=RawJSONResponse,
+    response_model=dict[str, Any],
+    summary="List service order changes since a sequence",
+)
+def list_service_order_changes(
+    since: int = Query(default=0, ge=0, description="Return changes after this sequence."),
+    limit: int = Query(default=100, ge=1, le=1000, description="Maximum changes to return."),
+    fields: str | None = Query(
+        default=None,
+        description="Comma separated list of first-level fields to include in each order.",
+    ),
+    service: ServiceOrderService = Depends(get_service_order_service),
+) -> RawJSONResponse:
+    selected_fields = parse_fields(fields)
+    return RawJSONResponse(service.list_changes(since=since, limit=limit, fields=selected_fields))
+
+
+@router.get(
+    "/serviceOrder/stats",
+    response_class=RawJSONResponse,
+    response_model=dict[str, Any],
+    summary="Count service orders by state, category and priority",
+)
+def get_service_order_stats(
+    request: Request,
+    bucket: StatsBucket | None = Query(
+        default=None, description="Also break the counts down per `orderDate` bucket (UTC)."
+    ),
+    service: ServiceOrderService = Depends(get_service_order_service),
+) -> RawJSONResponse:
+    filters = {key: value for key, value in request.query_params.items() if key != "bucket"}
+    return RawJSONResponse(service.service_order_stats(filters=filters, bucket=bucket))
+
+
+@router.post(
+    "/serviceOrder/batchGet",
+    response_class=RawJSONResponse,
+    response_model=ServiceOrderBatchGetResponse,
+    summary="Retrieve many service orders by id",
+)
+def batch_get_service_orders(
+    payload: ServiceOrderBatchGet,
+    fields: str | None = Query(
+        default=None,
+        description="Comma separated list of first-level fields to include in each order.",
+    ),
     service: ServiceOrderService = Depends(get_service_order_service),
-) -> list[dict[str, Any]]:
+) -> RawJSONResponse:
     selected_fields = parse_fields(fields)
-    filters = {key: value for key, value in request.query_params.items() if key != "fields"}
-    return service.list_service_orders(filters=filters, fields=selected_fields)
+    return RawJSONResponse(service.get_service_orders(payload.id, fields=selected_fields))
 
 
-@router.get("/serviceOrder/{id}", summary="Retrieve service order")
-def get_service_order(
+@router.get(
+    "/serviceOrder/{id}",
+    response_class=RawJSONResponse,
+    response_model=ServiceOrder,
+    summary="Retrieve service order",
+)
+async def get_service_order(
     id: str,
     fields: str | None = Query(
         default=None,
         description="Comma separated list of first-level fields to include in response.",
     ),
+    wait_for: WatchTarget | None = Query(
+        default=None,
+        alias="waitFor",
+        description="Long-poll until the order's `state` (or any `change`) differs.",
+    ),
+    timeout: float = Query(
+        default=30.0, gt=0, le=120, description="Maximum seconds to wait with `waitFor`."
+    ),
     service: ServiceOrderService = Depends(get_service_order_service),
-) -> dict[str, Any]:
+) -> RawJSONResponse:
     selected_fields = parse_fields(fields)
-    return service.get_service_order(service_order_id=id, fields=selected_fields)
+    if wait_for is None:
+        body = await run_in_threadpool(service.get_service_order, id, selected_fields)
+    else:
+        body = await service.watch_service_order(
+            service_order_id=id,
+            wait_for=wait_for,
+            timeout_seconds=timeout,
+            fields=selected_fields,
+        )
+    return RawJSONResponse(body)
 
 
-@router.post("/serviceOrder", status_code=status.HTTP_201_CREATED, summary="Create service order")
+@router.post(
+    "/serviceOrder",
+    response_class=RawJSONResponse,
+    response_model=ServiceOrder,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create service order",
+)
 def create_service_order(
     payload: ServiceOrderCreate,
     fields: str | None = Query(
         default=None,
         description="Comma separated list of first-level fields to include in response.",
     ),
+    idempotency_key: str | None = Header(
+        default=None,
+        alias="Idempotency-Key",
+        min_length=1,
+        max_length=255,
+        description="Client key that makes retries return the original create response.",
+    ),
     service: ServiceOrderService = Depends(get_service_order_service),
-) -> dict[str, Any]:
+) -> RawJSONResponse:
     selected_fields = parse_fields(fields)
-    return service.create_service_order(payload=payload, fields=selected_fields)
+    body = service.create_service_order(
+        payload=payload, fields=selected_fields, idempotency_key=idempotency_key
+    )
+    return RawJSONResponse(body, status_code=status.HTTP_201_CREATED)
 
 
 @router.patch("/serviceOrder/{id}", summary="Patch service order")
-async def patch_service_order(
+def patch_service_order(
     id: str,
     request: Request,
     payload: dict[str, Any] = Body(..., description="RFC7386 merge patch payload."),
@@ -62,6 +217,37 @@ async def patch_service_order(
     return service.patch_service_order(service_order_id=id, payload=payload)
 
 
+@router.get(
+    "/serviceOrder/{id}/orderItem/{item_id}",
+    response_class=RawJSONResponse,
+    response_model=ServiceOrderItem,
+    summary="Retrieve service order item",
+)
+def get_order_item(
+    id: str,
+    item_id: str,
+    service: ServiceOrderService = Depends(get_service_order_service),
+) -> RawJSONResponse:
+    return RawJSONResponse(service.get_order_item(id, item_id))
+
+
+@router.patch(
+    "/serviceOrder/{id}/orderItem/{item_id}",
+    response_class=RawJSONResponse,
+    response_model=ServiceOrderItem,
+    summary="Patch service order item",
+)
+def patch_order_item(
+    id: str,
+    item_id: str,
+    request: Request,
+    payload: dict[str, Any] = Body(..., description="RFC7386 merge patch of the order item."),
+    service: ServiceOrderService = Depends(get_service_order_service),
+) -> RawJSONResponse:
+    _validate_patch_content_type(request.headers.get("content-type"))
+    return RawJSONResponse(service.patch_order_item(id, item_id, payload))
+
+
 @router.delete(
     "/serviceOrder/{id}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import cast
+
+from fastapi import FastAPI
+
+from app.observability.metrics import MetricsRegistry, app_registry
+from app.observability.profiler import SamplingProfiler
+from app.repositories.base import Repository, ResponseCache
+from app.repositories.factory import build_idempotency_cache, build_store
+from app.services.archive_service import OrderArchiver
+from app.services.hub_service import HubService
+from app.services.notification_service import NotificationService
+from app.services.service_order_service import ServiceOrderService
+from app.services.sla_service import SlaMonitor
+from app.services.watch_service import OrderWatchers
+from app.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AppContainer:
+    """
+    Per-application components, built in the app lifespan.
+
+    Every FastAPI app created by `create_app` owns one container, so several
+    isolated app instances can run side by side in one process.
+    """
+
+    settings: Settings
+    store: Repository
+    notification_service: NotificationService
+    idempotency_cache: ResponseCache
+    service_order_service: ServiceOrderService
+    hub_service: HubService
+    watchers: OrderWatchers
+    profiler: SamplingProfiler
+    metrics: MetricsRegistry
+    sla_monitor: SlaMonitor | None = None
+    archiver: OrderArchiver | None = None
+
+    @classmethod
+    def build(cls, settings: Settings) -> AppContainer:
+        store = build_store(settings)
+        notification_service = NotificationService(store=store)
+        idempotency_cache = build_idempotency_cache(settings)
+        watchers = OrderWatchers(max_waiters=settings.watch_max_waiters)
+        store.add_change_listener(watchers.notify)
+        # Other workers' writes to a shared store are not reported to this process.
+        poll_interval = (
+            None if settings.storage_backend == "memory" else settings.watch_poll_interval_seconds
+        )
+        sla_monitor = None
+        if settings.sla_alerts and settings.workers == 1:
+            sla_monitor = SlaMonitor(
+                store=store,
+                notification_service=notification_service,
+                resolution_seconds=settings.sla_resolution_seconds,
+            )
+            store.add_change_listener(sla_monitor.on_change)
+        elif settings.sla_alerts:
+            # Every worker would alert for every order, and none sees the others' writes.
+            logger.warning("SLA jeopardy alerts are disabled with workers > 1")
+        return cls(
+            settings=settings,
+            store=store,
+            notification_service=notification_service,
+            idempotency_cache=idempotency_cache,
+            service_order_service=ServiceOrderService(
+                store=store,
+                notification_service=notification_service,
+                idempotency_cache=idempotency_cache,
+                watchers=watchers,
+                watch_poll_interval_seconds=poll_interval,
+            ),
+            hub_service=HubService(store=store),
+            watchers=watchers,
+            profiler=SamplingProfiler(),
+            metrics=app_registry(store.count_service_orders),
+            sla_monitor=sla_monitor,
+            archiver=(
+                None
+                if settings.archive_path is None
+                else OrderArchiver(
+                    store=store,
+                    after_seconds=settings.archive_after_seconds,
+                    interval_seconds=settings.archive_interval_seconds,
+                )
+            ),
+        )
+
+    def start(self) -> None:
+        """Warm up resources before the first request is served."""
+
+        self.store.warm_up()
+        if self.sla_monitor is not None:
+            self.sla_monitor.start()
+        if self.archiver is not None:
+            self.archiver.start()
+        logger.info("Container started with %s storage", self.settings.storage_backend)
+
+    def close(self) -> None:
+        if self.archiver is not None:
+            self.archiver.close()
+        if self.sla_monitor is not None:
+            self.sla_monitor.close()
+        self.idempotency_cache.close()
+        self.store.close()
+
+
+def get_app_container(app: FastAPI) -> AppContainer:
+    container = getattr(app.state, "container", None)
+    if container is None:
+        raise RuntimeError("Application container is not available outside the app lifespan.")
+    return cast(AppContainer, container)
@@ -8,6 +8,8 @@ from pydantic import BaseModel, ValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.utils.errors import (
+    CapacityExceededError,
+    ChangeHistoryExpiredError,
     ConflictError,
     InvalidFieldSelectionError,
     InvalidFilterError,
@@ -24,6 +26,18 @@ class ApiError(BaseModel):
     status: str
 
 
+class _LazyErrors:
+    """Renders `exc.errors()` only if the (rate limited) warning is actually emitted."""
+
+    __slots__ = ("_exc",)
+
+    def __init__(self, exc: ValidationError | RequestValidationError) -> None:
+        self._exc = exc
+
+    def __str__(self) -> str:
+        return str(self._exc.errors())
+
+
 def _error_payload(code: str, reason: str, message: str, status: int) -> dict[str, str]:
     return ApiError(
         code=code,
@@ -38,7 +52,9 @@ def register_error_handlers(app: FastAPI) -> None:
     async def pydantic_validation_exception_handler(
         request: Request, exc: ValidationError
     ) -> JSONResponse:
-        logger.warning("Pydantic validation failed on %s: %s", request.url.path, exc.errors())
+        logger.warning(
+            "Pydantic validation failed on %s: %s", request.url.path, _LazyErrors(exc)
+        )
         return JSONResponse(
             status_code=400,
             content=_error_payload(
@@ -53,7 +69,7 @@ def register_error_handlers(app: FastAPI) -> None:
     async def validation_exception_handler(
         request: Request, exc: RequestValidationError
     ) -> JSONResponse:
-        logger.warning("Validation failed on %s: %s", request.url.path, exc.errors())
+        logger.warning("Validation failed on %s: %s", request.url.path, _LazyErrors(exc))
         return JSONResponse(
             status_code=400,
             content=_error_payload(
@@ -109,6 +125,21 @@ def register_error_handlers(app: FastAPI) -> None:
             ),
         )
 
+    @app.exception_handler(ChangeHistoryExpiredError)
+    async def change_history_expired_exception_handler(
+        request: Request, exc: ChangeHistoryExpiredError
+    ) -> JSONResponse:
+        logger.warning("Expired change feed position on %s: %s", request.url.path, exc)
+        return JSONResponse(
+            status_code=410,
+            content=_error_payload(
+                code="RESYNC_REQUIRED",
+                reason=str(exc),
+                message="Changes after this sequence are no longer retained; resync from since=0.",
+                status=410,
+            ),
+        )
+
     @app.exception_handler(ConflictError)
     async def conflict_exception_handler(
         request: Request, exc: ConflictError
@@ -124,6 +155,22 @@ def register_error_handlers(app: FastAPI) -> None:
             ),
         )
 
+    @app.exception_handler(CapacityExceededError)
+    async def capacity_exceeded_exception_handler(
+        request: Request, exc: CapacityExceededError
+    ) -> JSONResponse:
+        logger.warning("Capacity exceeded on %s: %s", request.url.path, exc)
+        return JSONResponse(
+            status_code=503,
+            headers={"Retry-After": "1"},
+            content=_error_payload(
+                code="SERVICE_UNAVAILABLE",
+                reason=str(exc),
+                message="The server is temporarily at capacity; retry later.",
+                status=503,
+            ),
+        )
+
     @app.exception_handler(StarletteHTTPException)
     async def http_exception_handler(
         request: Request, exc: StarletteHTTPException
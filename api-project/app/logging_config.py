@@ -1,38 +1,231 @@
+import atexit
+import copy
+import json
 import logging
+import queue
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
 from logging.config import dictConfig
+from logging.handlers import QueueHandler, QueueListener
+from threading import Lock
+from typing import Any
 
+# Attributes every LogRecord has; anything else was passed via `extra=` and is logged as a field.
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
 
-def configure_logging(log_level: str) -> None:
-    dictConfig(
-        {
-            "version": 1,
-            "disable_existing_loggers": False,
-            "formatters": {
-                "standard": {
-                    "format": "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
-                }
-            },
-            "handlers": {
-                "default": {
-                    "class": "logging.StreamHandler",
-                    "formatter": "standard",
-                    "level": log_level,
-                }
-            },
-            "root": {"handlers": ["default"], "level": log_level},
-            "loggers": {
-                "uvicorn.error": {
-                    "handlers": ["default"],
-                    "level": log_level,
-                    "propagate": False,
+# Shared by every app in the process; started and stopped from the app lifespan.
+_queue_lock = Lock()
+_queue_listener: QueueListener | None = None
+_queue_users = 0
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message and `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(
+            (key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES
+        )
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+@dataclass
+class _Window:
+    started: float
+    emitted: int = 0
+    suppressed: int = 0
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most `burst` records per message template every `interval_seconds`.
+
+    Records are keyed by logger and unformatted message, so a flood of identical
+    warnings (for example one per invalid request) collapses into `burst` lines
+    per window; the first record of the next window reports how many were dropped.
+    Records above WARNING always pass.
+    """
+
+    def __init__(
+        self,
+        burst: int = 20,
+        interval_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__()
+        self._burst = burst
+        self._interval_seconds = interval_seconds
+        self._clock = clock
+        self._lock = Lock()
+        self._windows: dict[tuple[str, str], _Window] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.WARNING:
+            return True
+        key = (record.name, str(record.msg))
+        now = self._clock()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window.started >= self._interval_seconds:
+                suppressed = 0 if window is None else window.suppressed
+                window = self._windows[key] = _Window(started=now)
+                if suppressed:
+                    record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+                    record.args = None
+                    record.suppressed = suppressed
+            if window.emitted >= self._burst:
+                window.suppressed += 1
+                return False
+            window.emitted += 1
+            return True
+
+
+def configure_logging(log_level: str, log_format: str = "text") -> None:
+    """
+    Configure root and uvicorn logging.
+
+    - `log_format="json"` writes one JSON object per record
+    - repetitive warnings from `app.error_handlers` (one per rejected request) are
+      rate limited
+
+    A running logging queue (see `start_logging_queue`) is kept in front of the
+    new handlers.
+    """
+
+    global _queue_listener
+    formatter: dict[str, Any] = (
+        {"()": JsonFormatter}
+        if log_format == "json"
+        else {"format": "%(asctime)s | %(levelname)s | %(name)s | %(message)s"}
+    )
+    with _queue_lock:
+        if _queue_listener is not None:
+            _queue_listener.stop()
+        dictConfig(
+            {
+                "version": 1,
+                "disable_existing_loggers": False,
+                "formatters": {"standard": formatter},
+                "filters": {"rate_limited": {"()": RateLimitFilter}},
+                "handlers": {
+                    "default": {
+                        "class": "logging.StreamHandler",
+                        "formatter": "standard",
+                        "level": log_level,
+                    }
                 },
-                "uvicorn.access": {
-                    "handlers": ["default"],
-                    "level": log_level,
-                    "propagate": False,
+                "root": {"handlers": ["default"], "level": log_level},
+                "loggers": {
+                    "app.error_handlers": {"filters": ["rate_limited"]},
+                    "uvicorn.error": {
+                        "handlers": ["default"],
+                        "level": log_level,
+                        "propagate": False,
+                    },
+                    "uvicorn.access": {
+                        "handlers": ["default"],
+                        "level": log_level,
+                        "propagate": False,
+                    },
                 },
-            },
-        }
+            }
+        )
+        if _queue_listener is not None:
+            _queue_listener = _route_through_queue(_handled_loggers())
+    logging.getLogger(__name__).info(
+        "Logging configured at %s level (format=%s)", log_level, log_format
     )
-    logging.getLogger(__name__).info("Logging configured at %s level", log_level)
 
+
+def start_logging_queue() -> None:
+    """
+    Make logging calls only enqueue the record; a background QueueListener thread
+    formats and writes it.
+
+    Calls nest: the first one starts the listener and the matching last
+    `stop_logging_queue` stops it, so app instances sharing the process share it.
+    """
+
+    global _queue_listener, _queue_users
+    with _queue_lock:
+        _queue_users += 1
+        if _queue_listener is None:
+            _queue_listener = _route_through_queue(_handled_loggers())
+            # Flush records still queued when the process exits without a shutdown.
+            atexit.register(_shutdown_logging_queue)
+
+
+def stop_logging_queue() -> None:
+    """Release one `start_logging_queue`; the last one flushes the queue and stops the thread."""
+
+    global _queue_users
+    with _queue_lock:
+        _queue_users = max(_queue_users - 1, 0)
+        if not _queue_users:
+            _stop_queue()
+
+
+def _stop_queue() -> None:
+    global _queue_listener
+    if _queue_listener is None:
+        return
+    _queue_listener.stop()
+    for logger in _handled_loggers():
+        logger.handlers = list(_queue_listener.handlers)
+    _queue_listener = None
+    atexit.unregister(_shutdown_logging_queue)
+
+
+def _shutdown_logging_queue() -> None:
+    global _queue_users
+    with _queue_lock:
+        _queue_users = 0
+        _stop_queue()
+
+
+def _handled_loggers() -> list[logging.Logger]:
+    return [logging.getLogger(name) for name in (None, "uvicorn.error", "uvicorn.access")]
+
+
+class _RecordQueueHandler(QueueHandler):
+    """
+    Enqueues records with the message rendered but otherwise unformatted.
+
+    The stock QueueHandler folds the traceback into the message; here it is kept in
+    `exc_text` and `extra` fields stay on the record, so the formatter on the
+    listener thread still produces structured output.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        prepared = copy.copy(record)
+        prepared.msg = record.getMessage()
+        prepared.args = None
+        if record.exc_info:
+            prepared.exc_text = logging.Formatter().formatException(record.exc_info)
+            prepared.exc_info = None
+        return prepared
+
+
+def _route_through_queue(loggers: list[logging.Logger]) -> QueueListener:
+    # All configured loggers share the single "default" handler; it moves behind the queue.
+    handler = loggers[0].handlers[0]
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    queue_handler = _RecordQueueHandler(records)
+    for logger in loggers:
+        logger.handlers = [queue_handler]
+
+    listener = QueueListener(records, handler, respect_handler_level=True)
+    listener.start()
+    return listener
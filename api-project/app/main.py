@@ -4,42 +4,86 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from app.api.admin import router as admin_router
+from app.api.admission import AdmissionMiddleware
+from app.api.compression import CompressionMiddleware
 from app.api.health import router as health_router
+from app.api.metrics import router as metrics_router
 from app.api.routes_hub import router as hub_router
 from app.api.routes_service_order import router as service_order_router
+from app.container import AppContainer
 from app.error_handlers import register_error_handlers
-from app.logging_config import configure_logging
-from app.settings import get_settings
+from app.logging_config import configure_logging, start_logging_queue, stop_logging_queue
+from app.observability.middleware import RequestMetricsMiddleware, ServerTimingMiddleware
+from app.settings import Settings, get_settings
 
-settings = get_settings()
-configure_logging(settings.log_level)
 logger = logging.getLogger(__name__)
 
 
-@asynccontextmanager
-async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
-    logger.info("Starting %s (%s)", settings.app_name, settings.environment)
-    yield
-    logger.info("Shutting down %s", settings.app_name)
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """
+    Build a FastAPI app for `settings` (environment-based settings by default).
 
-app = FastAPI(
-    title=settings.app_name,
-    description=settings.app_description,
-    version=settings.app_version,
-    lifespan=lifespan,
-)
+    Stores and services are created in the lifespan, not at import time, so each
+    worker process and each app instance gets its own components.
+    """
 
-register_error_handlers(app)
-app.include_router(health_router)
-app.include_router(service_order_router)
-app.include_router(hub_router)
+    settings = settings or get_settings()
+    configure_logging(settings.log_level, settings.log_format)
 
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        if settings.log_queue:
+            start_logging_queue()
+        logger.info("Starting %s (%s)", settings.app_name, settings.environment)
+        container = AppContainer.build(settings)
+        container.start()
+        app.state.container = container
+        try:
+            yield
+        finally:
+            logger.info("Shutting down %s", settings.app_name)
+            del app.state.container
+            container.close()
+            if settings.log_queue:
+                stop_logging_queue()
 
-@app.get("/", tags=["Meta"], summary="Root endpoint")
-def root() -> dict[str, str]:
-    return {
-        "message": settings.app_name,
-        "health": "/health",
-        "docs": "/docs",
-    }
+    app = FastAPI(
+        title=settings.app_name,
+        description=settings.app_description,
+        version=settings.app_version,
+        lifespan=lifespan,
+    )
 
+    if settings.server_timing:
+        app.add_middleware(ServerTimingMiddleware)
+    if settings.compression:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_min_size,
+            offload_size=settings.compression_offload_size,
+        )
+    if settings.admission_control:
+        app.add_middleware(
+            AdmissionMiddleware,
+            limits=AdmissionMiddleware.limits_from_settings(settings),
+            queue_timeout_seconds=settings.admission_queue_timeout_seconds,
+            retry_after_seconds=settings.admission_retry_after_seconds,
+        )
+    app.add_middleware(RequestMetricsMiddleware)
+    register_error_handlers(app)
+    app.include_router(health_router)
+    app.include_router(metrics_router)
+    app.include_router(service_order_router)
+    app.include_router(hub_router)
+    app.include_router(admin_router)
+
+    @app.get("/", tags=["Meta"], summary="Root endpoint")
+    def root() -> dict[str, str]:
+        return {
+            "message": settings.app_name,
+            "health": "/health",
+            "docs": "/docs",
+        }
+
+    return app
@@ -27,11 +27,15 @@ from app.models.notifications import (
     ServiceOrderCreateNotification,
     ServiceOrderDeleteNotification,
     ServiceOrderEvent,
+    ServiceOrderJeopardyAlertEvent,
+    ServiceOrderJeopardyAlertNotification,
     ServiceOrderNotification,
     ServiceOrderStateChangeNotification,
 )
 from app.models.service_order import (
     ServiceOrder,
+    ServiceOrderBatchGet,
+    ServiceOrderBatchGetResponse,
     ServiceOrderCreate,
     ServiceOrderCreateResponse,
     ServiceOrderItem,
@@ -54,6 +58,8 @@ __all__ = [
     "HubRef",
     "ServiceOrderActionType",
     "ServiceOrderAttributeValueChangeNotification",
+    "ServiceOrderBatchGet",
+    "ServiceOrderBatchGetResponse",
     "ServiceOrderCreate",
     "ServiceOrderCreateNotification",
     "ServiceOrderCreateResponse",
@@ -64,6 +70,8 @@ __all__ = [
     "ServiceOrderItemStateType",
     "ServiceOrderItemRelationship",
     "ServiceOrderItemPatch",
+    "ServiceOrderJeopardyAlertEvent",
+    "ServiceOrderJeopardyAlertNotification",
     "ServiceOrderNotification",
     "ServiceOrderPatch",
     "ServiceOrderPatchResponse",
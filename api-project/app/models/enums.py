@@ -17,6 +17,17 @@ class ServiceOrderStateType(StrEnum):
     PARTIAL = "partial"
 
 
+# States an order never leaves once reached.
+TERMINAL_SERVICE_ORDER_STATES = frozenset(
+    {
+        ServiceOrderStateType.CANCELLED,
+        ServiceOrderStateType.COMPLETED,
+        ServiceOrderStateType.REJECTED,
+        ServiceOrderStateType.PARTIAL,
+    }
+)
+
+
 class ServiceOrderItemStateType(StrEnum):
     ACKNOWLEDGED = "acknowledged"
     IN_PROGRESS = "inProgress"
@@ -11,6 +11,11 @@ class ServiceOrderEvent(TMFBaseModel):
     service_order: ServiceOrder = Field(alias="serviceOrder")
 
 
+class ServiceOrderJeopardyAlertEvent(ServiceOrderEvent):
+    # Name of the passed deadline field: expectedCompletionDate or requestedCompletionDate.
+    deadline: str
+
+
 class ServiceOrderNotification(TMFBaseModel):
     event_id: str = Field(alias="eventId")
     event_time: datetime = Field(alias="eventTime")
@@ -41,3 +46,9 @@ class ServiceOrderDeleteNotification(ServiceOrderNotification):
         default="ServiceOrderDeleteNotification", alias="eventType"
     )
 
+
+class ServiceOrderJeopardyAlertNotification(ServiceOrderNotification):
+    event_type: Literal["ServiceOrderJeopardyAlertNotification"] = Field(
+        default="ServiceOrderJeopardyAlertNotification", alias="eventType"
+    )
+    event: ServiceOrderJeopardyAlertEvent
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Self
+from time import perf_counter
+from typing import Any, Self, TypeVar
 
-from pydantic import Field, ValidationInfo, model_validator
+from pydantic import Field, ModelWrapValidatorHandler, ValidationInfo, model_validator
 
 from app.models.common import (
     AppointmentRef,
@@ -26,6 +27,23 @@ from app.models.enums import (
     ServiceOrderStateType,
     ServiceStateType,
 )
+from app.models.validation_rules import (
+    AllOf,
+    AnyOf,
+    Each,
+    Either,
+    Equals,
+    Nested,
+    Present,
+    Required,
+    Rule,
+    RuleSpec,
+    compile_rules,
+)
+from app.observability.metrics import VALIDATION_DURATION
+from app.observability.timing import record_phase
+
+ModelT = TypeVar("ModelT")
 
 CREATE_SERVER_MANAGED_FIELDS = {
     "id",
@@ -48,73 +66,96 @@ PATCH_NON_PATCHABLE_FIELDS = {
 PATCH_NON_PATCHABLE_ORDER_ITEM_FIELDS = {"id", "action", "state"}
 
 
-def _is_non_empty(value: str | None) -> bool:
-    return value is not None and value.strip() != ""
-
-
-def _has_reference(*values: str | None) -> bool:
-    return any(_is_non_empty(value) for value in values)
-
+_HAS_ID_OR_HREF = AnyOf("id", "href")
 
-def _validate_related_party_collection(
-    related_parties: list[RelatedParty] | None, scope: str
-) -> None:
-    for index, related_party in enumerate(related_parties or []):
-        if not _is_non_empty(related_party.role):
-            raise ValueError(f"{scope}[{index}].role is required.")
-        if not _has_reference(related_party.id, related_party.href, related_party.name):
-            raise ValueError(
-                f"{scope}[{index}] must include at least one of id, href, or name."
-            )
-
-
-def _validate_note_collection(notes: list[Note] | None, scope: str) -> None:
-    for index, note in enumerate(notes or []):
-        if note.date is None or not _is_non_empty(note.author) or not _is_non_empty(note.text):
-            raise ValueError(f"{scope}[{index}] requires date, author, and text.")
-
-
-def _validate_order_relationship_collection(
-    relationships: list[ServiceOrderRelationship] | None, scope: str
-) -> None:
-    for index, relationship in enumerate(relationships or []):
-        if not _is_non_empty(relationship.relationship_type):
-            raise ValueError(f"{scope}[{index}].relationshipType is required.")
-        if not _has_reference(relationship.id, relationship.href):
-            raise ValueError(f"{scope}[{index}] requires id and/or href.")
-
-
-def _validate_service_restriction(service: ServiceRestriction, scope: str) -> None:
-    for index, place in enumerate(service.place or []):
-        if not _is_non_empty(place.role):
-            raise ValueError(f"{scope}.place[{index}].role is required.")
-        if not _has_reference(place.id, place.href):
-            raise ValueError(f"{scope}.place[{index}] requires id and/or href.")
-
-    if service.service_specification is not None and not _has_reference(
-        service.service_specification.id, service.service_specification.href
-    ):
-        raise ValueError(f"{scope}.serviceSpecification requires id and/or href.")
-
-    for index, relationship in enumerate(service.service_relationship or []):
-        if not _is_non_empty(relationship.relationship_type):
-            raise ValueError(f"{scope}.serviceRelationship[{index}].relationshipType is required.")
-        if relationship.service is None or not _has_reference(
-            relationship.service.id, relationship.service.href
-        ):
-            raise ValueError(
-                f"{scope}.serviceRelationship[{index}].service requires id and/or href."
-            )
+_RELATED_PARTY_RULES: tuple[RuleSpec, ...] = (
+    Rule(Required("role"), "{scope}.role is required."),
+    Rule(AnyOf("id", "href", "name"), "{scope} must include at least one of id, href, or name."),
+)
+_NOTE_RULES: tuple[RuleSpec, ...] = (
+    Rule(
+        AllOf(Present("date"), Required("author", "text")),
+        "{scope} requires date, author, and text.",
+    ),
+)
+_ORDER_RELATIONSHIP_RULES: tuple[RuleSpec, ...] = (
+    Rule(Required("relationship_type"), "{scope}.relationshipType is required."),
+    Rule(_HAS_ID_OR_HREF, "{scope} requires id and/or href."),
+)
+_SERVICE_RESTRICTION_RULES: tuple[RuleSpec, ...] = (
+    Each(
+        "place",
+        "place",
+        (
+            Rule(Required("role"), "{scope}.role is required."),
+            Rule(_HAS_ID_OR_HREF, "{scope} requires id and/or href."),
+        ),
+    ),
+    Nested(
+        "service_specification",
+        "serviceSpecification",
+        (Rule(_HAS_ID_OR_HREF, "{scope} requires id and/or href."),),
+    ),
+    Each(
+        "service_relationship",
+        "serviceRelationship",
+        (
+            Rule(Required("relationship_type"), "{scope}.relationshipType is required."),
+            Rule(
+                AllOf(Present("service"), AnyOf("service.id", "service.href")),
+                "{scope}.service requires id and/or href.",
+            ),
+        ),
+    ),
+    Each(
+        "service_characteristic",
+        "serviceCharacteristic",
+        (
+            Rule(
+                AllOf(Required("name", "value_type"), Present("value")),
+                "{scope} requires name, valueType, and value.",
+            ),
+        ),
+    ),
+)
+_ORDER_ITEM_RULES: tuple[RuleSpec, ...] = (
+    Nested(
+        "appointment",
+        "appointment",
+        (Rule(_HAS_ID_OR_HREF, "{scope} requires id and/or href."),),
+    ),
+    Each(
+        "order_item_relationship",
+        "orderItemRelationship",
+        (
+            Rule(Required("relationship_type"), "{scope}.relationshipType is required."),
+            Rule(Required("id"), "{scope}.id is required."),
+        ),
+    ),
+    Each("related_party", "relatedParty", _RELATED_PARTY_RULES),
+    Nested("service", "service", _SERVICE_RESTRICTION_RULES),
+)
+_ORDER_ITEM_CREATE_RULES: tuple[RuleSpec, ...] = (
+    Rule(
+        Either(
+            Equals("action", ServiceOrderActionType.ADD), AnyOf("service.id", "service.href")
+        ),
+        "For orderItem.action different from 'add', service.id and/or service.href is required.",
+    ),
+    *_ORDER_ITEM_RULES,
+)
+_ORDER_COLLECTION_RULES: tuple[RuleSpec, ...] = (
+    Each("related_party", "relatedParty", _RELATED_PARTY_RULES),
+    Each("note", "note", _NOTE_RULES),
+    Each("order_relationship", "orderRelationship", _ORDER_RELATIONSHIP_RULES),
+)
 
-    for index, characteristic in enumerate(service.service_characteristic or []):
-        if (
-            not _is_non_empty(characteristic.name)
-            or not _is_non_empty(characteristic.value_type)
-            or characteristic.value is None
-        ):
-            raise ValueError(
-                f"{scope}.serviceCharacteristic[{index}] requires name, valueType, and value."
-            )
+# Order items are validated by their own models (under the `orderItem` scope), so the
+# rules also hold when an item model is validated on its own; the order validators
+# then only walk the order-level collections.
+validate_service_order_item_create = compile_rules(_ORDER_ITEM_CREATE_RULES, scope="orderItem")
+validate_service_order_item_patch = compile_rules(_ORDER_ITEM_RULES, scope="orderItem")
+validate_service_order_collections = compile_rules(_ORDER_COLLECTION_RULES)
 
 
 class ServiceRestriction(TMFEntity):
@@ -190,29 +231,7 @@ class ServiceOrderItemCreate(TMFEntity):
 
     @model_validator(mode="after")
     def validate_create_rules(self) -> Self:
-        if self.action != ServiceOrderActionType.ADD and not _has_reference(
-            self.service.id, self.service.href
-        ):
-            raise ValueError(
-                "For orderItem.action different from 'add', "
-                "service.id and/or service.href is required."
-            )
-
-        if self.appointment is not None and not _has_reference(
-            self.appointment.id, self.appointment.href
-        ):
-            raise ValueError("orderItem.appointment requires id and/or href.")
-
-        for index, relationship in enumerate(self.order_item_relationship or []):
-            if not _is_non_empty(relationship.relationship_type):
-                raise ValueError(
-                    f"orderItem.orderItemRelationship[{index}].relationshipType is required."
-                )
-            if not _is_non_empty(relationship.id):
-                raise ValueError(f"orderItem.orderItemRelationship[{index}].id is required.")
-
-        _validate_related_party_collection(self.related_party, "orderItem.relatedParty")
-        _validate_service_restriction(self.service, "orderItem.service")
+        validate_service_order_item_create(self)
         return self
 
 
@@ -254,11 +273,14 @@ class ServiceOrderCreate(TMFEntity):
 
     @model_validator(mode="after")
     def validate_create_collections(self) -> Self:
-        _validate_related_party_collection(self.related_party, "relatedParty")
-        _validate_note_collection(self.note, "note")
-        _validate_order_relationship_collection(self.order_relationship, "orderRelationship")
+        validate_service_order_collections(self)
         return self
 
+    @model_validator(mode="wrap")
+    @classmethod
+    def time_validation(cls, data: Any, handler: ModelWrapValidatorHandler[Self]) -> Self:
+        return _timed_validation("ServiceOrderCreate", data, handler)
+
 
 class ServiceOrderItemPatch(TMFEntity):
     appointment: AppointmentRef | None = None
@@ -270,24 +292,7 @@ class ServiceOrderItemPatch(TMFEntity):
 
     @model_validator(mode="after")
     def validate_patch_rules(self) -> Self:
-        if self.appointment is not None and not _has_reference(
-            self.appointment.id, self.appointment.href
-        ):
-            raise ValueError("orderItem.appointment requires id and/or href.")
-
-        for index, relationship in enumerate(self.order_item_relationship or []):
-            if not _is_non_empty(relationship.relationship_type):
-                raise ValueError(
-                    f"orderItem.orderItemRelationship[{index}].relationshipType is required."
-                )
-            if not _is_non_empty(relationship.id):
-                raise ValueError(f"orderItem.orderItemRelationship[{index}].id is required.")
-
-        _validate_related_party_collection(self.related_party, "orderItem.relatedParty")
-
-        if self.service is not None:
-            _validate_service_restriction(self.service, "orderItem.service")
-
+        validate_service_order_item_patch(self)
         return self
 
 
@@ -338,9 +343,7 @@ class ServiceOrderPatch(TMFEntity):
 
     @model_validator(mode="after")
     def validate_patch_collections(self) -> Self:
-        _validate_related_party_collection(self.related_party, "relatedParty")
-        _validate_note_collection(self.note, "note")
-        _validate_order_relationship_collection(self.order_relationship, "orderRelationship")
+        validate_service_order_collections(self)
         return self
 
     @model_validator(mode="after")
@@ -376,6 +379,22 @@ class ServiceOrderPatch(TMFEntity):
 
         return self
 
+    @model_validator(mode="wrap")
+    @classmethod
+    def time_validation(cls, data: Any, handler: ModelWrapValidatorHandler[Self]) -> Self:
+        return _timed_validation("ServiceOrderPatch", data, handler)
+
+
+class ServiceOrderBatchGet(TMFBaseModel):
+    id: list[str] = Field(
+        min_length=1, max_length=1000, description="Identifiers of the orders to retrieve."
+    )
+
+
+class ServiceOrderBatchGetResponse(TMFBaseModel):
+    service_order: list[ServiceOrder] = Field(alias="serviceOrder")
+    missing: list[str] = Field(description="Requested ids that do not exist.")
+
 
 class ServiceOrderCreateResponse(TMFBaseModel):
     id: str
@@ -386,3 +405,17 @@ class ServiceOrderPatchResponse(TMFBaseModel):
     id: str
     href: str
 
+
+def _timed_validation(
+    model: str, data: Any, handler: ModelWrapValidatorHandler[ModelT]
+) -> ModelT:
+    started = perf_counter()
+    outcome = "invalid"
+    try:
+        validated = handler(data)
+        outcome = "valid"
+        return validated
+    finally:
+        elapsed = perf_counter() - started
+        VALIDATION_DURATION.labels(model, outcome).observe(elapsed)
+        record_phase("validate", elapsed)
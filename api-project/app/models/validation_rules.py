@@ -0,0 +1,242 @@
+"""
+Declarative payload rules compiled into validators.
+
+A ruleset is a tuple of specs:
+
+- `Rule(check, message)` - `check` must hold for the object, otherwise `message` is raised
+- `Nested(attribute, path, rules)` - applies `rules` to `obj.<attribute>` when it is set
+- `Each(attribute, path, rules)` - applies `rules` to every element of `obj.<attribute>`
+
+`compile_rules` turns a ruleset into one validator: a closure per spec, built once,
+that walks the payload in rule order and raises the first violation. Messages may
+reference `{scope}`, the dotted path of the failing object (for example
+`orderItem.service.place[0]`); the path and message are only built when a rule fails.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from operator import attrgetter
+from typing import Any, TypeAlias
+
+_Getter: TypeAlias = Callable[[Any], Any]
+# Validates one object, raising _Violation for the first failed rule.
+_Validator: TypeAlias = Callable[[Any], None]
+
+
+class Check(ABC):
+    @abstractmethod
+    def __call__(self, obj: Any) -> bool:
+        """Whether the check holds for `obj`."""
+
+
+@dataclass(frozen=True, init=False)
+class Required(Check):
+    """All attributes must be non-blank strings."""
+
+    attributes: tuple[str, ...]
+    _getters: tuple[_Getter, ...] = field(repr=False, compare=False)
+
+    def __init__(self, *attributes: str) -> None:
+        object.__setattr__(self, "attributes", attributes)
+        object.__setattr__(self, "_getters", _getters(attributes))
+
+    def __call__(self, obj: Any) -> bool:
+        return all(_non_empty(getter(obj)) for getter in self._getters)
+
+
+@dataclass(frozen=True, init=False)
+class AnyOf(Check):
+    """At least one attribute must be a non-blank string."""
+
+    attributes: tuple[str, ...]
+    _getters: tuple[_Getter, ...] = field(repr=False, compare=False)
+
+    def __init__(self, *attributes: str) -> None:
+        object.__setattr__(self, "attributes", attributes)
+        object.__setattr__(self, "_getters", _getters(attributes))
+
+    def __call__(self, obj: Any) -> bool:
+        return any(_non_empty(getter(obj)) for getter in self._getters)
+
+
+@dataclass(frozen=True, init=False)
+class Present(Check):
+    """All attributes must be set (not None)."""
+
+    attributes: tuple[str, ...]
+    _getters: tuple[_Getter, ...] = field(repr=False, compare=False)
+
+    def __init__(self, *attributes: str) -> None:
+        object.__setattr__(self, "attributes", attributes)
+        object.__setattr__(self, "_getters", _getters(attributes))
+
+    def __call__(self, obj: Any) -> bool:
+        return all(getter(obj) is not None for getter in self._getters)
+
+
+@dataclass(frozen=True)
+class Equals(Check):
+    attribute: str
+    value: Any
+    _getter: _Getter = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_getter", _getters((self.attribute,))[0])
+
+    def __call__(self, obj: Any) -> bool:
+        return bool(self._getter(obj) == self.value)
+
+
+@dataclass(frozen=True, init=False)
+class AllOf(Check):
+    """Every check must hold; later checks may rely on earlier ones (short-circuit)."""
+
+    checks: tuple[Check, ...]
+
+    def __init__(self, *checks: Check) -> None:
+        object.__setattr__(self, "checks", checks)
+
+    def __call__(self, obj: Any) -> bool:
+        return all(check(obj) for check in self.checks)
+
+
+@dataclass(frozen=True, init=False)
+class Either(Check):
+    """At least one check must hold."""
+
+    checks: tuple[Check, ...]
+
+    def __init__(self, *checks: Check) -> None:
+        object.__setattr__(self, "checks", checks)
+
+    def __call__(self, obj: Any) -> bool:
+        return any(check(obj) for check in self.checks)
+
+
+@dataclass(frozen=True)
+class Rule:
+    check: Check
+    message: str
+
+
+@dataclass(frozen=True)
+class Nested:
+    attribute: str
+    path: str
+    rules: tuple[RuleSpec, ...]
+
+
+@dataclass(frozen=True)
+class Each:
+    attribute: str
+    path: str
+    rules: tuple[RuleSpec, ...]
+    indexed: bool = True
+
+
+RuleSpec: TypeAlias = Rule | Nested | Each
+
+
+def compile_rules(rules: tuple[RuleSpec, ...], scope: str = "") -> Callable[[Any], None]:
+    """
+    Compile `rules` into a validator raising ValueError with the first violation.
+
+    `scope` is the path of the validated object in messages, for rulesets that
+    validate a nested model on its own (for example `orderItem`).
+    """
+
+    validate_rules = _compile(rules)
+
+    def validate(obj: Any) -> None:
+        try:
+            validate_rules(obj)
+        except _Violation as violation:
+            path = ".".join([*([scope] if scope else []), *reversed(violation.segments)])
+            raise ValueError(violation.message.format(scope=path)) from None
+
+    return validate
+
+
+class _Violation(Exception):
+    """A failed rule on its way up; each enclosing spec adds its path segment."""
+
+    def __init__(self, message: str) -> None:
+        self.message = message
+        self.segments: list[str] = []
+
+
+def _compile(rules: tuple[RuleSpec, ...]) -> _Validator:
+    validators = [_compile_spec(spec) for spec in rules]
+
+    def validate(obj: Any) -> None:
+        for validator in validators:
+            validator(obj)
+
+    return validate
+
+
+def _compile_spec(spec: RuleSpec) -> _Validator:
+    if isinstance(spec, Rule):
+        return _compile_rule(spec)
+    if isinstance(spec, Nested):
+        return _compile_nested(spec)
+    return _compile_each(spec)
+
+
+def _compile_rule(rule: Rule) -> _Validator:
+    check, message = rule.check, rule.message
+
+    def validate(obj: Any) -> None:
+        if not check(obj):
+            raise _Violation(message)
+
+    return validate
+
+
+def _compile_nested(spec: Nested) -> _Validator:
+    get = _getters((spec.attribute,))[0]
+    validate_rules = _compile(spec.rules)
+    path = spec.path
+
+    def validate(obj: Any) -> None:
+        value = get(obj)
+        if value is None:
+            return
+        try:
+            validate_rules(value)
+        except _Violation as violation:
+            violation.segments.append(path)
+            raise
+
+    return validate
+
+
+def _compile_each(spec: Each) -> _Validator:
+    get = _getters((spec.attribute,))[0]
+    validate_rules = _compile(spec.rules)
+    path, indexed = spec.path, spec.indexed
+
+    def validate(obj: Any) -> None:
+        index = 0
+        try:
+            for index, item in enumerate(get(obj) or ()):
+                validate_rules(item)
+        except _Violation as violation:
+            violation.segments.append(f"{path}[{index}]" if indexed else path)
+            raise
+
+    return validate
+
+
+def _non_empty(value: Any) -> bool:
+    return value is not None and value.strip() != ""
+
+
+def _getters(attributes: tuple[str, ...]) -> tuple[_Getter, ...]:
+    for attribute in attributes:
+        if not all(part.isidentifier() for part in attribute.split(".")):
+            raise ValueError(f"Invalid attribute path in validation rule: {attribute!r}.")
+    return tuple(attrgetter(attribute) for attribute in attributes)
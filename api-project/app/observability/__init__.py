@@ -0,0 +1,16 @@
+"""Metrics, request timing and profiling."""
+
+from app.observability.metrics import REGISTRY, MetricsRegistry
+from app.observability.middleware import RequestMetricsMiddleware, ServerTimingMiddleware
+from app.observability.profiler import SamplingProfiler
+from app.observability.timing import phase, record_phase
+
+__all__ = [
+    "MetricsRegistry",
+    "REGISTRY",
+    "RequestMetricsMiddleware",
+    "SamplingProfiler",
+    "ServerTimingMiddleware",
+    "phase",
+    "record_phase",
+]
@@ -0,0 +1,334 @@
+"""
+Minimal Prometheus-compatible metrics.
+
+Metric families are declared once at import time and hot paths keep a reference
+to a pre-built child (one per label set), so recording a sample is a lock and a
+couple of additions. Label values are limited to small, known sets (route
+templates, event types, outcomes, registered listener ids) to avoid label
+explosion; a listener's series are removed when it is unregistered. Families are
+process-wide, except the per-app ones built by `app_registry`.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from threading import Lock, RLock
+from time import perf_counter
+from typing import TypeVar
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+LOCK_WAIT_BUCKETS = (0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0)
+
+LabelValues = tuple[str, ...]
+
+
+class CounterChild:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class HistogramChild:
+    __slots__ = ("_bounds", "_lock", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self._bounds = bounds
+        self._lock = Lock()
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class _Family:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._lock = Lock()
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+
+    def _label_text(self, values: LabelValues, extra: str = "") -> str:
+        pairs = [
+            f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, values)
+        ]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def _check_labels(self, values: LabelValues) -> None:
+        if len(values) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {values}.")
+
+
+class Counter(_Family):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, label_names)
+        self._children: dict[LabelValues, CounterChild] = {}
+
+    def labels(self, *values: str) -> CounterChild:
+        child = self._children.get(values)
+        if child is None:
+            self._check_labels(values)
+            with self._lock:
+                child = self._children.setdefault(values, CounterChild())
+        return child
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def remove(self, *values: str) -> None:
+        """Drop the series of one label set, for label values that go away (listeners)."""
+
+        with self._lock:
+            self._children.pop(values, None)
+
+    def render(self) -> Iterable[str]:
+        yield from super().render()
+        for values, child in sorted(self._children.items()):
+            yield f"{self.name}_total{self._label_text(values)} {_number(child.value)}"
+
+
+class Histogram(_Family):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self._buckets = tuple(sorted(buckets))
+        self._children: dict[LabelValues, HistogramChild] = {}
+
+    def labels(self, *values: str) -> HistogramChild:
+        child = self._children.get(values)
+        if child is None:
+            self._check_labels(values)
+            with self._lock:
+                child = self._children.setdefault(values, HistogramChild(self._buckets))
+        return child
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def render(self) -> Iterable[str]:
+        yield from super().render()
+        for values, child in sorted(self._children.items()):
+            cumulative = 0
+            for bound, count in zip((*self._buckets, float("inf")), child.counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{self._label_text(values, le)} {cumulative}"
+            yield f"{self.name}_sum{self._label_text(values)} {_number(child.sum)}"
+            yield f"{self.name}_count{self._label_text(values)} {cumulative}"
+
+
+class CallbackGauge(_Family):
+    """Gauge whose value is computed at scrape time, so hot paths never touch it."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        super().__init__(name, documentation, ())
+        self._callback: Callable[[], float] | None = None
+
+    def set_callback(self, callback: Callable[[], float] | None) -> None:
+        self._callback = callback
+
+    def render(self) -> Iterable[str]:
+        if self._callback is None:
+            return
+        yield from super().render()
+        yield f"{self.name} {_number(self._callback())}"
+
+
+FamilyT = TypeVar("FamilyT", bound=_Family)
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._families: dict[str, _Family] = {}
+
+    def counter(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def callback_gauge(self, name: str, documentation: str) -> CallbackGauge:
+        return self._register(CallbackGauge(name, documentation))
+
+    def render(self) -> str:
+        """Render every family in the Prometheus text exposition format (0.0.4)."""
+
+        lines: list[str] = []
+        for family in self._families.values():
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, family: FamilyT) -> FamilyT:
+        if family.name in self._families:
+            raise ValueError(f"Metric '{family.name}' is already registered.")
+        self._families[family.name] = family
+        return family
+
+
+class TimedRLock:
+    """
+    RLock that records how long callers waited for it.
+
+    The uncontended path is a single non-blocking acquire; only callers that
+    actually have to wait are timed, so the histogram count is the number of
+    contended acquisitions.
+    """
+
+    __slots__ = ("_lock", "_wait")
+
+    def __init__(self, wait: HistogramChild) -> None:
+        self._lock = RLock()
+        self._wait = wait
+
+    def __enter__(self) -> bool:
+        if self._lock.acquire(blocking=False):
+            return True
+        started = perf_counter()
+        self._lock.acquire()
+        self._wait.observe(perf_counter() - started)
+        return True
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._lock.release()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+REGISTRY = MetricsRegistry()
+
+
+def app_registry(count_service_orders: Callable[[], float]) -> MetricsRegistry:
+    """
+    Metrics owned by one app instance, rendered after the process-wide `REGISTRY`.
+
+    Gauges read from per-app components live here, so apps running side by side
+    in one process each report their own store.
+    """
+
+    registry = MetricsRegistry()
+    registry.callback_gauge(
+        "tmf641_store_service_orders", "Number of service orders in the store."
+    ).set_callback(count_service_orders)
+    return registry
+
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "tmf641_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    labels=("method", "route", "status"),
+)
+STORE_LOCK_WAIT = REGISTRY.histogram(
+    "tmf641_store_lock_wait_seconds",
+    "Time spent waiting for a contended InMemoryStore lock.",
+    buckets=LOCK_WAIT_BUCKETS,
+)
+FILTER_ORDERS_SCANNED = REGISTRY.counter(
+    "tmf641_filter_orders_scanned",
+    "Orders evaluated by apply_order_filters, by filter kind.",
+    labels=("kind",),
+)
+VALIDATION_DURATION = REGISTRY.histogram(
+    "tmf641_validation_duration_seconds",
+    "Payload validation time by model and outcome.",
+    labels=("model", "outcome"),
+)
+NOTIFICATION_EMIT_DURATION = REGISTRY.histogram(
+    "tmf641_notification_emit_duration_seconds",
+    "Time to build a notification and hand it to every matching listener.",
+    labels=("event_type",),
+)
+NOTIFICATION_DELIVERY_DURATION = REGISTRY.histogram(
+    "tmf641_notification_delivery_duration_seconds",
+    "Latency of one notification delivery attempt to a listener.",
+    labels=("outcome",),
+)
+NOTIFICATION_DELIVERY_FAILURES = REGISTRY.counter(
+    "tmf641_notification_delivery_failures",
+    "Failed notification deliveries (error status, connection error or timeout) per listener.",
+    labels=("listener",),
+)
+ARCHIVED_SERVICE_ORDERS = REGISTRY.counter(
+    "tmf641_archived_service_orders",
+    "Terminal orders moved from the in-memory store to the on-disk archive.",
+)
+SLA_BREACHES = REGISTRY.counter(
+    "tmf641_sla_breaches",
+    "Jeopardy alerts for open orders past a completion deadline, by deadline field.",
+    labels=("deadline",),
+)
+ADMISSION_DECISIONS = REGISTRY.counter(
+    "tmf641_admission_decisions",
+    "Admission decisions by route class (admitted, queued, rejected_queue_full, rejected_timeout).",
+    labels=("route_class", "decision"),
+)
+ADMISSION_QUEUE_WAIT = REGISTRY.histogram(
+    "tmf641_admission_queue_wait_seconds",
+    "Time admitted requests spent in the admission queue.",
+    labels=("route_class",),
+)
+COMPRESSION_BYTES = REGISTRY.counter(
+    "tmf641_compression_bytes",
+    "Response bytes before (in) and after (out) compression, by encoding.",
+    labels=("encoding", "direction"),
+)
+COMPRESSION_CPU = REGISTRY.histogram(
+    "tmf641_compression_cpu_seconds",
+    "CPU time spent compressing one response body or chunk, by encoding.",
+    labels=("encoding",),
+)
@@ -0,0 +1,77 @@
+from time import perf_counter
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.observability.metrics import HTTP_REQUEST_DURATION
+from app.observability.timing import (
+    format_server_timing,
+    start_request_timing,
+    stop_request_timing,
+)
+
+_KNOWN_METHODS = {"GET", "POST", "PATCH", "PUT", "DELETE", "HEAD", "OPTIONS"}
+
+
+class RequestMetricsMiddleware:
+    """
+    Records request latency per method, route template and status class.
+
+    The route label is the matched path template (`/serviceOrder/{id}`), never the
+    raw path, so label cardinality is bounded by the number of routes.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            method = scope["method"] if scope["method"] in _KNOWN_METHODS else "OTHER"
+            HTTP_REQUEST_DURATION.labels(
+                method,
+                getattr(route, "path", "unmatched"),
+                f"{status_code // 100}xx",
+            ).observe(perf_counter() - started)
+
+
+class ServerTimingMiddleware:
+    """Adds a `Server-Timing` header with the phases recorded during the request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = perf_counter()
+        timings, token = start_request_timing()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", format_server_timing(timings, perf_counter() - started)
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stop_request_timing(token)
@@ -0,0 +1,79 @@
+"""
+Wall-clock sampling profiler producing collapsed stacks.
+
+A sampler thread reads `sys._current_frames()` every `interval_seconds` and counts
+each thread's stack. Nothing is hooked into the interpreter, so requests run at
+full speed and the cost is the sampler thread's own work. The output is the
+collapsed format (`frame;frame;frame count` per line) read by flamegraph.pl,
+speedscope and similar tools.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+
+from app.utils.errors import ConflictError
+
+# Leaf frames of threads parked waiting for work (thread pool, event loop selector).
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+}
+
+
+class SamplingProfiler:
+    def __init__(self, interval_seconds: float = 0.005, max_depth: int = 128) -> None:
+        self._interval_seconds = interval_seconds
+        self._max_depth = max_depth
+        self._session_lock = threading.Lock()
+
+    def profile(self, duration_seconds: float, include_idle: bool = False) -> str:
+        """
+        Sample every other thread for `duration_seconds` and return collapsed stacks.
+
+        Only one session runs at a time; a concurrent request raises ConflictError.
+        """
+
+        if not self._session_lock.acquire(blocking=False):
+            raise ConflictError("A profiling session is already running.")
+
+        try:
+            stacks = self._sample(duration_seconds, include_idle)
+        finally:
+            self._session_lock.release()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    def _sample(self, duration_seconds: float, include_idle: bool) -> Counter[str]:
+        stacks: Counter[str] = Counter()
+        sampler_id = threading.get_ident()
+        deadline = time.monotonic() + duration_seconds
+
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler_id:
+                    continue
+                if not include_idle and _is_idle(frame):
+                    continue
+                stacks[self._collapse(frame)] += 1
+            time.sleep(self._interval_seconds)
+        return stacks
+
+    def _collapse(self, frame: FrameType) -> str:
+        frames: list[str] = []
+        current: FrameType | None = frame
+        while current is not None and len(frames) < self._max_depth:
+            code = current.f_code
+            frames.append(
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            )
+            current = current.f_back
+        return ";".join(reversed(frames))
+
+
+def _is_idle(frame: FrameType) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES
@@ -0,0 +1,57 @@
+"""
+Per-request phase timing reported in the `Server-Timing` response header.
+
+`ServerTimingMiddleware` installs a timings dict for the request; code on the
+request path wraps its work in `phase("store")`, `phase("filter")`, ... . When no
+request is being timed (the middleware is disabled, or code runs outside a
+request) `phase` is a context-variable lookup and nothing else.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from time import perf_counter
+
+_current_timings: ContextVar[dict[str, float] | None] = ContextVar(
+    "server_timing", default=None
+)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + perf_counter() - started
+
+
+def record_phase(name: str, seconds: float) -> None:
+    """Add an already measured duration to the current request's `name` phase."""
+
+    timings = _current_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+TimingToken = Token[dict[str, float] | None]
+
+
+def start_request_timing() -> tuple[dict[str, float], TimingToken]:
+    timings: dict[str, float] = {}
+    return timings, _current_timings.set(timings)
+
+
+def stop_request_timing(token: TimingToken) -> None:
+    _current_timings.reset(token)
+
+
+def format_server_timing(timings: dict[str, float], total_seconds: float) -> str:
+    entries = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in timings.items()]
+    entries.append(f"total;dur={total_seconds * 1000:.3f}")
+    return ", ".join(entries)
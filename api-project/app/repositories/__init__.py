@@ -1,6 +1,34 @@
 """Repository abstractions and in-memory implementation."""
 
-from app.repositories.memory_store import HubListenerRecord, InMemoryStore
-
-__all__ = ["HubListenerRecord", "InMemoryStore"]
+from app.repositories.base import Repository, ResponseCache
+from app.repositories.factory import build_idempotency_cache, build_store
+from app.repositories.idempotency_cache import IdempotencyCache, IdempotencyRecord
+from app.repositories.memory_store import (
+    HubListenerRecord,
+    InMemoryStore,
+    RecordSelector,
+    ServiceOrderChange,
+    ServiceOrderRecord,
+    StatsKey,
+    stats_key,
+)
+from app.repositories.sqlite_idempotency_cache import SQLiteIdempotencyCache
+from app.repositories.sqlite_store import SQLiteStore
 
+__all__ = [
+    "HubListenerRecord",
+    "IdempotencyCache",
+    "IdempotencyRecord",
+    "InMemoryStore",
+    "RecordSelector",
+    "Repository",
+    "ResponseCache",
+    "SQLiteIdempotencyCache",
+    "SQLiteStore",
+    "ServiceOrderChange",
+    "ServiceOrderRecord",
+    "StatsKey",
+    "build_idempotency_cache",
+    "build_store",
+    "stats_key",
+]
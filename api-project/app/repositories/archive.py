@@ -0,0 +1,198 @@
+"""
+Cold tier of `InMemoryStore`: orders in compressed, append-only segment files.
+
+Each archived order is one frame, its JSON payload deflated against the shared
+`PAYLOAD_DICTIONARY` of `app.repositories.compact`, appended to the current
+segment file. An in-memory id -> (segment, offset, length) index serves a point
+read with one `pread`; the header fields of the record are rebuilt from the
+payload. Removing an order only drops it from the index, and a sealed segment
+file is deleted once none of its orders is live.
+
+The segments live in a private directory under the configured path that is
+removed on close, matching the process lifetime of the in-memory store.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import zlib
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from typing import Any
+
+from app.models.enums import ServiceOrderStateType
+from app.repositories.compact import PAYLOAD_DICTIONARY
+from app.repositories.memory_store import ServiceOrderRecord
+
+# Location of an archived order: (segment number, byte offset, frame length).
+FrameLocation = tuple[int, int, int]
+
+_WBITS = -15  # raw deflate, as in app.repositories.compact
+# Frames read per lock acquisition when scanning the archive.
+_SCAN_CHUNK = 256
+
+
+class SegmentArchive:
+    """
+    Append-only segment store for archived (cold) orders.
+
+    Thread-safe: writes, point reads and scans share one lock; frames are
+    compressed and decoded outside of it.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self._directory = tempfile.mkdtemp(prefix="archive-", dir=directory)
+        self._segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._index: dict[str, FrameLocation] = {}
+        self._live: Counter[int] = Counter()
+        self._files: dict[int, int] = {}
+        self._segment = 0
+        self._segment_size = 0
+        self._open_segment(0)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, service_order_id: object) -> bool:
+        return service_order_id in self._index
+
+    def put(self, records: Iterable[ServiceOrderRecord]) -> None:
+        """Append `records` (unpacked), replacing any archived copy with the same id."""
+
+        frames = [(record.id, _compress(record.payload)) for record in records]
+        with self._lock:
+            for service_order_id, frame in frames:
+                if self._segment_size and self._segment_size + len(frame) > self._segment_bytes:
+                    self._open_segment(self._segment + 1)
+                os.write(self._files[self._segment], frame)
+                self._forget(service_order_id)
+                self._index[service_order_id] = (self._segment, self._segment_size, len(frame))
+                self._live[self._segment] += 1
+                self._segment_size += len(frame)
+
+    def get(self, service_order_id: str) -> ServiceOrderRecord | None:
+        with self._lock:
+            location = self._index.get(service_order_id)
+            frame = None if location is None else self._read(location)
+        return None if frame is None else record_from_payload(_decompress(frame))
+
+    def get_many(self, service_order_ids: Iterable[str]) -> dict[str, ServiceOrderRecord]:
+        """Archived orders by id for the ids that are archived."""
+
+        with self._lock:
+            frames = {
+                service_order_id: self._read(self._index[service_order_id])
+                for service_order_id in service_order_ids
+                if service_order_id in self._index
+            }
+        return {
+            service_order_id: record_from_payload(_decompress(frame))
+            for service_order_id, frame in frames.items()
+        }
+
+    def remove(self, service_order_id: str) -> bool:
+        with self._lock:
+            return self._forget(service_order_id)
+
+    def records(self) -> Iterator[ServiceOrderRecord]:
+        """
+        Every archived order, read in file order.
+
+        The ids are taken up front; each chunk is read under the lock and skips the
+        orders removed or rewritten since, so a concurrent write never fails a scan.
+        """
+
+        with self._lock:
+            ordered = sorted(self._index.items(), key=lambda item: item[1])
+        for start in range(0, len(ordered), _SCAN_CHUNK):
+            with self._lock:
+                frames = [
+                    self._read(location)
+                    for service_order_id, location in ordered[start : start + _SCAN_CHUNK]
+                    if self._index.get(service_order_id) == location
+                ]
+            yield from (record_from_payload(_decompress(frame)) for frame in frames)
+
+    def close(self) -> None:
+        with self._lock:
+            for descriptor in self._files.values():
+                os.close(descriptor)
+            self._files.clear()
+            self._index.clear()
+            self._live.clear()
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+    def _open_segment(self, segment: int) -> None:
+        if segment and not self._live[self._segment]:
+            self._drop_segment(self._segment)
+        self._segment = segment
+        self._segment_size = 0
+        self._files[segment] = os.open(
+            self._path(segment), os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o600
+        )
+
+    def _read(self, location: FrameLocation) -> bytes:
+        segment, offset, length = location
+        return os.pread(self._files[segment], length, offset)
+
+    def _forget(self, service_order_id: str) -> bool:
+        location = self._index.pop(service_order_id, None)
+        if location is None:
+            return False
+        segment = location[0]
+        self._live[segment] -= 1
+        if not self._live[segment]:
+            del self._live[segment]
+            if segment != self._segment:
+                self._drop_segment(segment)
+        return True
+
+    def _drop_segment(self, segment: int) -> None:
+        os.close(self._files.pop(segment))
+        os.unlink(self._path(segment))
+
+    def _path(self, segment: int) -> str:
+        return os.path.join(self._directory, f"segment-{segment:06d}.seg")
+
+
+def record_from_payload(payload: bytes) -> ServiceOrderRecord:
+    """Stored record of an order JSON payload; the header fields are read from the JSON."""
+
+    order = json.loads(payload)
+    state = order.get("state")
+    return ServiceOrderRecord(
+        id=order["id"],
+        href=order.get("href"),
+        state=None if state is None else ServiceOrderStateType(state),
+        category=order.get("category"),
+        external_id=order.get("externalId"),
+        priority=order.get("priority"),
+        order_date=_datetime(order, "orderDate"),
+        completion_date=_datetime(order, "completionDate"),
+        requested_start_date=_datetime(order, "requestedStartDate"),
+        requested_completion_date=_datetime(order, "requestedCompletionDate"),
+        expected_completion_date=_datetime(order, "expectedCompletionDate"),
+        start_date=_datetime(order, "startDate"),
+        payload=payload,
+    )
+
+
+def _datetime(order: dict[str, Any], field: str) -> datetime | None:
+    value = order.get(field)
+    return None if value is None else datetime.fromisoformat(value)
+
+
+def _compress(payload: bytes) -> bytes:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, _WBITS, zdict=PAYLOAD_DICTIONARY)
+    return compressor.compress(payload) + compressor.flush()
+
+
+def _decompress(frame: bytes) -> bytes:
+    return zlib.decompressobj(_WBITS, zdict=PAYLOAD_DICTIONARY).decompress(frame)
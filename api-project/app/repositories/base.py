@@ -0,0 +1,92 @@
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime
+from typing import Protocol
+
+from app.models.service_order import ServiceOrder
+from app.repositories.memory_store import (
+    HubListenerRecord,
+    RecordSelector,
+    ServiceOrderChange,
+    ServiceOrderRecord,
+    StatsKey,
+)
+
+
+class Repository(Protocol):
+    """Storage operations the services rely on; implemented by every state backend."""
+
+    def warm_up(self) -> None: ...
+
+    def close(self) -> None: ...
+
+    def next_service_order_id(self) -> str: ...
+
+    def count_service_orders(self) -> int: ...
+
+    def list_service_order_records(
+        self, select: RecordSelector | None = ...
+    ) -> list[ServiceOrderRecord]: ...
+
+    def get_service_order_record(self, service_order_id: str) -> ServiceOrderRecord | None: ...
+
+    def get_service_order_records(
+        self, service_order_ids: Iterable[str]
+    ) -> dict[str, ServiceOrderRecord]: ...
+
+    def list_service_orders(self) -> list[ServiceOrder]: ...
+
+    def get_service_order(self, service_order_id: str) -> ServiceOrder | None: ...
+
+    def create_service_order(self, service_order: ServiceOrder) -> ServiceOrderRecord: ...
+
+    def update_service_order(self, service_order: ServiceOrder) -> ServiceOrderRecord: ...
+
+    def update_service_order_record(self, record: ServiceOrderRecord) -> ServiceOrderRecord: ...
+
+    def delete_service_order(self, service_order_id: str) -> bool: ...
+
+    def list_service_order_changes(
+        self, since: int, limit: int
+    ) -> tuple[list[ServiceOrderChange], int]: ...
+
+    def search_service_order_records(
+        self,
+        terms: frozenset[str] = ...,
+        attributes: frozenset[tuple[str, str]] = ...,
+        select: RecordSelector | None = ...,
+    ) -> list[ServiceOrderRecord]: ...
+
+    def archive_service_orders(self, completed_before: datetime) -> int: ...
+
+    def list_archived_service_order_records(
+        self,
+        terms: frozenset[str] = ...,
+        attributes: frozenset[tuple[str, str]] = ...,
+    ) -> list[ServiceOrderRecord]: ...
+
+    def iter_service_order_records_by_order_date(
+        self, descending: bool = ..., select: RecordSelector | None = ...
+    ) -> Iterator[ServiceOrderRecord]: ...
+
+    def service_order_stats(self) -> dict[StatsKey, int]: ...
+
+    def add_change_listener(self, listener: Callable[[str], None]) -> None: ...
+
+    def list_hub_listeners(self) -> list[HubListenerRecord]: ...
+
+    def get_hub_listener(self, listener_id: str) -> HubListenerRecord | None: ...
+
+    def create_hub_listener(self, callback: str, query: str | None) -> HubListenerRecord: ...
+
+    def delete_hub_listener(self, listener_id: str) -> bool: ...
+
+
+class ResponseCache(Protocol):
+    """
+    Create responses by Idempotency-Key; implemented by IdempotencyCache (one process)
+    and SQLiteIdempotencyCache (shared by every worker).
+    """
+
+    def run_once(self, key: str, fingerprint: str, operation: Callable[[], bytes]) -> bytes: ...
+
+    def close(self) -> None: ...
@@ -0,0 +1,76 @@
+"""
+Compact form of stored orders, used by `InMemoryStore(compact=True)`.
+
+The JSON payload, which is most of an order's footprint, is deflated against a
+shared preset dictionary. The dictionary holds the member names and enum values
+every TMF641 order repeats (`@type`, `orderItem`, `serviceCharacteristic`, roles,
+states, actions), so each order's copy of them shrinks to a back-reference. The
+low-cardinality header strings (category, priority) are interned so equal
+values share one object. Header fields stay uncompressed, so filters and stats
+never inflate a payload.
+"""
+
+from __future__ import annotations
+
+import sys
+import zlib
+from dataclasses import replace
+from typing import TYPE_CHECKING
+
+from app.models.enums import (
+    ServiceOrderActionType,
+    ServiceOrderItemStateType,
+    ServiceOrderStateType,
+    ServiceStateType,
+)
+
+if TYPE_CHECKING:
+    from app.repositories.memory_store import ServiceOrderRecord
+
+_ENUM_VALUES = " ".join(
+    member.value
+    for enum in (
+        ServiceStateType,
+        ServiceOrderItemStateType,
+        ServiceOrderActionType,
+        ServiceOrderStateType,
+    )
+    for member in enum
+)
+# zlib finds matches closest to the data first, so the most common text goes last.
+PAYLOAD_DICTIONARY = (
+    _ENUM_VALUES
+    + ' "@baseType":"","@schemaLocation":"","@referredType":"","href":"","system":""'
+    + ',"appointment":{"id":"","href":""},"completionDate":"","startDate":""'
+    + ',"orderRelationship":[{"id":"","relationshipType":""}],"supportingService":[]'
+    + ',"externalReference":[{"externalReferenceType":"","name":""}],"value":{}'
+    + '{"@type":"ServiceOrder","category":"","description":"","expectedCompletionDate":"'
+    + 'T00:00:00Z","externalId":"","href":"/serviceOrder/","id":"","note":[{"author":"",'
+    + '"date":"","text":""}],"orderDate":"","orderItem":[{"action":"add","id":"1","service":'
+    + '{"name":"","place":[{"id":"","role":""}],"serviceCharacteristic":[{"name":"",'
+    + '"value":"","valueType":"string"}],"serviceSpecification":{"id":"","name":""},'
+    + '"serviceType":"CFS"},"state":"acknowledged"}],"priority":"","relatedParty":[{'
+    + '"@referredType":"Individual","id":"","name":"","role":"customer"}],'
+    + '"requestedCompletionDate":"","requestedStartDate":"","state":"acknowledged"}'
+).encode()
+
+_WBITS = -15  # raw deflate: no zlib header or checksum per order
+
+
+def pack_record(record: ServiceOrderRecord) -> ServiceOrderRecord:
+    """Record with its payload deflated and its repeated header strings interned."""
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, _WBITS, zdict=PAYLOAD_DICTIONARY)
+    return replace(
+        record,
+        category=None if record.category is None else sys.intern(record.category),
+        priority=None if record.priority is None else sys.intern(record.priority),
+        payload=compressor.compress(record.payload) + compressor.flush(),
+    )
+
+
+def unpack_record(record: ServiceOrderRecord) -> ServiceOrderRecord:
+    """Inverse of `pack_record`: the same record with its JSON payload restored."""
+
+    decompressor = zlib.decompressobj(_WBITS, zdict=PAYLOAD_DICTIONARY)
+    return replace(record, payload=decompressor.decompress(record.payload))
@@ -0,0 +1,37 @@
+from app.repositories.archive import SegmentArchive
+from app.repositories.base import Repository, ResponseCache
+from app.repositories.idempotency_cache import IdempotencyCache
+from app.repositories.memory_store import InMemoryStore
+from app.repositories.sqlite_idempotency_cache import SQLiteIdempotencyCache
+from app.repositories.sqlite_store import SQLiteStore
+from app.settings import Settings
+
+
+def build_store(settings: Settings) -> Repository:
+    """Create the state backend selected by `settings.storage_backend`."""
+
+    if settings.storage_backend == "sqlite":
+        return SQLiteStore(
+            settings.sqlite_path, change_retention_seconds=settings.change_retention_seconds
+        )
+    archive = None if settings.archive_path is None else SegmentArchive(settings.archive_path)
+    return InMemoryStore(
+        compact=settings.storage_compact,
+        archive=archive,
+        change_retention_seconds=settings.change_retention_seconds,
+    )
+
+
+def build_idempotency_cache(settings: Settings) -> ResponseCache:
+    """Idempotency-Key cache next to the state: shared by the workers with `sqlite`."""
+
+    if settings.storage_backend == "sqlite":
+        return SQLiteIdempotencyCache(
+            settings.sqlite_path,
+            max_entries=settings.idempotency_cache_size,
+            ttl_seconds=settings.idempotency_ttl_seconds,
+        )
+    return IdempotencyCache(
+        max_entries=settings.idempotency_cache_size,
+        ttl_seconds=settings.idempotency_ttl_seconds,
+    )
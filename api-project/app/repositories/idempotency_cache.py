@@ -0,0 +1,126 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from threading import Event, Lock
+
+from app.utils.errors import ConflictError
+
+
+@dataclass(frozen=True)
+class IdempotencyRecord:
+    fingerprint: str
+    response: bytes
+    created_at: float
+
+    def replay(self, key: str, fingerprint: str) -> bytes:
+        """The stored response, for a request with the same `fingerprint` only."""
+
+        if self.fingerprint != fingerprint:
+            raise ConflictError(
+                f"Idempotency-Key '{key}' was already used with a different request payload."
+            )
+        return self.response
+
+
+class IdempotencyCache:
+    """
+    Bounded, TTL-evicting cache of create responses keyed by Idempotency-Key.
+
+    - entries expire `ttl_seconds` after they were stored
+    - when `max_entries` is exceeded the oldest entry is evicted
+    - concurrent requests with the same key wait for the first one to finish
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 86400.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive.")
+
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = Lock()
+        self._entries: OrderedDict[str, IdempotencyRecord] = OrderedDict()
+        self._in_flight: dict[str, Event] = {}
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict_expired()
+            return len(self._entries)
+
+    def get(self, key: str) -> IdempotencyRecord | None:
+        with self._lock:
+            self._evict_expired()
+            return self._entries.get(key)
+
+    def put(self, key: str, fingerprint: str, response: bytes) -> IdempotencyRecord:
+        with self._lock:
+            return self._store(key, fingerprint, response)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def close(self) -> None:
+        self.clear()
+
+    def run_once(
+        self,
+        key: str,
+        fingerprint: str,
+        operation: Callable[[], bytes],
+    ) -> bytes:
+        """
+        Return the cached response for `key` or run `operation` and cache its result.
+
+        Raises ConflictError when `key` was already used for a different request.
+        Failed operations are not cached, so the client can retry with the same key.
+        """
+
+        while True:
+            with self._lock:
+                self._evict_expired()
+                record = self._entries.get(key)
+                if record is not None:
+                    return record.replay(key, fingerprint)
+
+                pending = self._in_flight.get(key)
+                if pending is None:
+                    self._in_flight[key] = Event()
+                    break
+            pending.wait()
+
+        try:
+            response = operation()
+            with self._lock:
+                self._store(key, fingerprint, response)
+            return response
+        finally:
+            with self._lock:
+                self._in_flight.pop(key).set()
+
+    def _store(self, key: str, fingerprint: str, response: bytes) -> IdempotencyRecord:
+        record = IdempotencyRecord(
+            fingerprint=fingerprint, response=response, created_at=self._clock()
+        )
+        self._entries.pop(key, None)
+        self._entries[key] = record
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return record
+
+    def _evict_expired(self) -> None:
+        # Entries are kept in insertion order and share one TTL, so expired ones are at the front.
+        deadline = self._clock() - self._ttl_seconds
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest.created_at > deadline:
+                break
+            self._entries.popitem(last=False)
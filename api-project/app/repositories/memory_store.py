@@ -1,9 +1,24 @@
+from __future__ import annotations
+
+import json
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, deque
+from collections.abc import Callable, Iterable, Iterator
 from dataclasses import dataclass
+from datetime import UTC, datetime
 from itertools import count
-from threading import RLock
+from typing import TYPE_CHECKING
 
+from app.models.enums import TERMINAL_SERVICE_ORDER_STATES, ServiceOrderStateType
 from app.models.service_order import ServiceOrder
-from app.utils.errors import ConflictError
+from app.observability.metrics import STORE_LOCK_WAIT, TimedRLock
+from app.repositories.compact import pack_record, unpack_record
+from app.repositories.search import InvertedIndex, attribute_values, intersect, search_terms
+from app.utils.errors import ChangeHistoryExpiredError, ConflictError
+
+if TYPE_CHECKING:
+    from app.repositories.archive import SegmentArchive
 
 
 @dataclass(frozen=True)
@@ -13,19 +28,187 @@ class HubListenerRecord:
     query: str | None = None
 
 
+@dataclass(frozen=True, slots=True)
+class ServiceOrderRecord:
+    """
+    Stored form of a service order.
+
+    The full order is kept as compact, already validated JSON (`payload`); the
+    top-level scalars used for filtering and PATCH responses are kept alongside it,
+    under the same attribute names as on ServiceOrder. Records are immutable, so
+    they can be handed out without copying; `to_order()` builds the full model.
+    """
+
+    id: str
+    href: str | None
+    state: ServiceOrderStateType | None
+    category: str | None
+    external_id: str | None
+    priority: str | None
+    order_date: datetime | None
+    completion_date: datetime | None
+    requested_start_date: datetime | None
+    requested_completion_date: datetime | None
+    expected_completion_date: datetime | None
+    start_date: datetime | None
+    payload: bytes
+
+    @classmethod
+    def from_order(cls, service_order: ServiceOrder) -> ServiceOrderRecord:
+        if service_order.id is None:
+            raise ValueError("service_order.id must be set before persistence.")
+
+        return cls(
+            id=service_order.id,
+            href=service_order.href,
+            state=service_order.state,
+            category=service_order.category,
+            external_id=service_order.external_id,
+            priority=service_order.priority,
+            order_date=service_order.order_date,
+            completion_date=service_order.completion_date,
+            requested_start_date=service_order.requested_start_date,
+            requested_completion_date=service_order.requested_completion_date,
+            expected_completion_date=service_order.expected_completion_date,
+            start_date=service_order.start_date,
+            payload=service_order.model_dump_json(by_alias=True, exclude_none=True).encode(),
+        )
+
+    def to_order(self) -> ServiceOrder:
+        return ServiceOrder.model_validate_json(self.payload)
+
+
+@dataclass(frozen=True, slots=True)
+class ServiceOrderChange:
+    """
+    Latest change of one service order in the change feed.
+
+    `kind` is `create`, `update` or `delete`; `record` is the current order, or
+    None for a delete (a tombstone).
+    """
+
+    sequence: int
+    kind: str
+    id: str
+    record: ServiceOrderRecord | None
+
+
+# Picks records by their header fields, for example filters, sort and limit. Stores
+# apply it before reading payloads, which may still be packed when it runs.
+RecordSelector = Callable[[list[ServiceOrderRecord]], list[ServiceOrderRecord]]
+
+# Order counter group: (state, category, priority, orderDate truncated to the UTC hour).
+StatsKey = tuple[str | None, str | None, str | None, datetime | None]
+
+
+def stats_key(record: ServiceOrderRecord) -> StatsKey:
+    """Counter group an order belongs to in `service_order_stats()`."""
+
+    order_hour = None
+    if record.order_date is not None:
+        order_date = record.order_date
+        if order_date.tzinfo is None:
+            order_date = order_date.replace(tzinfo=UTC)
+        order_hour = order_date.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+    return (
+        None if record.state is None else record.state.value,
+        record.category,
+        record.priority,
+        order_hour,
+    )
+
+
+# Keys of an order in the text and nested-attribute indexes.
+IndexKeys = tuple[frozenset[str], frozenset[tuple[str, str]]]
+
+_NO_TERMS: frozenset[str] = frozenset()
+_NO_ATTRIBUTES: frozenset[tuple[str, str]] = frozenset()
+_NO_KEYS: IndexKeys = (_NO_TERMS, _NO_ATTRIBUTES)
+_EARLIEST = datetime.min.replace(tzinfo=UTC)
+# How long delete tombstones stay in the change feed by default (7 days).
+DEFAULT_CHANGE_RETENTION_SECONDS = 7 * 86400.0
+# Orders read per lock acquisition by `iter_service_order_records_by_order_date`.
+_ORDERED_CHUNK = 256
+# Orders moved per lock acquisition by `archive_service_orders`.
+_ARCHIVE_CHUNK = 256
+
+
 class InMemoryStore:
     """
     In-memory persistence for demo purposes.
 
-    Data is kept only for the process lifetime.
+    Data is kept only for the process lifetime. With `compact=True` records are
+    kept in packed form (see `app.repositories.compact`): several times smaller,
+    at the cost of inflating each payload when it is read.
+
+    With an `archive`, `archive_service_orders` moves old terminal orders out of
+    the hot maps and indexes into on-disk segments (see `app.repositories.archive`).
+    Point reads, updates and deletes still find archived orders; listings, search
+    and stats cover the hot orders, and `list_archived_service_order_records`
+    scans the archive on request. Updating an archived order makes it hot again.
+
+    Delete tombstones stay in the change feed for `change_retention_seconds`;
+    reading the feed from before a dropped tombstone raises ChangeHistoryExpiredError.
     """
 
-    def __init__(self) -> None:
-        self._lock = RLock()
+    def __init__(
+        self,
+        compact: bool = False,
+        archive: SegmentArchive | None = None,
+        change_retention_seconds: float = DEFAULT_CHANGE_RETENTION_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._compact = compact
+        self._archive = archive
+        self._change_retention_seconds = change_retention_seconds
+        self._clock = clock
+        self._lock = TimedRLock(STORE_LOCK_WAIT.labels())
         self._service_order_sequence = count(1)
         self._hub_sequence = count(1)
-        self._service_orders: dict[str, ServiceOrder] = {}
+        self._service_orders: dict[str, ServiceOrderRecord] = {}
         self._hub_listeners: dict[str, HubListenerRecord] = {}
+        # Change index: order id -> (sequence, kind) of its latest change, and the
+        # (sequence, id) of every change, sorted, so a feed page is a bisect and a
+        # forward scan. A superseded change stays in the log and is skipped, since
+        # removing it would shift the list; the log is compacted once superseded
+        # entries outnumber the latest ones. O(orders + tombstones).
+        self._change_sequence = count(1)
+        self._last_change_sequence = 0
+        self._changes: dict[str, tuple[int, str]] = {}
+        self._change_log: list[tuple[int, str]] = []
+        # (deleted at, sequence, id) of delete tombstones, oldest first, and the sequence
+        # of the latest tombstone dropped after the retention period.
+        self._tombstones: deque[tuple[float, int, str]] = deque()
+        self._change_horizon = 0
+        self._change_listeners: list[Callable[[str], None]] = []
+        # Order counts per stats group, adjusted on every create, update and delete.
+        self._stats: Counter[StatsKey] = Counter()
+        self._text_index = InvertedIndex[str]()
+        self._attribute_index = InvertedIndex[tuple[str, str]]()
+        # Ordered index: (orderDate, id) of every order, sorted. orderDate is assigned on
+        # creation, so inserts are appends in practice. Removed keys are marked stale
+        # rather than deleted from the list and skipped by readers, then compacted
+        # away in bulk like the change log.
+        self._by_order_date: list[tuple[datetime, str]] = []
+        self._stale_order_dates: set[tuple[datetime, str]] = set()
+
+    def warm_up(self) -> None:
+        """Nothing to prepare: state starts empty for every process."""
+
+    def close(self) -> None:
+        with self._lock:
+            self._service_orders.clear()
+            self._hub_listeners.clear()
+            self._changes.clear()
+            self._change_log.clear()
+            self._tombstones.clear()
+            self._stats.clear()
+            self._text_index.clear()
+            self._attribute_index.clear()
+            self._by_order_date.clear()
+            self._stale_order_dates.clear()
+        if self._archive is not None:
+            self._archive.close()
 
     def next_service_order_id(self) -> str:
         with self._lock:
@@ -35,41 +218,262 @@ class InMemoryStore:
         with self._lock:
             return str(next(self._hub_sequence))
 
-    def list_service_orders(self) -> list[ServiceOrder]:
+    def count_service_orders(self) -> int:
+        return len(self._service_orders)
+
+    def list_service_order_records(
+        self, select: RecordSelector | None = None
+    ) -> list[ServiceOrderRecord]:
+        """Every hot order, or the ones `select` picks; only those are inflated."""
+
         with self._lock:
-            return [order.model_copy(deep=True) for order in self._service_orders.values()]
+            records = list(self._service_orders.values())
+        return self._inflated(records if select is None else select(records))
 
-    def get_service_order(self, service_order_id: str) -> ServiceOrder | None:
+    def get_service_order_record(self, service_order_id: str) -> ServiceOrderRecord | None:
         with self._lock:
-            order = self._service_orders.get(service_order_id)
-            return None if order is None else order.model_copy(deep=True)
+            record = self._service_orders.get(service_order_id)
+        if record is None and self._archive is not None:
+            return self._archive.get(service_order_id)
+        return self._unpacked(record)
 
-    def create_service_order(self, service_order: ServiceOrder) -> ServiceOrder:
-        if service_order.id is None:
-            raise ValueError("service_order.id must be set before persistence.")
+    def get_service_order_records(
+        self, service_order_ids: Iterable[str]
+    ) -> dict[str, ServiceOrderRecord]:
+        """Stored orders by id for the ids that exist, read under one lock acquisition."""
 
         with self._lock:
-            if service_order.id in self._service_orders:
-                raise ConflictError(f"ServiceOrder with id '{service_order.id}' already exists.")
-            self._service_orders[service_order.id] = service_order.model_copy(deep=True)
-            return service_order.model_copy(deep=True)
+            found = {
+                service_order_id: self._service_orders[service_order_id]
+                for service_order_id in service_order_ids
+                if service_order_id in self._service_orders
+            }
+        if self._compact:
+            found = {order_id: unpack_record(record) for order_id, record in found.items()}
+        if self._archive is not None:
+            missing = [order_id for order_id in service_order_ids if order_id not in found]
+            found.update(self._archive.get_many(missing))
+        return found
 
-    def update_service_order(self, service_order: ServiceOrder) -> ServiceOrder:
-        if service_order.id is None:
-            raise ValueError("service_order.id must be set before persistence.")
+    def list_service_orders(self) -> list[ServiceOrder]:
+        return [record.to_order() for record in self.list_service_order_records()]
+
+    def get_service_order(self, service_order_id: str) -> ServiceOrder | None:
+        record = self.get_service_order_record(service_order_id)
+        return None if record is None else record.to_order()
+
+    def create_service_order(self, service_order: ServiceOrder) -> ServiceOrderRecord:
+        record = ServiceOrderRecord.from_order(service_order)
+        keys = _index_keys(record)
+
+        with self._lock:
+            if record.id in self._service_orders or (
+                self._archive is not None and record.id in self._archive
+            ):
+                raise ConflictError(f"ServiceOrder with id '{record.id}' already exists.")
+            self._insert(record, keys)
+            self._record_change(record.id, "create")
+            return record
+
+    def update_service_order(self, service_order: ServiceOrder) -> ServiceOrderRecord:
+        return self.update_service_order_record(ServiceOrderRecord.from_order(service_order))
+
+    def update_service_order_record(self, record: ServiceOrderRecord) -> ServiceOrderRecord:
+        """Replace a stored order with an already built record (header and payload)."""
+
+        keys = _index_keys(record)
 
         with self._lock:
-            if service_order.id not in self._service_orders:
-                raise KeyError(service_order.id)
-            self._service_orders[service_order.id] = service_order.model_copy(deep=True)
-            return service_order.model_copy(deep=True)
+            previous = self._service_orders.get(record.id)
+            if previous is None:
+                if self._archive is None or not self._archive.remove(record.id):
+                    raise KeyError(record.id)
+                self._insert(record, keys)
+                self._record_change(record.id, "update")
+                return record
+            self._service_orders[record.id] = self._packed(record)
+            self._move_stats(stats_key(previous), stats_key(record))
+            self._index(record.id, self._keys(previous), keys)
+            if previous.order_date != record.order_date:
+                self._unindex_order_date(previous)
+                self._index_order_date(record)
+            self._record_change(record.id, "update")
+            return record
 
     def delete_service_order(self, service_order_id: str) -> bool:
         with self._lock:
-            existed = service_order_id in self._service_orders
-            if existed:
-                del self._service_orders[service_order_id]
-            return existed
+            previous = self._service_orders.get(service_order_id)
+            if previous is not None:
+                self._evict(previous)
+            elif self._archive is None or not self._archive.remove(service_order_id):
+                return False
+            self._record_change(service_order_id, "delete")
+            return True
+
+    def archive_service_orders(self, completed_before: datetime) -> int:
+        """
+        Move the terminal orders completed before `completed_before` (by
+        `completionDate`, else `orderDate`) to the archive; returns the number moved.
+
+        Candidates are picked from a snapshot and written to the archive outside the
+        lock. An order is only evicted if it was not replaced meanwhile, so a
+        concurrent update keeps it hot; reads find it in one tier or the other
+        throughout. Not a change: no change entry is recorded and listeners are not
+        called.
+        """
+
+        if self._archive is None:
+            return 0
+        with self._lock:
+            stored = list(self._service_orders.values())
+        candidates = [
+            record
+            for record in stored
+            if record.state in TERMINAL_SERVICE_ORDER_STATES
+            and _completed_at(record) < completed_before
+        ]
+        moved = 0
+        for start in range(0, len(candidates), _ARCHIVE_CHUNK):
+            chunk = candidates[start : start + _ARCHIVE_CHUNK]
+            self._archive.put(
+                unpack_record(record) if self._compact else record for record in chunk
+            )
+            with self._lock:
+                for record in chunk:
+                    if self._service_orders.get(record.id) is record:
+                        self._evict(record)
+                        moved += 1
+                    else:
+                        self._archive.remove(record.id)
+        return moved
+
+    def list_archived_service_order_records(
+        self,
+        terms: frozenset[str] = _NO_TERMS,
+        attributes: frozenset[tuple[str, str]] = _NO_ATTRIBUTES,
+    ) -> list[ServiceOrderRecord]:
+        """
+        Archived orders with every term and attribute (see `search_service_order_records`),
+        found by scanning and inflating every archived order.
+        """
+
+        if self._archive is None:
+            return []
+        if not (terms or attributes):
+            return list(self._archive.records())
+        return [
+            record
+            for record in self._archive.records()
+            if _has_keys(_index_keys(record), terms, attributes)
+        ]
+
+    def list_service_order_changes(
+        self, since: int, limit: int
+    ) -> tuple[list[ServiceOrderChange], int]:
+        """
+        Return up to `limit` changes with a sequence above `since` (oldest first) and
+        the sequence of the latest change in the store.
+
+        Raises ChangeHistoryExpiredError when a delete after `since` may have been
+        dropped from the feed (`since=0` always works: it has no state to correct).
+        """
+
+        with self._lock:
+            self._drop_expired_tombstones()
+            if 0 < since < self._change_horizon:
+                raise ChangeHistoryExpiredError(
+                    f"Changes up to sequence {self._change_horizon} were compacted."
+                )
+            log = self._change_log
+            changes: list[ServiceOrderChange] = []
+            skipped = 0
+            for index in range(bisect_left(log, (since + 1,)), len(log)):
+                if len(changes) == limit:
+                    break
+                sequence, service_order_id = log[index]
+                latest = self._changes.get(service_order_id)
+                if latest is None or latest[0] != sequence:
+                    skipped += 1
+                    continue
+                kind = latest[1]
+                changes.append(
+                    ServiceOrderChange(
+                        sequence=sequence,
+                        kind=kind,
+                        id=service_order_id,
+                        record=self._change_record(service_order_id, kind),
+                    )
+                )
+            if skipped > 2 * len(changes) + 256:
+                # A run of superseded entries (a resync after a burst of updates): drop
+                # them now rather than scanning them again on the next page.
+                self._compact_change_log()
+            return changes, self._last_change_sequence
+
+    def search_service_order_records(
+        self,
+        terms: frozenset[str] = _NO_TERMS,
+        attributes: frozenset[tuple[str, str]] = _NO_ATTRIBUTES,
+        select: RecordSelector | None = None,
+    ) -> list[ServiceOrderRecord]:
+        """
+        Orders whose searchable text contains every term and that have every
+        `(path, value)` attribute (see `app.repositories.search`), oldest `orderDate`
+        first, then narrowed by `select`. Served from the indexes; at least one term
+        or attribute is expected.
+        """
+
+        with self._lock:
+            matched = intersect(
+                [
+                    *self._text_index.postings(terms),
+                    *self._attribute_index.postings(attributes),
+                ]
+            )
+            records = [self._service_orders[order_id] for order_id in matched]
+        records.sort(key=lambda record: (record.order_date or _EARLIEST, record.id))
+        return self._inflated(records if select is None else select(records))
+
+    def iter_service_order_records_by_order_date(
+        self, descending: bool = False, select: RecordSelector | None = None
+    ) -> Iterator[ServiceOrderRecord]:
+        """
+        All orders by `orderDate` (then id), missing dates first, read lazily from the
+        ordered index.
+
+        Each chunk is read under the lock and the next one resumes after the last
+        index key returned, so concurrent writes neither repeat nor skip an order.
+        `select` is applied to each chunk; only the orders it picks are inflated.
+        """
+
+        index = self._by_order_date
+        after: tuple[datetime, str] | None = None
+        while True:
+            with self._lock:
+                if descending:
+                    end = len(index) if after is None else bisect_left(index, after)
+                    keys = index[max(0, end - _ORDERED_CHUNK) : end][::-1]
+                else:
+                    start = 0 if after is None else bisect_right(index, after)
+                    keys = index[start : start + _ORDERED_CHUNK]
+                stale = self._stale_order_dates
+                records = [self._service_orders[key[1]] for key in keys if key not in stale]
+            if not keys:
+                return
+            after = keys[-1]
+            selected = records if select is None else select(records)
+            yield from (unpack_record(record) for record in selected) if self._compact else selected
+
+    def service_order_stats(self) -> dict[StatsKey, int]:
+        """Order count per stats group (see `stats_key`); O(groups), no order is read."""
+
+        with self._lock:
+            return dict(self._stats)
+
+    def add_change_listener(self, listener: Callable[[str], None]) -> None:
+        """Call `listener(service_order_id)` after every create, update and delete."""
+
+        self._change_listeners.append(listener)
 
     def list_hub_listeners(self) -> list[HubListenerRecord]:
         with self._lock:
@@ -93,3 +497,121 @@ class InMemoryStore:
                 del self._hub_listeners[listener_id]
             return existed
 
+    def _packed(self, record: ServiceOrderRecord) -> ServiceOrderRecord:
+        return pack_record(record) if self._compact else record
+
+    def _inflated(self, records: list[ServiceOrderRecord]) -> list[ServiceOrderRecord]:
+        return [unpack_record(record) for record in records] if self._compact else records
+
+    def _unpacked(self, record: ServiceOrderRecord | None) -> ServiceOrderRecord | None:
+        return unpack_record(record) if self._compact and record is not None else record
+
+    def _change_record(self, service_order_id: str, kind: str) -> ServiceOrderRecord | None:
+        record = self._unpacked(self._service_orders.get(service_order_id))
+        if record is None and kind != "delete" and self._archive is not None:
+            return self._archive.get(service_order_id)
+        return record
+
+    def _insert(self, record: ServiceOrderRecord, keys: IndexKeys) -> None:
+        self._service_orders[record.id] = self._packed(record)
+        self._stats[stats_key(record)] += 1
+        self._index(record.id, _NO_KEYS, keys)
+        self._index_order_date(record)
+
+    def _evict(self, stored: ServiceOrderRecord) -> None:
+        del self._service_orders[stored.id]
+        self._move_stats(stats_key(stored), None)
+        self._index(stored.id, self._keys(stored), _NO_KEYS)
+        self._unindex_order_date(stored)
+
+    def _keys(self, stored: ServiceOrderRecord) -> IndexKeys:
+        return _index_keys(unpack_record(stored) if self._compact else stored)
+
+    def _index(self, service_order_id: str, previous: IndexKeys, current: IndexKeys) -> None:
+        self._text_index.update(service_order_id, previous[0], current[0])
+        self._attribute_index.update(service_order_id, previous[1], current[1])
+
+    def _index_order_date(self, record: ServiceOrderRecord) -> None:
+        key = _order_date_key(record)
+        if key in self._stale_order_dates:
+            # Same id and orderDate as a removed order: its entry is still in the list.
+            self._stale_order_dates.remove(key)
+        else:
+            insort(self._by_order_date, key)
+
+    def _unindex_order_date(self, record: ServiceOrderRecord) -> None:
+        stale = self._stale_order_dates
+        stale.add(_order_date_key(record))
+        if len(stale) > len(self._by_order_date) // 2 + 64:
+            # In place: readers hold a reference to the list between chunks.
+            self._by_order_date[:] = [key for key in self._by_order_date if key not in stale]
+            stale.clear()
+
+    def _move_stats(self, previous: StatsKey, current: StatsKey | None) -> None:
+        if previous == current:
+            return
+        if current is not None:
+            self._stats[current] += 1
+        self._stats[previous] -= 1
+        if not self._stats[previous]:
+            del self._stats[previous]
+
+    def _record_change(self, service_order_id: str, kind: str) -> None:
+        sequence = self._last_change_sequence = next(self._change_sequence)
+        self._changes[service_order_id] = (sequence, kind)
+        # Sequences only grow, so the log stays sorted; the order's previous entry is
+        # now superseded.
+        self._change_log.append((sequence, service_order_id))
+        if kind == "delete":
+            self._tombstones.append((self._clock(), sequence, service_order_id))
+        self._drop_expired_tombstones()
+        if len(self._change_log) > 2 * len(self._changes) + 64:
+            self._compact_change_log()
+        for listener in self._change_listeners:
+            listener(service_order_id)
+
+    def _compact_change_log(self) -> None:
+        changes = self._changes
+        self._change_log = [
+            (sequence, service_order_id)
+            for sequence, service_order_id in self._change_log
+            if changes.get(service_order_id, (None,))[0] == sequence
+        ]
+
+    def _drop_expired_tombstones(self) -> None:
+        expired_before = self._clock() - self._change_retention_seconds
+        while self._tombstones and self._tombstones[0][0] <= expired_before:
+            _, sequence, service_order_id = self._tombstones.popleft()
+            # An order recreated under the same id has a newer change that stays.
+            if self._changes.get(service_order_id, (None,))[0] == sequence:
+                del self._changes[service_order_id]
+            self._change_horizon = sequence
+
+
+def _order_date_key(record: ServiceOrderRecord) -> tuple[datetime, str]:
+    order_date = record.order_date
+    if order_date is None:
+        return _EARLIEST, record.id
+    if order_date.tzinfo is None:
+        order_date = order_date.replace(tzinfo=UTC)
+    return order_date, record.id
+
+
+def _completed_at(record: ServiceOrderRecord) -> datetime:
+    completed_at = record.completion_date or record.order_date
+    if completed_at is None:
+        return _EARLIEST
+    if completed_at.tzinfo is None:
+        completed_at = completed_at.replace(tzinfo=UTC)
+    return completed_at
+
+
+def _index_keys(record: ServiceOrderRecord) -> IndexKeys:
+    order = json.loads(record.payload)
+    return search_terms(order), attribute_values(order)
+
+
+def _has_keys(
+    keys: IndexKeys, terms: frozenset[str], attributes: frozenset[tuple[str, str]]
+) -> bool:
+    return terms <= keys[0] and attributes <= keys[1]
@@ -0,0 +1,144 @@
+"""
+Search keys of stored orders and the in-memory inverted indexes behind them.
+
+Full-text search (`q=`): an order's searchable text is its `description`, every
+`note[].text`, and for each (nested) order item the `service.name` and string
+`serviceCharacteristic` values. Text is split into lowercase alphanumeric words;
+a query matches the orders that contain all of its words.
+
+Nested-attribute filters (`relatedParty.id=...`): for each path in
+`NESTED_FILTER_PATHS`, the string values found under it (through any arrays on
+the way) are indexed as `(path, value)` pairs; a filter matches the orders that
+have the value anywhere under the path.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Collection, Iterable, Iterator, Mapping
+from typing import Any, Generic, TypeVar
+
+from app.utils.errors import InvalidFilterError
+
+KeyT = TypeVar("KeyT")
+
+NESTED_FILTER_PATHS = frozenset(
+    {
+        "relatedParty.id",
+        "orderRelationship.id",
+        "orderItem.relatedParty.id",
+        "orderItem.service.id",
+        "orderItem.service.serviceSpecification.id",
+    }
+)
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def search_terms(order: Mapping[str, Any]) -> frozenset[str]:
+    """Words of the searchable text of a ServiceOrder in its JSON form."""
+
+    return frozenset(
+        word.casefold() for text in _searchable_text(order) for word in _WORD.findall(text)
+    )
+
+
+def query_terms(query: str) -> frozenset[str]:
+    terms = frozenset(word.casefold() for word in _WORD.findall(query))
+    if not terms:
+        raise InvalidFilterError("Query parameter 'q' must contain at least one word.")
+    return terms
+
+
+def attribute_values(order: Mapping[str, Any]) -> frozenset[tuple[str, str]]:
+    """`(path, value)` pairs of a ServiceOrder in its JSON form, for `NESTED_FILTER_PATHS`."""
+
+    return frozenset(
+        (path, value)
+        for path in NESTED_FILTER_PATHS
+        for value in _path_values(order, path.split("."))
+    )
+
+
+class InvertedIndex(Generic[KeyT]):
+    """
+    Key -> order ids posting sets, updated per order.
+
+    Not thread-safe: the owning store calls it under its own lock.
+    """
+
+    def __init__(self) -> None:
+        self._postings: dict[KeyT, set[str]] = {}
+
+    def update(
+        self, order_id: str, previous: frozenset[KeyT], current: frozenset[KeyT]
+    ) -> None:
+        """Move `order_id` from the `previous` to the `current` keys (either may be empty)."""
+
+        for key in previous - current:
+            postings = self._postings[key]
+            postings.discard(order_id)
+            if not postings:
+                del self._postings[key]
+        for key in current - previous:
+            self._postings.setdefault(key, set()).add(order_id)
+
+    def postings(self, keys: Iterable[KeyT]) -> list[set[str]]:
+        """Posting set of every key (empty for unknown keys); not to be modified."""
+
+        return [self._postings.get(key, _NO_POSTINGS) for key in keys]
+
+    def clear(self) -> None:
+        self._postings.clear()
+
+
+def intersect(postings: Collection[set[str]]) -> set[str]:
+    """Intersection of posting sets, starting from the smallest; empty if none are given."""
+
+    ordered = sorted(postings, key=len)
+    if not ordered or not ordered[0]:
+        return set()
+    matched = set(ordered[0])
+    for other in ordered[1:]:
+        matched.intersection_update(other)
+        if not matched:
+            break
+    return matched
+
+
+_NO_POSTINGS: set[str] = set()
+
+
+def _searchable_text(order: Mapping[str, Any]) -> Iterator[str]:
+    description = order.get("description")
+    if isinstance(description, str):
+        yield description
+    for note in order.get("note") or ():
+        text = note.get("text")
+        if isinstance(text, str):
+            yield text
+    yield from _order_item_text(order.get("orderItem") or ())
+
+
+def _order_item_text(order_items: Iterable[Mapping[str, Any]]) -> Iterator[str]:
+    for order_item in order_items:
+        service = order_item.get("service") or {}
+        name = service.get("name")
+        if isinstance(name, str):
+            yield name
+        for characteristic in service.get("serviceCharacteristic") or ():
+            value = characteristic.get("value")
+            if isinstance(value, str):
+                yield value
+        yield from _order_item_text(order_item.get("orderItem") or ())
+
+
+def _path_values(node: Any, segments: list[str]) -> Iterator[str]:
+    if isinstance(node, list):
+        for item in node:
+            yield from _path_values(item, segments)
+    elif not segments:
+        if isinstance(node, str):
+            yield node
+    elif isinstance(node, Mapping):
+        yield from _path_values(node.get(segments[0]), segments[1:])
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from app.repositories.idempotency_cache import IdempotencyRecord
+from app.repositories.sqlite_store import connect, immediate_transaction
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS idempotency_key (
+    key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    response BLOB,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idempotency_key_created ON idempotency_key (created_at);
+"""
+
+
+class SQLiteIdempotencyCache:
+    """
+    Idempotency-Key responses in the shared SQLite database, so a retry reaching
+    another worker replays the original create instead of running it again.
+
+    Same contract as IdempotencyCache. A key is claimed with a row whose response
+    is NULL until the first request finishes; requests with the same key, in any
+    worker, poll until the response is stored or the claim is released. A claim
+    older than `claim_timeout_seconds` belongs to a worker that died mid-request
+    and is taken over. Entries expire `ttl_seconds` after they were stored (wall
+    clock, shared by every worker) and the oldest are evicted above `max_entries`.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_entries: int = 1024,
+        ttl_seconds: float = 86400.0,
+        busy_timeout_seconds: float = 30.0,
+        claim_timeout_seconds: float = 60.0,
+        poll_interval_seconds: float = 0.05,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive.")
+
+        self._path = str(path)
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._busy_timeout_seconds = busy_timeout_seconds
+        self._claim_timeout_seconds = claim_timeout_seconds
+        self._poll_interval_seconds = poll_interval_seconds
+        self._clock = clock
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        with immediate_transaction(self._connection()) as connection:
+            for statement in _SCHEMA.split(";"):
+                if statement.strip():
+                    connection.execute(statement)
+
+    def __len__(self) -> int:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT count(*) FROM idempotency_key "
+                "WHERE response IS NOT NULL AND created_at > ?",
+                (self._clock() - self._ttl_seconds,),
+            )
+            .fetchone()
+        )
+        return int(row[0])
+
+    def run_once(
+        self,
+        key: str,
+        fingerprint: str,
+        operation: Callable[[], bytes],
+    ) -> bytes:
+        """
+        Return the stored response for `key` or run `operation` and store its result.
+
+        Raises ConflictError when `key` was already used for a different request.
+        Failed operations are not stored, so the client can retry with the same key.
+        """
+
+        while True:
+            claimed, record = self._claim(key, fingerprint)
+            if record is not None:
+                return record.replay(key, fingerprint)
+            if claimed:
+                break
+            time.sleep(self._poll_interval_seconds)
+
+        try:
+            response = operation()
+        except BaseException:
+            with immediate_transaction(self._connection()) as connection:
+                connection.execute(
+                    "DELETE FROM idempotency_key WHERE key = ? AND response IS NULL", (key,)
+                )
+            raise
+        with immediate_transaction(self._connection()) as connection:
+            connection.execute(
+                "UPDATE idempotency_key SET response = ?, created_at = ? WHERE key = ?",
+                (response, self._clock(), key),
+            )
+            connection.execute(
+                "DELETE FROM idempotency_key WHERE key IN (SELECT key FROM idempotency_key "
+                "WHERE response IS NOT NULL ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self._max_entries,),
+            )
+        return response
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def _claim(self, key: str, fingerprint: str) -> tuple[bool, IdempotencyRecord | None]:
+        """
+        Whether this request claimed `key`, and the stored entry for it if there is one.
+
+        Neither means another request holds the claim and is still running.
+        """
+
+        now = self._clock()
+        with immediate_transaction(self._connection()) as connection:
+            connection.execute(
+                "DELETE FROM idempotency_key WHERE created_at <= ? AND response IS NOT NULL",
+                (now - self._ttl_seconds,),
+            )
+            row = connection.execute(
+                "SELECT fingerprint, response, created_at FROM idempotency_key WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is not None and row[1] is not None:
+                return False, IdempotencyRecord(
+                    fingerprint=row[0], response=row[1], created_at=row[2]
+                )
+            if row is not None and now - row[2] < self._claim_timeout_seconds:
+                return False, None
+            connection.execute(
+                "INSERT INTO idempotency_key (key, fingerprint, response, created_at) "
+                "VALUES (?, ?, NULL, ?) ON CONFLICT (key) DO UPDATE SET "
+                "fingerprint = excluded.fingerprint, created_at = excluded.created_at",
+                (key, fingerprint, now),
+            )
+        return True, None
+
+    def _connection(self) -> sqlite3.Connection:
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = connect(self._path, self._busy_timeout_seconds)
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
@@ -0,0 +1,563 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from app.models.enums import ServiceOrderStateType
+from app.models.service_order import ServiceOrder
+from app.repositories.memory_store import (
+    DEFAULT_CHANGE_RETENTION_SECONDS,
+    HubListenerRecord,
+    RecordSelector,
+    ServiceOrderChange,
+    ServiceOrderRecord,
+    StatsKey,
+)
+from app.repositories.search import attribute_values, search_terms
+from app.utils.errors import ChangeHistoryExpiredError, ConflictError
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sequence (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS service_order (
+    id TEXT PRIMARY KEY,
+    href TEXT,
+    state TEXT,
+    category TEXT,
+    external_id TEXT,
+    priority TEXT,
+    order_date TEXT,
+    completion_date TEXT,
+    requested_start_date TEXT,
+    requested_completion_date TEXT,
+    expected_completion_date TEXT,
+    start_date TEXT,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS service_order_order_date ON service_order (order_date, id);
+CREATE TABLE IF NOT EXISTS service_order_change (
+    id TEXT PRIMARY KEY,
+    sequence INTEGER NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    changed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS service_order_change_tombstone
+ON service_order_change (changed_at) WHERE kind = 'delete';
+CREATE TABLE IF NOT EXISTS service_order_stats (
+    state TEXT NOT NULL,
+    category TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    order_hour TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (state, category, priority, order_hour)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS service_order_search USING fts5(
+    terms,
+    tokenize = 'unicode61 remove_diacritics 0'
+);
+CREATE TABLE IF NOT EXISTS service_order_attribute (
+    path TEXT NOT NULL,
+    value TEXT NOT NULL,
+    order_rowid INTEGER NOT NULL,
+    PRIMARY KEY (path, value, order_rowid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS service_order_attribute_order
+ON service_order_attribute (order_rowid);
+CREATE TABLE IF NOT EXISTS hub_listener (
+    id TEXT PRIMARY KEY,
+    callback TEXT NOT NULL,
+    query TEXT
+);
+INSERT OR IGNORE INTO sequence (name, value)
+VALUES ('service_order', 0), ('hub', 0), ('change', 0), ('change_horizon', 0);
+"""
+
+
+def _stats_group(row: str) -> str:
+    # Missing values are stored as '' so that every group has a non-NULL primary key.
+    return (
+        f"coalesce({row}.state, ''), coalesce({row}.category, ''), "
+        f"coalesce({row}.priority, ''), "
+        f"coalesce(strftime('%Y-%m-%dT%H:00:00', {row}.order_date), '')"
+    )
+
+
+_STATS_INCREMENT = (
+    "INSERT INTO service_order_stats (state, category, priority, order_hour, count) "
+    "VALUES ({group}, 1) ON CONFLICT DO UPDATE SET count = count + 1;"
+)
+_STATS_DECREMENT = (
+    "UPDATE service_order_stats SET count = count - 1 "
+    "WHERE (state, category, priority, order_hour) = ({group}); "
+    "DELETE FROM service_order_stats "
+    "WHERE (state, category, priority, order_hour) = ({group}) AND count = 0;"
+)
+# Triggers keep service_order_stats in step with service_order inside the writing
+# transaction, whichever worker writes.
+_STATS_TRIGGERS = (
+    "CREATE TRIGGER IF NOT EXISTS service_order_stats_insert AFTER INSERT ON service_order "
+    f"BEGIN {_STATS_INCREMENT.format(group=_stats_group('NEW'))} END",
+    "CREATE TRIGGER IF NOT EXISTS service_order_stats_delete AFTER DELETE ON service_order "
+    f"BEGIN {_STATS_DECREMENT.format(group=_stats_group('OLD'))} END",
+    "CREATE TRIGGER IF NOT EXISTS service_order_stats_update "
+    "AFTER UPDATE OF state, category, priority, order_date ON service_order "
+    "WHEN OLD.state IS NOT NEW.state OR OLD.category IS NOT NEW.category "
+    "OR OLD.priority IS NOT NEW.priority OR OLD.order_date IS NOT NEW.order_date "
+    f"BEGIN {_STATS_DECREMENT.format(group=_stats_group('OLD'))} "
+    f"{_STATS_INCREMENT.format(group=_stats_group('NEW'))} END",
+)
+
+_ORDER_COLUMNS = (
+    "id",
+    "href",
+    "state",
+    "category",
+    "external_id",
+    "priority",
+    "order_date",
+    "completion_date",
+    "requested_start_date",
+    "requested_completion_date",
+    "expected_completion_date",
+    "start_date",
+    "payload",
+)
+_ORDER_SELECT = f"SELECT {', '.join(_ORDER_COLUMNS)} FROM service_order"
+# Index rows point at the rowid of their service_order row (the FTS5 rowid itself
+# for service_order_search).
+_TERMS_MATCH = (
+    "rowid IN (SELECT rowid FROM service_order_search WHERE service_order_search MATCH ?)"
+)
+_ATTRIBUTE_MATCH = (
+    "rowid IN (SELECT order_rowid FROM service_order_attribute WHERE path = ? AND value = ?)"
+)
+_DATE_COLUMNS = _ORDER_COLUMNS[6:12]
+# Rows per `select` call when walking the orderDate index.
+_ORDERED_CHUNK = 256
+_CHANGE_SELECT = (
+    "SELECT c.sequence, c.kind, c.id, "
+    + ", ".join(f"o.{column}" for column in _ORDER_COLUMNS)
+    + " FROM service_order_change c LEFT JOIN service_order o ON o.id = c.id"
+    + " WHERE c.sequence > ? AND c.sequence <= ? ORDER BY c.sequence LIMIT ?"
+)
+
+
+class SQLiteStore:
+    """
+    SQLite (WAL mode) persistence shared by every worker process.
+
+    Orders are stored in the same form as ServiceOrderRecord: the header columns
+    plus the compact JSON payload. Each thread uses its own connection; writes run
+    in short IMMEDIATE transactions so concurrent workers serialize on the database
+    write lock while readers keep reading the last committed snapshot.
+
+    Delete tombstones stay in the change feed for `change_retention_seconds`, as
+    in InMemoryStore.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        busy_timeout_seconds: float = 30.0,
+        change_retention_seconds: float = DEFAULT_CHANGE_RETENTION_SECONDS,
+    ) -> None:
+        self._path = str(path)
+        self._busy_timeout_seconds = busy_timeout_seconds
+        self._change_retention_seconds = change_retention_seconds
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._change_listeners: list[Callable[[str], None]] = []
+
+        with self._write() as connection:
+            for statement in _SCHEMA.split(";"):
+                if statement.strip():
+                    connection.execute(statement)
+            for trigger in _STATS_TRIGGERS:
+                connection.execute(trigger)
+
+    def warm_up(self) -> None:
+        """Open this thread's connection and pull the order table into the page cache."""
+
+        self._connection().execute("SELECT count(*) FROM service_order").fetchall()
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def next_service_order_id(self) -> str:
+        return str(self._next_sequence_value("service_order"))
+
+    def next_hub_id(self) -> str:
+        return str(self._next_sequence_value("hub"))
+
+    def count_service_orders(self) -> int:
+        return int(self._connection().execute("SELECT count(*) FROM service_order").fetchone()[0])
+
+    def list_service_order_records(
+        self, select: RecordSelector | None = None
+    ) -> list[ServiceOrderRecord]:
+        rows = self._connection().execute(f"{_ORDER_SELECT} ORDER BY rowid").fetchall()
+        records = [_record_from_row(row) for row in rows]
+        return records if select is None else select(records)
+
+    def get_service_order_record(self, service_order_id: str) -> ServiceOrderRecord | None:
+        row = (
+            self._connection()
+            .execute(f"{_ORDER_SELECT} WHERE id = ?", (service_order_id,))
+            .fetchone()
+        )
+        return None if row is None else _record_from_row(row)
+
+    def get_service_order_records(
+        self, service_order_ids: Iterable[str]
+    ) -> dict[str, ServiceOrderRecord]:
+        # One statement, so all orders come from the same snapshot.
+        rows = (
+            self._connection()
+            .execute(
+                f"{_ORDER_SELECT} WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(list(service_order_ids)),),
+            )
+            .fetchall()
+        )
+        return {row[0]: _record_from_row(row) for row in rows}
+
+    def list_service_orders(self) -> list[ServiceOrder]:
+        return [record.to_order() for record in self.list_service_order_records()]
+
+    def get_service_order(self, service_order_id: str) -> ServiceOrder | None:
+        record = self.get_service_order_record(service_order_id)
+        return None if record is None else record.to_order()
+
+    def create_service_order(self, service_order: ServiceOrder) -> ServiceOrderRecord:
+        record = ServiceOrderRecord.from_order(service_order)
+        keys = _index_keys(record.payload)
+        placeholders = ", ".join("?" for _ in _ORDER_COLUMNS)
+
+        try:
+            with self._write() as connection:
+                cursor = connection.execute(
+                    f"INSERT INTO service_order ({', '.join(_ORDER_COLUMNS)}) "
+                    f"VALUES ({placeholders})",
+                    _row_from_record(record),
+                )
+                _write_index(connection, cursor.lastrowid, keys)
+                self._record_change(connection, record.id, "create")
+        except sqlite3.IntegrityError as exc:
+            raise ConflictError(f"ServiceOrder with id '{record.id}' already exists.") from exc
+        self._notify_change(record.id)
+        return record
+
+    def update_service_order(self, service_order: ServiceOrder) -> ServiceOrderRecord:
+        return self.update_service_order_record(ServiceOrderRecord.from_order(service_order))
+
+    def update_service_order_record(self, record: ServiceOrderRecord) -> ServiceOrderRecord:
+        keys = _index_keys(record.payload)
+        assignments = ", ".join(f"{column} = ?" for column in _ORDER_COLUMNS[1:])
+
+        with self._write() as connection:
+            updated = connection.execute(
+                f"UPDATE service_order SET {assignments} WHERE id = ? RETURNING rowid",
+                (*_row_from_record(record)[1:], record.id),
+            ).fetchone()
+            if updated is None:
+                raise KeyError(record.id)
+            _write_index(connection, updated[0], keys)
+            self._record_change(connection, record.id, "update")
+        self._notify_change(record.id)
+        return record
+
+    def delete_service_order(self, service_order_id: str) -> bool:
+        with self._write() as connection:
+            deleted = connection.execute(
+                "DELETE FROM service_order WHERE id = ? RETURNING rowid", (service_order_id,)
+            ).fetchone()
+            if deleted is None:
+                return False
+            _write_index(connection, deleted[0], None)
+            self._record_change(connection, service_order_id, "delete")
+        self._notify_change(service_order_id)
+        return True
+
+    def list_service_order_changes(
+        self, since: int, limit: int
+    ) -> tuple[list[ServiceOrderChange], int]:
+        connection = self._connection()
+        # Read the head first and bound the query by it, so changes committed in between
+        # are neither returned nor skipped by a client that continues from the head.
+        head = int(
+            connection.execute("SELECT value FROM sequence WHERE name = 'change'").fetchone()[0]
+        )
+        rows = connection.execute(_CHANGE_SELECT, (since, head, limit)).fetchall()
+        # Read after the page: a tombstone dropped before it was read has already
+        # moved the horizon past it (both happen in one write transaction).
+        horizon = int(
+            connection.execute(
+                "SELECT value FROM sequence WHERE name = 'change_horizon'"
+            ).fetchone()[0]
+        )
+        if 0 < since < horizon:
+            raise ChangeHistoryExpiredError(f"Changes up to sequence {horizon} were compacted.")
+        changes = [
+            ServiceOrderChange(
+                sequence=row[0],
+                kind=row[1],
+                id=row[2],
+                record=None if row[3] is None else _record_from_row(row[3:]),
+            )
+            for row in rows
+        ]
+        return changes, head
+
+    def search_service_order_records(
+        self,
+        terms: frozenset[str] = frozenset(),
+        attributes: frozenset[tuple[str, str]] = frozenset(),
+        select: RecordSelector | None = None,
+    ) -> list[ServiceOrderRecord]:
+        conditions: list[str] = []
+        params: list[str] = []
+        if terms:
+            conditions.append(_TERMS_MATCH)
+            params.append(" ".join(f'"{term}"' for term in sorted(terms)))
+        for path, value in sorted(attributes):
+            conditions.append(_ATTRIBUTE_MATCH)
+            params.extend((path, value))
+        if not conditions:
+            return []
+        rows = (
+            self._connection()
+            .execute(f"{_ORDER_SELECT} WHERE {' AND '.join(conditions)} ORDER BY rowid", params)
+            .fetchall()
+        )
+        records = [_record_from_row(row) for row in rows]
+        return records if select is None else select(records)
+
+    def archive_service_orders(self, completed_before: datetime) -> int:
+        """No archive tier: every order already lives on disk behind the indexes."""
+
+        return 0
+
+    def list_archived_service_order_records(
+        self,
+        terms: frozenset[str] = frozenset(),
+        attributes: frozenset[tuple[str, str]] = frozenset(),
+    ) -> list[ServiceOrderRecord]:
+        return []
+
+    def iter_service_order_records_by_order_date(
+        self, descending: bool = False, select: RecordSelector | None = None
+    ) -> Iterator[ServiceOrderRecord]:
+        # Walks the (order_date, id) index; the read sees one snapshot of the database.
+        # orderDate is always a server-assigned UTC timestamp, so text order is time order.
+        direction = "DESC" if descending else "ASC"
+        cursor = self._connection().execute(
+            f"{_ORDER_SELECT} ORDER BY order_date {direction}, id {direction}"
+        )
+        while rows := cursor.fetchmany(_ORDERED_CHUNK):
+            records = [_record_from_row(row) for row in rows]
+            yield from records if select is None else select(records)
+
+    def service_order_stats(self) -> dict[StatsKey, int]:
+        rows = self._connection().execute(
+            "SELECT state, category, priority, order_hour, count FROM service_order_stats"
+        )
+        return {
+            (
+                row[0] or None,
+                row[1] or None,
+                row[2] or None,
+                datetime.fromisoformat(row[3]).replace(tzinfo=UTC) if row[3] else None,
+            ): row[4]
+            for row in rows
+        }
+
+    def add_change_listener(self, listener: Callable[[str], None]) -> None:
+        """
+        Call `listener(service_order_id)` after this store commits a change.
+
+        Changes committed by other processes sharing the database are not reported.
+        """
+
+        self._change_listeners.append(listener)
+
+    def list_hub_listeners(self) -> list[HubListenerRecord]:
+        rows = (
+            self._connection()
+            .execute("SELECT id, callback, query FROM hub_listener ORDER BY rowid")
+            .fetchall()
+        )
+        return [HubListenerRecord(id=row[0], callback=row[1], query=row[2]) for row in rows]
+
+    def get_hub_listener(self, listener_id: str) -> HubListenerRecord | None:
+        row = (
+            self._connection()
+            .execute("SELECT id, callback, query FROM hub_listener WHERE id = ?", (listener_id,))
+            .fetchone()
+        )
+        return None if row is None else HubListenerRecord(id=row[0], callback=row[1], query=row[2])
+
+    def create_hub_listener(self, callback: str, query: str | None) -> HubListenerRecord:
+        with self._write() as connection:
+            listener_id = str(self._increment(connection, "hub"))
+            connection.execute(
+                "INSERT INTO hub_listener (id, callback, query) VALUES (?, ?, ?)",
+                (listener_id, callback, query),
+            )
+        return HubListenerRecord(id=listener_id, callback=callback, query=query)
+
+    def delete_hub_listener(self, listener_id: str) -> bool:
+        with self._write() as connection:
+            cursor = connection.execute("DELETE FROM hub_listener WHERE id = ?", (listener_id,))
+            return cursor.rowcount > 0
+
+    def _next_sequence_value(self, name: str) -> int:
+        with self._write() as connection:
+            return self._increment(connection, name)
+
+    def _notify_change(self, service_order_id: str) -> None:
+        for listener in self._change_listeners:
+            listener(service_order_id)
+
+    def _record_change(
+        self, connection: sqlite3.Connection, service_order_id: str, kind: str
+    ) -> None:
+        now = time.time()
+        connection.execute(
+            "INSERT INTO service_order_change (id, sequence, kind, changed_at) "
+            "VALUES (?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET sequence = excluded.sequence, "
+            "kind = excluded.kind, changed_at = excluded.changed_at",
+            (service_order_id, self._increment(connection, "change"), kind, now),
+        )
+        dropped = connection.execute(
+            "DELETE FROM service_order_change WHERE kind = 'delete' AND changed_at <= ? "
+            "RETURNING sequence",
+            (now - self._change_retention_seconds,),
+        ).fetchall()
+        if dropped:
+            connection.execute(
+                "UPDATE sequence SET value = max(value, ?) WHERE name = 'change_horizon'",
+                (max(row[0] for row in dropped),),
+            )
+
+    @staticmethod
+    def _increment(connection: sqlite3.Connection, name: str) -> int:
+        rows = connection.execute(
+            "UPDATE sequence SET value = value + 1 WHERE name = ? RETURNING value", (name,)
+        ).fetchall()
+        return int(rows[0][0])
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        with immediate_transaction(self._connection()) as connection:
+            yield connection
+
+    def _connection(self) -> sqlite3.Connection:
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = connect(self._path, self._busy_timeout_seconds)
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+
+def connect(path: str, busy_timeout_seconds: float) -> sqlite3.Connection:
+    """Autocommit WAL connection usable from any thread, as used by every SQLite component."""
+
+    connection = sqlite3.connect(
+        path, timeout=busy_timeout_seconds, isolation_level=None, check_same_thread=False
+    )
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+@contextmanager
+def immediate_transaction(connection: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Run the block in a write (IMMEDIATE) transaction, rolled back on error."""
+
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield connection
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
+
+
+def _row_from_record(record: ServiceOrderRecord) -> tuple[Any, ...]:
+    return (
+        record.id,
+        record.href,
+        None if record.state is None else record.state.value,
+        record.category,
+        record.external_id,
+        record.priority,
+        *(_to_text(getattr(record, column)) for column in _DATE_COLUMNS),
+        record.payload,
+    )
+
+
+def _record_from_row(row: tuple[Any, ...]) -> ServiceOrderRecord:
+    return ServiceOrderRecord(
+        id=row[0],
+        href=row[1],
+        state=None if row[2] is None else ServiceOrderStateType(row[2]),
+        category=row[3],
+        external_id=row[4],
+        priority=row[5],
+        order_date=_from_text(row[6]),
+        completion_date=_from_text(row[7]),
+        requested_start_date=_from_text(row[8]),
+        requested_completion_date=_from_text(row[9]),
+        expected_completion_date=_from_text(row[10]),
+        start_date=_from_text(row[11]),
+        payload=bytes(row[12]),
+    )
+
+
+def _index_keys(payload: bytes) -> tuple[str, frozenset[tuple[str, str]]]:
+    order = json.loads(payload)
+    return " ".join(sorted(search_terms(order))), attribute_values(order)
+
+
+def _write_index(
+    connection: sqlite3.Connection,
+    rowid: int | None,
+    keys: tuple[str, frozenset[tuple[str, str]]] | None,
+) -> None:
+    # Replace the search and attribute index rows of one order; None only removes them.
+    connection.execute("DELETE FROM service_order_search WHERE rowid = ?", (rowid,))
+    connection.execute("DELETE FROM service_order_attribute WHERE order_rowid = ?", (rowid,))
+    if keys is None:
+        return
+    terms, attributes = keys
+    connection.execute(
+        "INSERT INTO service_order_search (rowid, terms) VALUES (?, ?)", (rowid, terms)
+    )
+    connection.executemany(
+        "INSERT INTO service_order_attribute (path, value, order_rowid) VALUES (?, ?, ?)",
+        [(path, value, rowid) for path, value in attributes],
+    )
+
+
+def _to_text(value: datetime | None) -> str | None:
+    return None if value is None else value.isoformat()
+
+
+def _from_text(value: str | None) -> datetime | None:
+    return None if value is None else datetime.fromisoformat(value)
@@ -1,31 +1,28 @@
 """Business services for TMF641 demo."""
 
-from app.services.hub_service import HubService, get_hub_service
+from app.services.hub_service import HubService
 from app.services.notification_service import NotificationService
 from app.services.query_service import (
     apply_order_filters,
     parse_fields,
     project_order,
     project_orders,
+    render_changes_json,
+    render_order_json,
+    render_orders_json,
 )
-from app.services.service_order_service import (
-    ServiceOrderService,
-    get_notification_service,
-    get_service_order_service,
-    get_store,
-)
+from app.services.service_order_service import ServiceOrderService
 
 __all__ = [
     "HubService",
     "NotificationService",
     "ServiceOrderService",
     "apply_order_filters",
-    "get_hub_service",
-    "get_notification_service",
-    "get_service_order_service",
-    "get_store",
     "parse_fields",
     "project_order",
     "project_orders",
+    "render_changes_json",
+    "render_order_json",
+    "render_orders_json",
 ]
 
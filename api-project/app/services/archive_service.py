@@ -0,0 +1,50 @@
+import asyncio
+import logging
+from datetime import UTC, datetime, timedelta
+
+import anyio.to_thread
+
+from app.observability.metrics import ARCHIVED_SERVICE_ORDERS
+from app.repositories.base import Repository
+
+logger = logging.getLogger(__name__)
+
+
+class OrderArchiver:
+    """
+    Moves terminal orders older than `after_seconds` to the store's archive tier,
+    every `interval_seconds`, off the event loop.
+    """
+
+    def __init__(
+        self, store: Repository, after_seconds: float, interval_seconds: float = 60.0
+    ) -> None:
+        self._store = store
+        self._after = timedelta(seconds=after_seconds)
+        self._interval_seconds = interval_seconds
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def archive_due(self, now: datetime | None = None) -> int:
+        """Archive the orders completed more than `after_seconds` before `now`."""
+
+        moved = self._store.archive_service_orders((now or datetime.now(UTC)) - self._after)
+        if moved:
+            ARCHIVED_SERVICE_ORDERS.inc(moved)
+            logger.info("Archived %d service orders", moved)
+        return moved
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval_seconds)
+            try:
+                await anyio.to_thread.run_sync(self.archive_due)
+            except Exception:
+                logger.exception("Service order archiving failed")
@@ -1,11 +1,11 @@
 from app.models.hub import Hub, HubCreate
-from app.repositories.memory_store import InMemoryStore
-from app.services.service_order_service import get_store
+from app.observability.metrics import NOTIFICATION_DELIVERY_FAILURES
+from app.repositories.base import Repository
 from app.utils.errors import NotFoundError
 
 
 class HubService:
-    def __init__(self, store: InMemoryStore, resource_path: str = "/hub") -> None:
+    def __init__(self, store: Repository, resource_path: str = "/hub") -> None:
         self._store = store
         self._resource_path = resource_path.rstrip("/") or "/hub"
 
@@ -20,14 +20,8 @@ class HubService:
         deleted = self._store.delete_hub_listener(listener_id)
         if not deleted:
             raise NotFoundError(f"Hub listener with id '{listener_id}' was not found.")
+        NOTIFICATION_DELIVERY_FAILURES.remove(listener_id)
 
     def location_for(self, listener_id: str) -> str:
         return f"{self._resource_path}/{listener_id}"
 
-
-_hub_service = HubService(store=get_store())
-
-
-def get_hub_service() -> HubService:
-    return _hub_service
-
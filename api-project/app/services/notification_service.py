@@ -3,9 +3,13 @@ import logging
 from datetime import UTC, datetime
 from itertools import count
 from threading import RLock
+from time import perf_counter
+from typing import Any
 from urllib import parse, request
 from urllib.error import HTTPError, URLError
 
+from pydantic import TypeAdapter
+
 from app.models.notifications import (
     ServiceOrderAttributeValueChangeNotification,
     ServiceOrderCreateNotification,
@@ -15,10 +19,18 @@ from app.models.notifications import (
     ServiceOrderStateChangeNotification,
 )
 from app.models.service_order import ServiceOrder
-from app.repositories.memory_store import HubListenerRecord, InMemoryStore
+from app.observability.metrics import (
+    NOTIFICATION_DELIVERY_DURATION,
+    NOTIFICATION_DELIVERY_FAILURES,
+    NOTIFICATION_EMIT_DURATION,
+)
+from app.repositories.base import Repository
+from app.repositories.memory_store import HubListenerRecord, ServiceOrderRecord
 
 logger = logging.getLogger(__name__)
 
+_DATETIME = TypeAdapter(datetime)
+
 
 class NotificationService:
     """
@@ -29,7 +41,7 @@ class NotificationService:
     - failures are logged for demo visibility
     """
 
-    def __init__(self, store: InMemoryStore, delivery_timeout_seconds: float = 3.0) -> None:
+    def __init__(self, store: Repository, delivery_timeout_seconds: float = 3.0) -> None:
         self._store = store
         self._delivery_timeout_seconds = delivery_timeout_seconds
         self._event_id_sequence = count(1)
@@ -51,6 +63,11 @@ class NotificationService:
         )
         self._emit(notification)
 
+    def emit_service_order_record_attribute_value_change(self, record: ServiceOrderRecord) -> None:
+        """Attribute value change for an order updated as stored JSON, without a model."""
+
+        self._emit_record("ServiceOrderAttributeValueChangeNotification", record)
+
     def emit_service_order_state_change(self, service_order: ServiceOrder) -> None:
         notification = ServiceOrderStateChangeNotification(
             eventId=self._next_event_id(),
@@ -67,12 +84,33 @@ class NotificationService:
         )
         self._emit(notification)
 
+    def emit_service_order_jeopardy_alert(self, record: ServiceOrderRecord, deadline: str) -> None:
+        """Alert that the open order `record` has passed its `deadline` field."""
+
+        self._emit_record("ServiceOrderJeopardyAlertNotification", record, deadline=deadline)
+
     def _next_event_id(self) -> str:
         with self._event_lock:
             return str(next(self._event_id_sequence)).zfill(5)
 
     def _emit(self, notification: ServiceOrderNotification) -> None:
+        started = perf_counter()
         payload = notification.model_dump(by_alias=True, mode="json", exclude_none=True)
+        self._deliver(payload, started)
+
+    def _emit_record(self, event_type: str, record: ServiceOrderRecord, **event: str) -> None:
+        # Same document as the notification model dump, built from the stored order JSON
+        # instead of validating the whole order into a model first.
+        started = perf_counter()
+        payload = {
+            "eventId": self._next_event_id(),
+            "eventTime": _DATETIME.dump_python(datetime.now(UTC), mode="json"),
+            "eventType": event_type,
+            "event": {"serviceOrder": json.loads(record.payload), **event},
+        }
+        self._deliver(payload, started)
+
+    def _deliver(self, payload: dict[str, Any], started: float) -> None:
         event_type = payload["eventType"]
 
         logger.info(
@@ -86,6 +124,7 @@ class NotificationService:
             if not _listener_accepts_event(listener, event_type):
                 continue
             self._publish_to_listener(listener.callback, payload, event_type, listener.id)
+        NOTIFICATION_EMIT_DURATION.labels(event_type).observe(perf_counter() - started)
 
     def _publish_to_listener(
         self, callback: str, payload: dict[str, object], event_type: str, listener_id: str
@@ -100,10 +139,14 @@ class NotificationService:
             },
             method="POST",
         )
+        started = perf_counter()
+        outcome = "failed"
         try:
             with request.urlopen(http_request, timeout=self._delivery_timeout_seconds) as response:
                 status = int(response.getcode())
-            if status not in {200, 201, 202, 204}:
+            if status in {200, 201, 202, 204}:
+                outcome = "delivered"
+            else:
                 logger.warning(
                     "Listener '%s' responded with status=%s for eventType=%s",
                     listener_id,
@@ -125,11 +168,16 @@ class NotificationService:
                 exc.reason,
             )
         except TimeoutError:
+            outcome = "timeout"
             logger.warning(
                 "Timed out publishing notification to listener '%s' (%s)",
                 listener_id,
                 callback,
             )
+        finally:
+            NOTIFICATION_DELIVERY_DURATION.labels(outcome).observe(perf_counter() - started)
+            if outcome != "delivered":
+                NOTIFICATION_DELIVERY_FAILURES.labels(listener_id).inc()
 
 
 def _listener_accepts_event(listener: HubListenerRecord, event_type: str) -> bool:
@@ -1,11 +1,25 @@
-from collections.abc import Mapping
+import heapq
+import json
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterable, Mapping
 from datetime import UTC, datetime
 from enum import Enum
-from typing import Any
+from functools import partial
+from itertools import islice
+from typing import Any, Literal, TypeVar
 
 from app.models.service_order import ServiceOrder
+from app.observability.metrics import FILTER_ORDERS_SCANNED
+from app.observability.timing import phase
+from app.repositories.memory_store import ServiceOrderChange, ServiceOrderRecord, StatsKey
+from app.repositories.search import NESTED_FILTER_PATHS, attribute_values
 from app.utils.errors import InvalidFieldSelectionError, InvalidFilterError
 
+OrderT = TypeVar("OrderT", ServiceOrder, ServiceOrderRecord)
+StatsBucket = Literal["hour", "day", "month"]
+# A `sort` entry: (field alias, descending).
+SortKey = tuple[str, bool]
+
 _EXACT_FILTER_FIELDS = {"state", "category", "externalId", "priority"}
 _DATE_FILTER_FIELDS = {
     "orderDate",
@@ -16,7 +30,21 @@ _DATE_FILTER_FIELDS = {
     "startDate",
 }
 _DATE_OPERATORS = {"gt", "lt", "gte", "lte"}
-_SERVICE_ORDER_FIELDS = {field.alias or name for name, field in ServiceOrder.model_fields.items()}
+_EXACT_FILTER_SCANS = FILTER_ORDERS_SCANNED.labels("exact")
+_DATE_FILTER_SCANS = FILTER_ORDERS_SCANNED.labels("date")
+_NESTED_FILTER_SCANS = FILTER_ORDERS_SCANNED.labels("nested")
+_SERVICE_ORDER_FIELD_NAMES = {
+    field.alias or name: name for name, field in ServiceOrder.model_fields.items()
+}
+_SERVICE_ORDER_FIELDS = set(_SERVICE_ORDER_FIELD_NAMES)
+# Fields that can be projected from the record header without parsing the payload.
+_RECORD_HEADER_FIELDS = {"id", "href", "state", "category", "externalId", "priority"}
+_SORT_FIELDS = _EXACT_FILTER_FIELDS | _DATE_FILTER_FIELDS
+# Orders read at a time from an ordered store iterator by `first_orders_in_order`.
+_ORDERED_CHUNK = 256
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+# Stats dimensions, in StatsKey order; the fourth key element is the orderDate hour.
+_STATS_FIELDS = ("state", "category", "priority")
 
 
 def parse_fields(fields: str | None) -> list[str] | None:
@@ -29,12 +57,11 @@ def parse_fields(fields: str | None) -> list[str] | None:
     return parsed_fields
 
 
-def apply_order_filters(
-    service_orders: list[ServiceOrder], filters: Mapping[str, str]
-) -> list[ServiceOrder]:
+def apply_order_filters(service_orders: list[OrderT], filters: Mapping[str, str]) -> list[OrderT]:
     filtered = service_orders
     for filter_key, filter_value in filters.items():
         if filter_key in _EXACT_FILTER_FIELDS:
+            _EXACT_FILTER_SCANS.inc(len(filtered))
             filtered = [
                 order
                 for order in filtered
@@ -42,9 +69,16 @@ def apply_order_filters(
             ]
             continue
 
+        if filter_key in NESTED_FILTER_PATHS:
+            _NESTED_FILTER_SCANS.inc(len(filtered))
+            attribute = (filter_key, filter_value)
+            filtered = [order for order in filtered if attribute in _order_attributes(order)]
+            continue
+
         if "." in filter_key:
             field_name, operator = filter_key.rsplit(".", maxsplit=1)
             if field_name in _DATE_FILTER_FIELDS and operator in _DATE_OPERATORS:
+                _DATE_FILTER_SCANS.inc(len(filtered))
                 filtered = _apply_date_filter(filtered, field_name, operator, filter_value)
                 continue
 
@@ -53,18 +87,85 @@ def apply_order_filters(
     return filtered
 
 
+def parse_sort(sort: str | None) -> list[SortKey] | None:
+    """Parse `sort=-orderDate,priority` into sort keys; `-` sorts that field descending."""
+
+    if sort is None:
+        return None
+
+    sort_keys: list[SortKey] = []
+    for entry in sort.split(","):
+        field = entry.strip()
+        descending = field.startswith("-")
+        field = field.removeprefix("-")
+        if field not in _SORT_FIELDS:
+            raise InvalidFilterError(f"Unsupported sort field '{entry.strip()}'.")
+        sort_keys.append((field, descending))
+    return sort_keys
+
+
+def sort_orders(
+    service_orders: list[OrderT], sort_keys: list[SortKey], limit: int | None = None
+) -> list[OrderT]:
+    """
+    Sort orders by `sort_keys` (stable; missing values sort lowest), keeping the
+    first `limit`. With a limit a bounded heap selects them in O(n log limit)
+    without sorting the rest.
+    """
+
+    key = partial(_sort_key, sort_keys=sort_keys)
+    if limit is not None and limit < len(service_orders):
+        return heapq.nsmallest(limit, service_orders, key=key)
+    return sorted(service_orders, key=key)
+
+
+def select_orders(
+    records: list[ServiceOrderRecord],
+    filters: Mapping[str, str],
+    sort_keys: list[SortKey] | None = None,
+    limit: int | None = None,
+) -> list[ServiceOrderRecord]:
+    """
+    Orders matching `filters`, sorted by `sort_keys`, at most `limit`.
+
+    Reads header fields only (no nested-attribute filters), so stores can run it
+    as a `RecordSelector` before inflating packed payloads.
+    """
+
+    with phase("filter"):
+        selected = apply_order_filters(records, filters)
+        if sort_keys:
+            return sort_orders(selected, sort_keys, limit)
+        return selected if limit is None else selected[:limit]
+
+
+def first_orders_in_order(
+    matching: Iterable[ServiceOrderRecord], sort_keys: list[SortKey], limit: int
+) -> list[ServiceOrderRecord]:
+    """
+    The first `limit` orders by `sort_keys` of `matching` (already filtered and
+    sorted by the first sort key), reading it only until they are known.
+
+    Reading stops once `limit` orders are read and the first sort key has moved
+    past the last of them, so ties on it are still ordered by the remaining keys.
+    """
+
+    primary = partial(_sort_key, sort_keys=sort_keys[:1])
+    orders = iter(matching)
+    matched: list[ServiceOrderRecord] = []
+    while chunk := list(islice(orders, max(limit, _ORDERED_CHUNK))):
+        matched.extend(chunk)
+        if len(matched) > limit and primary(matched[limit - 1]) != primary(matched[-1]):
+            break
+    return sort_orders(matched, sort_keys, limit)
+
+
 def project_order(service_order: ServiceOrder, fields: list[str] | None) -> dict[str, Any]:
     data = service_order.model_dump(by_alias=True, mode="json", exclude_none=True)
     if fields is None:
         return data
 
-    invalid_fields = sorted(set(fields).difference(_SERVICE_ORDER_FIELDS))
-    if invalid_fields:
-        invalid_str = ", ".join(invalid_fields)
-        raise InvalidFieldSelectionError(
-            f"Unsupported fields in 'fields' selection: {invalid_str}."
-        )
-
+    _validate_fields(fields)
     full_data = service_order.model_dump(by_alias=True, mode="json", exclude_none=False)
     return {field: full_data.get(field) for field in fields}
 
@@ -75,12 +176,185 @@ def project_orders(
     return [project_order(service_order=order, fields=fields) for order in service_orders]
 
 
+def render_order_json(record: ServiceOrderRecord, fields: list[str] | None) -> bytes:
+    """Render one stored order as JSON bytes, applying the `fields` projection."""
+
+    if fields is None:
+        return record.payload
+    with phase("project"):
+        projected = _record_projector(fields)(record)
+    with phase("serialize"):
+        return _dumps(projected)
+
+
+def render_orders_json(records: list[ServiceOrderRecord], fields: list[str] | None) -> bytes:
+    """Render stored orders as a JSON array; without `fields` the payloads are joined as-is."""
+
+    if fields is None:
+        with phase("serialize"):
+            return b"[" + b",".join(record.payload for record in records) + b"]"
+    with phase("project"):
+        project = _record_projector(fields)
+        projected = [project(record) for record in records]
+    with phase("serialize"):
+        return _dumps(projected)
+
+
+def render_batch_json(
+    records: list[ServiceOrderRecord], missing: list[str], fields: list[str] | None
+) -> bytes:
+    """Render a batch get result: `{"serviceOrder": [...], "missing": [ids]}`."""
+
+    orders = render_orders_json(records, fields)
+    with phase("serialize"):
+        return b'{"serviceOrder":' + orders + b',"missing":' + _dumps(missing) + b"}"
+
+
+def render_changes_json(
+    changes: list[ServiceOrderChange], next_since: int, has_more: bool, fields: list[str] | None
+) -> bytes:
+    """Render a change feed page; deletes are tombstones without a `serviceOrder`."""
+
+    project = None if fields is None else _record_projector(fields)
+    entries: list[bytes] = []
+    for change in changes:
+        header = _dumps({"sequence": change.sequence, "type": change.kind, "id": change.id})
+        if change.record is None:
+            entries.append(header)
+            continue
+        order = change.record.payload if project is None else _dumps(project(change.record))
+        entries.append(header[:-1] + b',"serviceOrder":' + order + b"}")
+    trailer = _dumps({"nextSince": next_since, "hasMore": has_more})
+    return b'{"changes":[' + b",".join(entries) + b"]," + trailer[1:]
+
+
+def filter_stats_groups(
+    groups: Mapping[StatsKey, int], filters: Mapping[str, str]
+) -> dict[StatsKey, int] | None:
+    """
+    Apply `filters` to stats counter groups, or return None if the counters cannot
+    answer them exactly.
+
+    Equality on `state`, `category` and `priority` and `orderDate.gte` / `orderDate.lt`
+    on a whole UTC hour select whole groups; every other filter needs the orders.
+    """
+
+    predicates: list[Callable[[StatsKey], bool]] = []
+    for filter_key, filter_value in filters.items():
+        if filter_key in _STATS_FIELDS:
+            index = _STATS_FIELDS.index(filter_key)
+            predicates.append(partial(_stats_field_equals, index=index, value=filter_value))
+            continue
+        if filter_key in {"orderDate.gte", "orderDate.lt"}:
+            bound = _parse_datetime(filter_value, field_name="orderDate").astimezone(UTC)
+            if bound == bound.replace(minute=0, second=0, microsecond=0):
+                predicates.append(
+                    partial(
+                        _order_hour_in_range, bound=bound, at_or_after=filter_key.endswith("gte")
+                    )
+                )
+                continue
+        return None
+
+    return {
+        key: count
+        for key, count in groups.items()
+        if all(predicate(key) for predicate in predicates)
+    }
+
+
+def render_stats_json(groups: Mapping[StatsKey, int], bucket: StatsBucket | None) -> bytes:
+    """
+    Render order counts by state, category and priority from stats counter groups.
+
+    With `bucket`, the counts are also broken down per hour, day or month of
+    `orderDate` (UTC). Orders without a value are only counted in `total`.
+    """
+
+    stats = _stats_summary(groups.items())
+    if bucket is not None:
+        buckets: defaultdict[datetime, list[tuple[StatsKey, int]]] = defaultdict(list)
+        for key, count in groups.items():
+            if key[3] is not None:
+                buckets[_bucket_start(key[3], bucket)].append((key, count))
+        stats["buckets"] = [
+            {"start": start.strftime("%Y-%m-%dT%H:%M:%SZ"), **_stats_summary(items)}
+            for start, items in sorted(buckets.items())
+        ]
+    return _dumps(stats)
+
+
+def _stats_field_equals(key: StatsKey, index: int, value: str) -> bool:
+    return (key[index] or "") == value
+
+
+def _order_hour_in_range(key: StatsKey, bound: datetime, at_or_after: bool) -> bool:
+    return key[3] is not None and (key[3] >= bound) == at_or_after
+
+
+def _stats_summary(groups: Iterable[tuple[StatsKey, int]]) -> dict[str, Any]:
+    total = 0
+    by_field: list[Counter[str]] = [Counter() for _ in _STATS_FIELDS]
+    for key, count in groups:
+        total += count
+        for counter, value in zip(by_field, key[:3]):
+            if value:
+                counter[value] += count
+    summary: dict[str, Any] = {"total": total}
+    for field, counter in zip(_STATS_FIELDS, by_field):
+        summary[field] = dict(sorted(counter.items()))
+    return summary
+
+
+def _bucket_start(order_hour: datetime, bucket: StatsBucket) -> datetime:
+    if bucket == "day":
+        return order_hour.replace(hour=0)
+    if bucket == "month":
+        return order_hour.replace(day=1, hour=0)
+    return order_hour
+
+
+def _record_projector(fields: list[str]) -> Callable[[ServiceOrderRecord], dict[str, Any]]:
+    _validate_fields(fields)
+
+    if _RECORD_HEADER_FIELDS.issuperset(fields):
+        names = [(field, _SERVICE_ORDER_FIELD_NAMES[field]) for field in fields]
+
+        def project_header(record: ServiceOrderRecord) -> dict[str, Any]:
+            return {field: _json_scalar(getattr(record, name)) for field, name in names}
+
+        return project_header
+
+    def project_payload(record: ServiceOrderRecord) -> dict[str, Any]:
+        data = json.loads(record.payload)
+        return {field: data.get(field) for field in fields}
+
+    return project_payload
+
+
+def _json_scalar(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+def _dumps(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _validate_fields(fields: list[str]) -> None:
+    invalid_fields = sorted(set(fields).difference(_SERVICE_ORDER_FIELDS))
+    if invalid_fields:
+        invalid_str = ", ".join(invalid_fields)
+        raise InvalidFieldSelectionError(
+            f"Unsupported fields in 'fields' selection: {invalid_str}."
+        )
+
+
 def _apply_date_filter(
-    service_orders: list[ServiceOrder], field_name: str, operator: str, filter_value: str
-) -> list[ServiceOrder]:
+    service_orders: list[OrderT], field_name: str, operator: str, filter_value: str
+) -> list[OrderT]:
     filter_datetime = _parse_datetime(filter_value, field_name=field_name)
 
-    def matches(order: ServiceOrder) -> bool:
+    def matches(order: OrderT) -> bool:
         value = _order_value(order, field_name)
         if not isinstance(value, datetime):
             return False
@@ -97,8 +371,41 @@ def _apply_date_filter(
     return [order for order in service_orders if matches(order)]
 
 
-def _order_value(order: ServiceOrder, alias_name: str) -> Any:
-    return order.model_dump(by_alias=True, mode="python", exclude_none=False).get(alias_name)
+def _order_value(order: ServiceOrder | ServiceOrderRecord, alias_name: str) -> Any:
+    return getattr(order, _SERVICE_ORDER_FIELD_NAMES[alias_name])
+
+
+def _order_attributes(order: ServiceOrder | ServiceOrderRecord) -> frozenset[tuple[str, str]]:
+    if isinstance(order, ServiceOrderRecord):
+        return attribute_values(json.loads(order.payload))
+    return attribute_values(order.model_dump(by_alias=True, mode="json", exclude_none=True))
+
+
+def _sort_key(
+    order: ServiceOrder | ServiceOrderRecord, sort_keys: list[SortKey]
+) -> tuple[Any, ...]:
+    # Per field (missing, value) so missing values compare without touching the value;
+    # descending fields use an order-reversing transform of the value instead.
+    key: list[Any] = []
+    for field, descending in sort_keys:
+        value = _order_value(order, field)
+        if isinstance(value, Enum):
+            value = value.value
+        elif isinstance(value, datetime) and value.tzinfo is None:
+            value = value.replace(tzinfo=UTC)
+        if descending:
+            key.append((value is None, None if value is None else _descending(value)))
+        else:
+            key.append((value is not None, value))
+    return tuple(key)
+
+
+def _descending(value: str | datetime) -> Any:
+    if isinstance(value, datetime):
+        return _EPOCH - value
+    # Negated code points, terminated by a value above all of them so that a longer
+    # string sorts before its own prefix.
+    return (*(-ord(character) for character in value), 1)
 
 
 def _normalize_scalar(value: Any) -> str:
@@ -1,115 +1,373 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
+import re
+from collections import Counter
 from collections.abc import Mapping
+from contextlib import suppress
 from copy import deepcopy
+from dataclasses import replace
 from datetime import UTC, datetime
-from typing import Any
+from functools import partial
+from typing import Any, Literal, TypeVar
 
-from app.models.enums import ServiceOrderItemStateType, ServiceOrderStateType
-from app.models.service_order import ServiceOrder, ServiceOrderCreate, ServiceOrderPatch
-from app.repositories.memory_store import InMemoryStore
+import anyio.to_thread
+from pydantic import BaseModel
+
+from app.models.enums import (
+    TERMINAL_SERVICE_ORDER_STATES,
+    ServiceOrderItemStateType,
+    ServiceOrderStateType,
+)
+from app.models.service_order import (
+    ServiceOrder,
+    ServiceOrderCreate,
+    ServiceOrderItem,
+    ServiceOrderPatch,
+)
+from app.observability.timing import phase
+from app.repositories.base import Repository, ResponseCache
+from app.repositories.memory_store import ServiceOrderRecord, StatsKey, stats_key
+from app.repositories.search import NESTED_FILTER_PATHS, query_terms
 from app.services.notification_service import NotificationService
-from app.services.query_service import apply_order_filters, project_order, project_orders
+from app.services.query_service import (
+    SortKey,
+    StatsBucket,
+    apply_order_filters,
+    filter_stats_groups,
+    first_orders_in_order,
+    render_batch_json,
+    render_changes_json,
+    render_order_json,
+    render_orders_json,
+    render_stats_json,
+    select_orders,
+)
+from app.services.watch_service import OrderWatchers
 from app.utils.errors import NotFoundError
 
+WatchTarget = Literal["state", "change"]
+ValueT = TypeVar("ValueT")
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
 
 class ServiceOrderService:
     def __init__(
         self,
-        store: InMemoryStore,
+        store: Repository,
         resource_path: str = "/serviceOrder",
         notification_service: NotificationService | None = None,
+        idempotency_cache: ResponseCache | None = None,
+        watchers: OrderWatchers | None = None,
+        watch_poll_interval_seconds: float | None = None,
     ) -> None:
         self._store = store
         self._resource_path = resource_path.rstrip("/") or "/serviceOrder"
         self._notification_service = notification_service
+        self._idempotency_cache = idempotency_cache
+        self._watchers = watchers
+        self._watch_poll_interval_seconds = watch_poll_interval_seconds
 
     def create_service_order(
-        self, payload: ServiceOrderCreate, fields: list[str] | None = None
-    ) -> dict[str, Any]:
-        now = datetime.now(UTC)
-        service_order_id = self._store.next_service_order_id()
-        payload_data = payload.model_dump(by_alias=True, mode="python", exclude_none=True)
-
-        payload_data["id"] = service_order_id
-        payload_data["href"] = f"{self._resource_path}/{service_order_id}"
-        payload_data["state"] = ServiceOrderStateType.ACKNOWLEDGED.value
-        payload_data["orderDate"] = now
-        payload_data["completionDate"] = None
-        payload_data["startDate"] = None
-        payload_data.setdefault("priority", "4")
-        payload_data.setdefault(
-            "expectedCompletionDate", payload_data.get("requestedCompletionDate")
+        self,
+        payload: ServiceOrderCreate,
+        fields: list[str] | None = None,
+        idempotency_key: str | None = None,
+    ) -> bytes:
+        if idempotency_key is None or self._idempotency_cache is None:
+            return self._create_service_order(payload, fields)
+
+        return self._idempotency_cache.run_once(
+            key=idempotency_key,
+            fingerprint=_request_fingerprint(payload, fields),
+            operation=lambda: self._create_service_order(payload, fields),
         )
-        payload_data.setdefault("@type", "ServiceOrder")
-
-        for order_item in payload_data.get("orderItem", []):
-            if isinstance(order_item, dict):
-                order_item["state"] = ServiceOrderItemStateType.ACKNOWLEDGED.value
 
-        created_order = ServiceOrder.model_validate(payload_data)
-        persisted_order = self._store.create_service_order(created_order)
+    def _create_service_order(
+        self, payload: ServiceOrderCreate, fields: list[str] | None
+    ) -> bytes:
+        with phase("store"):
+            service_order_id = self._store.next_service_order_id()
+        created_order = _build_service_order(
+            payload,
+            service_order_id=service_order_id,
+            href=f"{self._resource_path}/{service_order_id}",
+            order_date=datetime.now(UTC),
+        )
+        with phase("store"):
+            record = self._store.create_service_order(created_order)
 
         if self._notification_service is not None:
-            self._notification_service.emit_service_order_create(persisted_order)
+            with phase("notify"):
+                self._notification_service.emit_service_order_create(created_order)
 
-        return project_order(persisted_order, fields)
+        return render_order_json(record, fields)
 
     def list_service_orders(
-        self, filters: Mapping[str, str], fields: list[str] | None = None
-    ) -> list[dict[str, Any]]:
-        service_orders = self._store.list_service_orders()
-        filtered_orders = apply_order_filters(service_orders, filters)
-        return project_orders(filtered_orders, fields)
+        self,
+        filters: Mapping[str, str],
+        fields: list[str] | None = None,
+        q: str | None = None,
+        sort: list[SortKey] | None = None,
+        limit: int | None = None,
+        include_archived: bool = False,
+    ) -> bytes:
+        """
+        Orders matching `filters` and the `q` words, sorted by `sort`, at most `limit`.
+
+        Without `q` or nested-attribute filters, a limited listing sorted by
+        `orderDate` first walks the store's ordered index and stops as soon as the
+        first `limit` orders are known. `include_archived` adds the archived orders,
+        read by a scan of the archive after the hot ones.
+        """
+
+        terms = frozenset[str]() if q is None else query_terms(q)
+        # Nested-attribute filters are answered by the store's attribute index.
+        attributes = frozenset(
+            (key, value) for key, value in filters.items() if key in NESTED_FILTER_PATHS
+        )
+        other_filters = {
+            key: value for key, value in filters.items() if key not in NESTED_FILTER_PATHS
+        }
+        scan_needed = bool(terms or attributes) or include_archived
+        if sort and limit is not None and sort[0][0] == "orderDate" and not scan_needed:
+            # The store filters each chunk it reads and inflates only the matches.
+            matching = self._store.iter_service_order_records_by_order_date(
+                descending=sort[0][1], select=partial(apply_order_filters, filters=other_filters)
+            )
+            with phase("filter"):
+                first = first_orders_in_order(matching, sort, limit)
+            return render_orders_json(first, fields)
+
+        select = partial(select_orders, filters=other_filters, sort_keys=sort, limit=limit)
+        with phase("store"):
+            if include_archived:
+                records = _with_archived(
+                    self._store.search_service_order_records(terms, attributes)
+                    if terms or attributes
+                    else self._store.list_service_order_records(),
+                    self._store.list_archived_service_order_records(terms, attributes),
+                )
+                selected = select(records)
+            elif terms or attributes:
+                selected = self._store.search_service_order_records(terms, attributes, select)
+            else:
+                selected = self._store.list_service_order_records(select)
+        return render_orders_json(selected, fields)
+
+    def service_order_stats(
+        self, filters: Mapping[str, str], bucket: StatsBucket | None = None
+    ) -> bytes:
+        """
+        Order counts by state, category and priority, optionally per orderDate bucket.
+
+        Served from the store's stats counters in O(groups); only filters the
+        counters cannot answer fall back to filtering the stored orders.
+        """
+
+        with phase("store"):
+            groups = self._store.service_order_stats()
+        with phase("filter"):
+            filtered = filter_stats_groups(groups, filters)
+        if filtered is None:
+            attributes = frozenset(
+                (key, value) for key, value in filters.items() if key in NESTED_FILTER_PATHS
+            )
+            select = partial(
+                select_orders,
+                filters={
+                    key: value for key, value in filters.items() if key not in NESTED_FILTER_PATHS
+                },
+            )
+            with phase("store"):
+                records = (
+                    self._store.search_service_order_records(attributes=attributes, select=select)
+                    if attributes
+                    else self._store.list_service_order_records(select)
+                )
+            filtered = dict(Counter[StatsKey](stats_key(record) for record in records))
+        with phase("serialize"):
+            return render_stats_json(filtered, bucket)
 
     def get_service_order(
         self, service_order_id: str, fields: list[str] | None = None
-    ) -> dict[str, Any]:
-        service_order = self._store.get_service_order(service_order_id)
-        if service_order is None:
-            raise NotFoundError(f"ServiceOrder with id '{service_order_id}' was not found.")
-        return project_order(service_order, fields)
+    ) -> bytes:
+        return render_order_json(self._required_record(service_order_id), fields)
+
+    def get_service_orders(
+        self, service_order_ids: list[str], fields: list[str] | None = None
+    ) -> bytes:
+        """Found orders in request order (each id once) and the ids that do not exist."""
+
+        requested = list(dict.fromkeys(service_order_ids))
+        with phase("store"):
+            found = self._store.get_service_order_records(requested)
+        records = [found[order_id] for order_id in requested if order_id in found]
+        missing = [order_id for order_id in requested if order_id not in found]
+        return render_batch_json(records, missing, fields)
+
+    async def watch_service_order(
+        self,
+        service_order_id: str,
+        wait_for: WatchTarget,
+        timeout_seconds: float,
+        fields: list[str] | None = None,
+    ) -> bytes:
+        """
+        Long-poll a single order.
+
+        Returns as soon as the order's state (`wait_for="state"`) or any part of it
+        (`wait_for="change"`) differs from when the request arrived, or the order as
+        it is once `timeout_seconds` elapse. Orders already in a terminal state are
+        returned immediately when waiting for a state change. While parked the
+        request holds no thread: it waits on a future that the store's change
+        listener resolves. With a store shared between processes the order is also
+        re-read every `watch_poll_interval_seconds`.
+        """
+
+        if self._watchers is None:
+            return await anyio.to_thread.run_sync(
+                self.get_service_order, service_order_id, fields
+            )
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_seconds
+        initial: ServiceOrderRecord | None = None
+        while True:
+            with self._watchers.watch(service_order_id) as changed:
+                current = await anyio.to_thread.run_sync(self._required_record, service_order_id)
+                if initial is None:
+                    initial = current
+                    if wait_for == "state" and current.state in TERMINAL_SERVICE_ORDER_STATES:
+                        break
+                elif _watch_satisfied(initial, current, wait_for):
+                    break
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                with suppress(TimeoutError):
+                    async with asyncio.timeout(
+                        min(remaining, self._watch_poll_interval_seconds or remaining)
+                    ):
+                        await changed
+        return render_order_json(current, fields)
+
+    def list_changes(self, since: int, limit: int, fields: list[str] | None = None) -> bytes:
+        """
+        Changes after sequence `since`, oldest first, at most one per order.
+
+        `nextSince` is the sequence to resume from: the last returned change while
+        more are pending, otherwise the store's latest sequence.
+        """
+
+        with phase("store"):
+            changes, head = self._store.list_service_order_changes(since, limit + 1)
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        next_since = changes[-1].sequence if has_more else max(head, since)
+        with phase("serialize"):
+            return render_changes_json(changes, next_since, has_more, fields)
 
     def patch_service_order(
         self, service_order_id: str, payload: Mapping[str, Any]
     ) -> dict[str, str]:
-        service_order = self._store.get_service_order(service_order_id)
-        if service_order is None:
+        with phase("store"):
+            record = self._store.get_service_order_record(service_order_id)
+        if record is None:
             raise NotFoundError(f"ServiceOrder with id '{service_order_id}' was not found.")
-        previous_state = service_order.state
 
         patch_model = ServiceOrderPatch.model_validate(
-            payload, context={"order_state": service_order.state}
+            payload, context={"order_state": record.state}
         )
         patch_data = patch_model.model_dump(by_alias=True, mode="python", exclude_unset=True)
 
         if patch_data:
-            current_data = service_order.model_dump(
-                by_alias=True, mode="python", exclude_none=False
-            )
-            merged_data = _merge_patch(current_data, patch_data)
-            merged_data["id"] = service_order.id
-            merged_data["href"] = service_order.href
+            merged_data = _merge_patch(json.loads(record.payload), patch_data)
+            merged_data["id"] = record.id
+            merged_data["href"] = record.href
 
-            updated_order = ServiceOrder.model_validate(merged_data)
-            service_order = self._store.update_service_order(updated_order)
-            self._emit_patch_notifications(previous_state=previous_state, current=service_order)
+            with phase("validate"):
+                updated_order = ServiceOrder.model_validate(merged_data)
+            with phase("store"):
+                self._store.update_service_order(updated_order)
+            self._emit_patch_notifications(previous_state=record.state, current=updated_order)
 
         return {
-            "id": _required_value(service_order.id, "id"),
-            "href": _required_value(service_order.href, "href"),
+            "id": record.id,
+            "href": _required_value(record.href, "href"),
         }
 
+    def get_order_item(self, service_order_id: str, order_item_id: str) -> bytes:
+        record = self._required_record(service_order_id)
+        order = record.payload.decode()
+        start, end, _ = _locate_order_item(order, record.id, order_item_id)
+        return order[start:end].encode()
+
+    def patch_order_item(
+        self, service_order_id: str, order_item_id: str, payload: Mapping[str, Any]
+    ) -> bytes:
+        """
+        RFC7386 merge patch of one order item; returns the updated item.
+
+        Only the item is validated: the patch with the same rules (and order state
+        check) as an `orderItem` entry of an order patch, and the merged item as a
+        ServiceOrderItem. The item's JSON is spliced into the stored order JSON in
+        place; the rest of the order is neither decoded nor re-encoded.
+        """
+
+        record = self._required_record(service_order_id)
+        order = record.payload.decode()
+        start, end, current_item = _locate_order_item(order, record.id, order_item_id)
+
+        patch_model = ServiceOrderPatch.model_validate(
+            {"orderItem": [payload]}, context={"order_state": record.state}
+        )
+        patch_items = _required_value(patch_model.order_item, "orderItem")
+        patch_data = patch_items[0].model_dump(by_alias=True, mode="python", exclude_unset=True)
+
+        if not patch_data:
+            return order[start:end].encode()
+
+        with phase("validate"):
+            order_item = ServiceOrderItem.model_validate(_merge_patch(current_item, patch_data))
+        with phase("serialize"):
+            item_json = _dumps(order_item.model_dump(by_alias=True, mode="json", exclude_none=True))
+            updated = replace(
+                record, payload=b"".join((order[:start].encode(), item_json, order[end:].encode()))
+            )
+        with phase("store"):
+            self._store.update_service_order_record(updated)
+        if self._notification_service is not None:
+            with phase("notify"):
+                self._notification_service.emit_service_order_record_attribute_value_change(
+                    updated
+                )
+        return item_json
+
     def delete_service_order(self, service_order_id: str) -> None:
-        service_order = self._store.get_service_order(service_order_id)
-        if service_order is None:
-            raise NotFoundError(f"ServiceOrder with id '{service_order_id}' was not found.")
+        with phase("store"):
+            record = self._store.get_service_order_record(service_order_id)
+            if record is None:
+                raise NotFoundError(f"ServiceOrder with id '{service_order_id}' was not found.")
+            deleted = self._store.delete_service_order(service_order_id)
 
-        deleted = self._store.delete_service_order(service_order_id)
         if not deleted:
             raise NotFoundError(f"ServiceOrder with id '{service_order_id}' was not found.")
         if self._notification_service is not None:
-            self._notification_service.emit_service_order_delete(service_order)
+            with phase("notify"):
+                self._notification_service.emit_service_order_delete(record.to_order())
+
+    def _required_record(self, service_order_id: str) -> ServiceOrderRecord:
+        with phase("store"):
+            record = self._store.get_service_order_record(service_order_id)
+        if record is None:
+            raise NotFoundError(f"ServiceOrder with id '{service_order_id}' was not found.")
+        return record
 
     def _emit_patch_notifications(
         self,
@@ -119,17 +377,128 @@ class ServiceOrderService:
         if self._notification_service is None:
             return
 
-        self._notification_service.emit_service_order_attribute_value_change(current)
-        if current.state != previous_state:
-            self._notification_service.emit_service_order_state_change(current)
+        with phase("notify"):
+            self._notification_service.emit_service_order_attribute_value_change(current)
+            if current.state != previous_state:
+                self._notification_service.emit_service_order_state_change(current)
+
+
+def _watch_satisfied(
+    initial: ServiceOrderRecord, current: ServiceOrderRecord, wait_for: WatchTarget
+) -> bool:
+    if wait_for == "state":
+        return current.state != initial.state
+    return current.payload != initial.payload
 
 
-def _required_value(value: str | None, field_name: str) -> str:
+def _locate_order_item(
+    order: str, service_order_id: str, order_item_id: str
+) -> tuple[int, int, dict[str, Any]]:
+    """
+    Start and end offsets of an order item in the stored order JSON, and the item.
+
+    Walks the top-level members of the order: members before `orderItem` and the
+    items before the wanted one are decoded to be skipped, the rest is not read.
+    """
+
+    decode = _DECODER.raw_decode
+    position = _skip_whitespace(order, _skip_whitespace(order, 0) + 1)  # past "{"
+    while order[position] == '"':
+        key, position = decode(order, position)
+        position = _skip_whitespace(order, _skip_whitespace(order, position) + 1)  # past ":"
+        if key != "orderItem":
+            _, position = decode(order, position)
+        else:
+            position = _skip_whitespace(order, position + 1)  # past "["
+            while order[position] != "]":
+                start = position
+                order_item, position = decode(order, position)
+                if isinstance(order_item, dict) and order_item.get("id") == order_item_id:
+                    return start, position, order_item
+                position = _skip_separator(order, position)
+            break
+        position = _skip_separator(order, position)
+    raise NotFoundError(
+        f"ServiceOrder '{service_order_id}' has no orderItem with id '{order_item_id}'."
+    )
+
+
+def _skip_whitespace(document: str, position: int) -> int:
+    match = _WHITESPACE.match(document, position)
+    return position if match is None else match.end()
+
+
+def _skip_separator(document: str, position: int) -> int:
+    position = _skip_whitespace(document, position)
+    if document[position] == ",":
+        position = _skip_whitespace(document, position + 1)
+    return position
+
+
+def _dumps(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _required_value(value: ValueT | None, field_name: str) -> ValueT:
     if value is None:
         raise ValueError(f"Persisted ServiceOrder is missing required '{field_name}'.")
     return value
 
 
+def _with_archived(
+    records: list[ServiceOrderRecord], archived: list[ServiceOrderRecord]
+) -> list[ServiceOrderRecord]:
+    # An order archived between the two reads is in both; keep its hot copy.
+    if not archived:
+        return records
+    hot_ids = {record.id for record in records}
+    return [*records, *(record for record in archived if record.id not in hot_ids)]
+
+
+def _build_service_order(
+    payload: ServiceOrderCreate, service_order_id: str, href: str, order_date: datetime
+) -> ServiceOrder:
+    """
+    Build the stored ServiceOrder from an already validated create payload.
+
+    The payload passed full validation on the way in, so the order is assembled with
+    model_construct and only server-managed fields are assigned, without a second pass
+    over every nested orderItem, relatedParty and note.
+    """
+
+    order_items = [
+        ServiceOrderItem.model_construct(
+            **_field_values(order_item), state=ServiceOrderItemStateType.ACKNOWLEDGED
+        )
+        for order_item in payload.order_item
+    ]
+
+    values = _field_values(payload)
+    values.update(
+        id=service_order_id,
+        href=href,
+        state=ServiceOrderStateType.ACKNOWLEDGED,
+        order_date=order_date,
+        order_item=order_items,
+        priority="4" if payload.priority is None else payload.priority,
+        expected_completion_date=payload.requested_completion_date,
+        type_="ServiceOrder" if payload.type_ is None else payload.type_,
+    )
+    return ServiceOrder.model_construct(**values)
+
+
+def _field_values(model: BaseModel) -> dict[str, Any]:
+    values: dict[str, Any] = dict(model.model_extra or {})
+    values.update((name, getattr(model, name)) for name in type(model).model_fields)
+    return values
+
+
+def _request_fingerprint(payload: ServiceOrderCreate, fields: list[str] | None) -> str:
+    digest = hashlib.sha256(payload.model_dump_json(by_alias=True, exclude_none=True).encode())
+    digest.update(b"\0" + ",".join(fields or []).encode())
+    return digest.hexdigest()
+
+
 def _merge_patch(target: Any, patch: Any) -> Any:
     """
     RFC7386 merge patch for dict-like payloads.
@@ -163,23 +532,3 @@ def _merge_patch(target: Any, patch: Any) -> Any:
 
     return result
 
-
-_store = InMemoryStore()
-_notification_service = NotificationService(store=_store)
-_service_order_service = ServiceOrderService(
-    store=_store,
-    notification_service=_notification_service,
-)
-
-
-def get_store() -> InMemoryStore:
-    return _store
-
-
-def get_service_order_service() -> ServiceOrderService:
-    return _service_order_service
-
-
-def get_notification_service() -> NotificationService:
-    return _notification_service
-
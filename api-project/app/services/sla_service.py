@@ -0,0 +1,204 @@
+import asyncio
+import heapq
+import logging
+import math
+import threading
+from datetime import UTC, datetime
+
+import anyio.to_thread
+
+from app.models.enums import TERMINAL_SERVICE_ORDER_STATES
+from app.observability.metrics import SLA_BREACHES
+from app.repositories.base import Repository
+from app.repositories.memory_store import ServiceOrderRecord
+from app.services.notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
+
+# Deadline of an open order, by precedence: (field alias, ServiceOrderRecord attribute).
+# Create copies requestedCompletionDate into expectedCompletionDate, so the expected
+# date is the one to watch and the requested date only stands in when it is unset.
+SLA_DEADLINE_FIELDS = (
+    ("expectedCompletionDate", "expected_completion_date"),
+    ("requestedCompletionDate", "requested_completion_date"),
+)
+
+# A pending deadline is keyed by its service order id.
+TimerKey = str
+
+
+class DeadlineTimers:
+    """
+    Pending deadlines in a calendar queue of `resolution_seconds` wide buckets.
+
+    Each bucket is a set of timer keys; a heap holds the bucket numbers. Scheduling
+    into an existing bucket and cancelling are set operations (O(1)); only the first
+    timer of a bucket pushes onto the heap. Emptied buckets leave their heap entry
+    behind to be skipped when popped, and the heap is rebuilt once such entries
+    outnumber the live buckets. Timers fire at most one bucket late, never early.
+    """
+
+    def __init__(self, resolution_seconds: float = 1.0) -> None:
+        self._resolution_seconds = resolution_seconds
+        self._lock = threading.Lock()
+        self._buckets: dict[int, set[TimerKey]] = {}
+        self._bucket_heap: list[int] = []
+        self._bucket_of: dict[TimerKey, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._bucket_of)
+
+    def schedule(self, key: TimerKey, deadline: datetime) -> None:
+        """Set the deadline of `key`, replacing any earlier one."""
+
+        bucket = math.ceil(deadline.timestamp() / self._resolution_seconds)
+        with self._lock:
+            current = self._bucket_of.get(key)
+            if current == bucket:
+                return
+            if current is not None:
+                self._discard(key, current)
+            self._bucket_of[key] = bucket
+            keys = self._buckets.get(bucket)
+            if keys is not None:
+                keys.add(key)
+                return
+            self._buckets[bucket] = {key}
+            if len(self._bucket_heap) > 2 * len(self._buckets) + 64:
+                self._bucket_heap = list(self._buckets)
+                heapq.heapify(self._bucket_heap)
+            else:
+                heapq.heappush(self._bucket_heap, bucket)
+
+    def cancel(self, key: TimerKey) -> None:
+        with self._lock:
+            bucket = self._bucket_of.pop(key, None)
+            if bucket is not None:
+                self._discard(key, bucket)
+
+    def pop_due(self, now: datetime) -> list[TimerKey]:
+        """Remove and return the timers whose deadline is at or before `now`."""
+
+        last_due = math.floor(now.timestamp() / self._resolution_seconds)
+        due: list[TimerKey] = []
+        with self._lock:
+            while self._bucket_heap and self._bucket_heap[0] <= last_due:
+                keys = self._buckets.pop(heapq.heappop(self._bucket_heap), None)
+                if keys:
+                    due.extend(keys)
+                    for key in keys:
+                        del self._bucket_of[key]
+        return due
+
+    def _discard(self, key: TimerKey, bucket: int) -> None:
+        keys = self._buckets[bucket]
+        keys.discard(key)
+        if not keys:
+            del self._buckets[bucket]
+
+
+class SlaMonitor:
+    """
+    Emits `ServiceOrderJeopardyAlertNotification` when an open order passes its
+    `expectedCompletionDate` (or `requestedCompletionDate` when no expected date
+    is set).
+
+    Deadlines are loaded once at start and then follow the store's change listener:
+    every create, patch and delete reschedules or cancels the order's timer, so
+    no order is ever scanned again. A background task fires due timers every
+    `resolution_seconds`; each order is alerted once per deadline value. The
+    (order, deadline) pairs already alerted are remembered so that later changes
+    to the order do not schedule the same deadline again; deadlines already passed
+    at start are taken as alerted by the previous run.
+    """
+
+    def __init__(
+        self,
+        store: Repository,
+        notification_service: NotificationService,
+        resolution_seconds: float = 1.0,
+    ) -> None:
+        self._store = store
+        self._notification_service = notification_service
+        self._resolution_seconds = resolution_seconds
+        self._timers = DeadlineTimers(resolution_seconds)
+        # Deadline each order was last alerted for, by service order id.
+        self._alerted: dict[str, datetime] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def start(self) -> None:
+        """Load the deadlines of stored orders and start firing them on the running loop."""
+
+        now = datetime.now(UTC)
+        for record in self._store.list_service_order_records():
+            deadline = _deadline(record)
+            if deadline is not None and deadline[1] <= now:
+                self._alerted[record.id] = deadline[1]
+            self._track(record.id, record)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def on_change(self, service_order_id: str) -> None:
+        """Store change listener: reschedule the order's deadlines."""
+
+        self._track(service_order_id, self._store.get_service_order_record(service_order_id))
+
+    def fire_due(self, now: datetime | None = None) -> int:
+        """Emit an alert for every deadline passed by `now`; returns the number emitted."""
+
+        now = now or datetime.now(UTC)
+        emitted = 0
+        for service_order_id in self._timers.pop_due(now):
+            record = self._store.get_service_order_record(service_order_id)
+            if record is None or record.state in TERMINAL_SERVICE_ORDER_STATES:
+                continue
+            tracked = _deadline(record)
+            if tracked is None:
+                continue
+            field, deadline = tracked
+            if deadline > now:
+                self._timers.schedule(service_order_id, deadline)
+                continue
+            self._alerted[service_order_id] = deadline
+            SLA_BREACHES.labels(field).inc()
+            self._notification_service.emit_service_order_jeopardy_alert(record, field)
+            emitted += 1
+        return emitted
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._resolution_seconds)
+            try:
+                await anyio.to_thread.run_sync(self.fire_due)
+            except Exception:
+                logger.exception("SLA deadline check failed")
+
+    def _track(self, service_order_id: str, record: ServiceOrderRecord | None) -> None:
+        deadline = None
+        if record is not None and record.state not in TERMINAL_SERVICE_ORDER_STATES:
+            deadline = _deadline(record)
+        if deadline is None:
+            self._alerted.pop(service_order_id, None)
+            self._timers.cancel(service_order_id)
+        elif self._alerted.get(service_order_id) == deadline[1]:
+            self._timers.cancel(service_order_id)
+        else:
+            self._alerted.pop(service_order_id, None)
+            self._timers.schedule(service_order_id, deadline[1])
+
+
+def _deadline(record: ServiceOrderRecord) -> tuple[str, datetime] | None:
+    """The tracked deadline of `record`: its field alias and (UTC) value."""
+
+    for field, attribute in SLA_DEADLINE_FIELDS:
+        value: datetime | None = getattr(record, attribute)
+        if value is not None:
+            return field, value if value.tzinfo is not None else value.replace(tzinfo=UTC)
+    return None
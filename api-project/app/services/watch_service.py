@@ -0,0 +1,66 @@
+import asyncio
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from app.utils.errors import CapacityExceededError
+
+
+class OrderWatchers:
+    """
+    Parks coroutines until a specific service order changes.
+
+    Each waiter is a bare future in a per-order set, so an idle watch costs one
+    future and a set slot. `notify` may be called from any thread (store writes run
+    in the thread pool); it only schedules a wake-up on the event loop when the
+    order actually has waiters.
+    """
+
+    def __init__(self, max_waiters: int = 50_000) -> None:
+        self._max_waiters = max_waiters
+        self._waiter_count = 0
+        self._waiters: dict[str, set[asyncio.Future[None]]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def __len__(self) -> int:
+        return self._waiter_count
+
+    @contextmanager
+    def watch(self, service_order_id: str) -> Iterator[asyncio.Future[None]]:
+        """
+        Register a waiter for `service_order_id`; the future resolves on its next change.
+
+        Register before reading the current order, so a change that lands in between
+        still resolves the future instead of being lost.
+        """
+
+        if self._waiter_count >= self._max_waiters:
+            raise CapacityExceededError("Too many concurrent watch requests.")
+
+        self._loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = self._loop.create_future()
+        self._waiters.setdefault(service_order_id, set()).add(future)
+        self._waiter_count += 1
+        try:
+            yield future
+        finally:
+            self._waiter_count -= 1
+            waiters = self._waiters.get(service_order_id)
+            if waiters is not None:
+                waiters.discard(future)
+                if not waiters:
+                    del self._waiters[service_order_id]
+
+    def notify(self, service_order_id: str) -> None:
+        loop = self._loop
+        if loop is None or service_order_id not in self._waiters:
+            return
+        try:
+            loop.call_soon_threadsafe(self._wake, service_order_id)
+        except RuntimeError:
+            # The loop is closed (application shutdown); nobody is waiting anymore.
+            return
+
+    def _wake(self, service_order_id: str) -> None:
+        for future in self._waiters.get(service_order_id, ()):
+            if not future.done():
+                future.set_result(None)
@@ -1,7 +1,8 @@
 import os
 from functools import lru_cache
+from typing import Self
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 def _to_bool(value: str | None, default: bool) -> bool:
@@ -21,6 +22,34 @@ class Settings(BaseModel):
     port: int = Field(default=8080, ge=1, le=65535)
     reload: bool = Field(default=True)
     log_level: str = Field(default="INFO")
+    log_format: str = Field(default="text")
+    log_queue: bool = Field(default=False)
+    idempotency_cache_size: int = Field(default=1024, ge=1)
+    idempotency_ttl_seconds: float = Field(default=86400.0, gt=0)
+    workers: int = Field(default=1, ge=1)
+    storage_backend: str = Field(default="memory")
+    sqlite_path: str = Field(default="tmf641.sqlite3")
+    storage_compact: bool = Field(default=False)
+    archive_path: str | None = Field(default=None)
+    archive_after_seconds: float = Field(default=7 * 86400.0, gt=0)
+    archive_interval_seconds: float = Field(default=60.0, gt=0)
+    change_retention_seconds: float = Field(default=7 * 86400.0, ge=0)
+    watch_max_waiters: int = Field(default=50_000, ge=1)
+    watch_poll_interval_seconds: float = Field(default=1.0, gt=0)
+    sla_alerts: bool = Field(default=False)
+    sla_resolution_seconds: float = Field(default=1.0, gt=0)
+    server_timing: bool = Field(default=False)
+    compression: bool = Field(default=False)
+    compression_min_size: int = Field(default=1024, ge=0)
+    compression_offload_size: int = Field(default=256 * 1024, ge=0)
+    admission_control: bool = Field(default=False)
+    admission_read_concurrency: int = Field(default=64, ge=1)
+    admission_write_concurrency: int = Field(default=32, ge=1)
+    admission_bulk_concurrency: int = Field(default=8, ge=1)
+    admission_queue_depth: int = Field(default=128, ge=0)
+    admission_queue_timeout_seconds: float = Field(default=5.0, gt=0)
+    admission_retry_after_seconds: int = Field(default=1, ge=1)
+    admin_token: str | None = Field(default=None, min_length=16)
 
     @field_validator("environment")
     @classmethod
@@ -40,6 +69,42 @@ class Settings(BaseModel):
             raise ValueError(f"log_level must be one of: {', '.join(sorted(allowed))}")
         return normalized
 
+    @field_validator("log_format")
+    @classmethod
+    def validate_log_format(cls, value: str) -> str:
+        normalized = value.lower()
+        allowed = {"json", "text"}
+        if normalized not in allowed:
+            raise ValueError(f"log_format must be one of: {', '.join(sorted(allowed))}")
+        return normalized
+
+    @field_validator("storage_backend")
+    @classmethod
+    def validate_storage_backend(cls, value: str) -> str:
+        normalized = value.lower()
+        allowed = {"memory", "sqlite"}
+        if normalized not in allowed:
+            raise ValueError(f"storage_backend must be one of: {', '.join(sorted(allowed))}")
+        return normalized
+
+    @model_validator(mode="after")
+    def validate_worker_state(self) -> Self:
+        if self.workers > 1 and self.storage_backend == "memory":
+            raise ValueError(
+                "workers > 1 requires a shared storage_backend (sqlite); "
+                "the memory backend is private to each worker process."
+            )
+        return self
+
+    @model_validator(mode="after")
+    def validate_archive(self) -> Self:
+        if self.archive_path is not None and self.storage_backend != "memory":
+            raise ValueError(
+                "archive_path requires the memory storage_backend; "
+                "sqlite already keeps every order on disk."
+            )
+        return self
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -55,5 +120,35 @@ def get_settings() -> Settings:
         port=int(os.getenv("APP_PORT", "8080")),
         reload=_to_bool(os.getenv("APP_RELOAD"), True),
         log_level=os.getenv("APP_LOG_LEVEL", "INFO"),
+        log_format=os.getenv("APP_LOG_FORMAT", "text"),
+        log_queue=_to_bool(os.getenv("APP_LOG_QUEUE"), False),
+        idempotency_cache_size=int(os.getenv("APP_IDEMPOTENCY_CACHE_SIZE", "1024")),
+        idempotency_ttl_seconds=float(os.getenv("APP_IDEMPOTENCY_TTL_SECONDS", "86400")),
+        workers=int(os.getenv("APP_WORKERS", "1")),
+        storage_backend=os.getenv("APP_STORAGE_BACKEND", "memory"),
+        sqlite_path=os.getenv("APP_SQLITE_PATH", "tmf641.sqlite3"),
+        storage_compact=_to_bool(os.getenv("APP_STORAGE_COMPACT"), False),
+        archive_path=os.getenv("APP_ARCHIVE_PATH") or None,
+        archive_after_seconds=float(os.getenv("APP_ARCHIVE_AFTER_SECONDS", "604800")),
+        archive_interval_seconds=float(os.getenv("APP_ARCHIVE_INTERVAL_SECONDS", "60")),
+        change_retention_seconds=float(os.getenv("APP_CHANGE_RETENTION_SECONDS", "604800")),
+        watch_max_waiters=int(os.getenv("APP_WATCH_MAX_WAITERS", "50000")),
+        watch_poll_interval_seconds=float(os.getenv("APP_WATCH_POLL_INTERVAL_SECONDS", "1")),
+        sla_alerts=_to_bool(os.getenv("APP_SLA_ALERTS"), False),
+        sla_resolution_seconds=float(os.getenv("APP_SLA_RESOLUTION_SECONDS", "1")),
+        server_timing=_to_bool(os.getenv("APP_SERVER_TIMING"), False),
+        compression=_to_bool(os.getenv("APP_COMPRESSION"), False),
+        compression_min_size=int(os.getenv("APP_COMPRESSION_MIN_SIZE", "1024")),
+        compression_offload_size=int(os.getenv("APP_COMPRESSION_OFFLOAD_SIZE", "262144")),
+        admission_control=_to_bool(os.getenv("APP_ADMISSION_CONTROL"), False),
+        admission_read_concurrency=int(os.getenv("APP_ADMISSION_READ_CONCURRENCY", "64")),
+        admission_write_concurrency=int(os.getenv("APP_ADMISSION_WRITE_CONCURRENCY", "32")),
+        admission_bulk_concurrency=int(os.getenv("APP_ADMISSION_BULK_CONCURRENCY", "8")),
+        admission_queue_depth=int(os.getenv("APP_ADMISSION_QUEUE_DEPTH", "128")),
+        admission_queue_timeout_seconds=float(
+            os.getenv("APP_ADMISSION_QUEUE_TIMEOUT_SECONDS", "5")
+        ),
+        admission_retry_after_seconds=int(os.getenv("APP_ADMISSION_RETRY_AFTER_SECONDS", "1")),
+        admin_token=os.getenv("APP_ADMIN_TOKEN") or None,
     )
 
@@ -13,3 +13,10 @@ class InvalidFilterError(Exception):
 class InvalidFieldSelectionError(Exception):
     """Raised when unsupported fields selection is provided."""
 
+
+class CapacityExceededError(Exception):
+    """Raised when a bounded server resource is exhausted; the client should retry later."""
+
+
+class ChangeHistoryExpiredError(Exception):
+    """Raised when changes after the requested sequence were compacted; the client must resync."""
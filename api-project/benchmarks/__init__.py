@@ -0,0 +1 @@
+"""Micro-benchmarks for the TMF641 demo API hot paths."""
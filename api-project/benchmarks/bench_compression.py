@@ -0,0 +1,46 @@
+"""Compression CPU cost vs bytes saved: `uv run python -m benchmarks.bench_compression`."""
+
+from app.api.compression import available_codecs
+from app.models.service_order import ServiceOrderCreate
+from app.repositories.memory_store import InMemoryStore
+from app.services.service_order_service import ServiceOrderService
+from benchmarks.harness import measure
+from benchmarks.payloads import service_order_payload
+
+_SETTINGS = (
+    {"gzip_level": 1, "brotli_quality": 1, "zstd_level": 1},
+    {"gzip_level": 6, "brotli_quality": 4, "zstd_level": 3},
+    {"gzip_level": 9, "brotli_quality": 9, "zstd_level": 9},
+)
+
+
+def _list_body(count: int, order_items: int) -> bytes:
+    service = ServiceOrderService(store=InMemoryStore())
+    for index in range(count):
+        service.create_service_order(
+            ServiceOrderCreate.model_validate(service_order_payload(order_items, index))
+        )
+    return service.list_service_orders(filters={})
+
+
+def main() -> None:
+    for count, order_items in ((10, 10), (100, 10), (1000, 10), (100, 100)):
+        body = _list_body(count, order_items)
+        print(f"GET /serviceOrder orders={count} items={order_items}: {len(body) / 1024:,.0f} KiB")
+        for levels in _SETTINGS:
+            for name, codec in available_codecs(**levels).items():
+                level = {"gzip": "gzip_level", "br": "brotli_quality", "zstd": "zstd_level"}[name]
+                compressed = len(codec.compress(body))
+                result = measure(f"  {name}-{levels[level]}", lambda: codec.compress(body))
+                cpu_ms = result.seconds / result.iterations * 1000
+                saved_kib = (len(body) - compressed) / 1024
+                print(
+                    f"{result.name:<12} ratio {len(body) / compressed:>6.1f}x"
+                    f"  {cpu_ms:>9.3f} ms/body"
+                    f"  {len(body) / 1_048_576 / (cpu_ms / 1000):>8.1f} MiB/s"
+                    f"  {saved_kib / cpu_ms:>10,.0f} KiB saved per ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""Create-path throughput: `uv run python -m benchmarks.bench_create`."""
+
+from app.models.service_order import ServiceOrderCreate
+from app.repositories.memory_store import InMemoryStore
+from app.services.service_order_service import ServiceOrderService
+from benchmarks.harness import measure
+from benchmarks.payloads import service_order_payload
+
+
+def main() -> None:
+    for order_items in (1, 10, 100, 1000):
+        payload = ServiceOrderCreate.model_validate(service_order_payload(order_items))
+        service = ServiceOrderService(store=InMemoryStore())
+        result = measure(
+            f"create_service_order items={order_items}",
+            lambda: service.create_service_order(payload),
+        )
+        print(result.format())
+
+
+if __name__ == "__main__":
+    main()
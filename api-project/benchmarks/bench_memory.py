@@ -0,0 +1,77 @@
+"""Bytes retained per stored order, by shape: `uv run python -m benchmarks.bench_memory`."""
+
+import gc
+import tracemalloc
+from collections.abc import Callable
+
+from app.models.service_order import ServiceOrder
+from app.repositories.memory_store import InMemoryStore
+from benchmarks.suite import _order
+
+SHAPES = (1, 10, 100)
+
+
+def order_payloads(count: int, order_items: int) -> list[bytes]:
+    """Stored-form JSON of `count` distinct orders with `order_items` items each."""
+
+    return [
+        _order(order_items, index).model_dump_json(by_alias=True, exclude_none=True).encode()
+        for index in range(count)
+    ]
+
+
+def bytes_per_order(keep: Callable[[list[bytes]], object], payloads: list[bytes]) -> float:
+    """
+    Memory retained per order by whatever `keep(payloads)` returns.
+
+    Orders are parsed from JSON inside the traced section, so every string and
+    datetime they hold is counted, and transient objects are freed before the
+    retained size is read.
+    """
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    kept = keep(payloads)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del kept
+    return retained / len(payloads)
+
+
+def keep_models(payloads: list[bytes]) -> list[ServiceOrder]:
+    return [ServiceOrder.model_validate_json(payload) for payload in payloads]
+
+
+def keep_store(compact: bool) -> Callable[[list[bytes]], InMemoryStore]:
+    def fill(payloads: list[bytes]) -> InMemoryStore:
+        store = InMemoryStore(compact=compact)
+        for payload in payloads:
+            store.create_service_order(ServiceOrder.model_validate_json(payload))
+        return store
+
+    return fill
+
+
+def footprint(order_items: int, count: int) -> dict[str, float]:
+    payloads = order_payloads(count, order_items)
+    return {
+        "model": bytes_per_order(keep_models, payloads),
+        "record": bytes_per_order(keep_store(compact=False), payloads),
+        "compact": bytes_per_order(keep_store(compact=True), payloads),
+    }
+
+
+def main() -> None:
+    print(f"{'items':>6} {'ServiceOrder':>14} {'record':>10} {'compact':>10} {'model/compact':>14}")
+    for order_items in SHAPES:
+        sizes = footprint(order_items, count=max(100, 10_000 // order_items))
+        print(
+            f"{order_items:>6} {sizes['model']:>14,.0f} {sizes['record']:>10,.0f}"
+            f" {sizes['compact']:>10,.0f} {sizes['model'] / sizes['compact']:>13.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""List response serialization: `uv run python -m benchmarks.bench_serialize`."""
+
+import json
+from datetime import UTC, datetime
+
+from fastapi.encoders import jsonable_encoder
+
+from app.models.service_order import ServiceOrder, ServiceOrderCreate
+from app.repositories.memory_store import ServiceOrderRecord
+from app.services.query_service import project_orders, render_orders_json
+from app.services.service_order_service import _build_service_order
+from benchmarks.harness import measure
+from benchmarks.payloads import service_order_payload
+
+
+def _orders(count: int, order_items: int) -> list[ServiceOrder]:
+    now = datetime.now(UTC)
+    return [
+        _build_service_order(
+            ServiceOrderCreate.model_validate(service_order_payload(order_items, index)),
+            service_order_id=str(index),
+            href=f"/serviceOrder/{index}",
+            order_date=now,
+        )
+        for index in range(count)
+    ]
+
+
+def _dict_pipeline(orders: list[ServiceOrder], fields: list[str] | None) -> bytes:
+    # What FastAPI did for `list[dict[str, Any]]` return values before RawJSONResponse.
+    content = jsonable_encoder(project_orders(orders, fields))
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def main() -> None:
+    for count, order_items in ((1000, 1), (1000, 10), (100, 100)):
+        orders = _orders(count, order_items)
+        records = [ServiceOrderRecord.from_order(order) for order in orders]
+        size_kib = len(render_orders_json(records, None)) / 1024
+        for fields in (None, ["id", "href", "state"]):
+            label = f"orders={count} items={order_items} fields={','.join(fields or ['*'])}"
+            before = measure(f"dict {label}", lambda: _dict_pipeline(orders, fields))
+            after = measure(f"bytes {label}", lambda: render_orders_json(records, fields))
+            print(before.format())
+            print(after.format(), f"({size_kib:,.0f} KiB full body)")
+
+
+if __name__ == "__main__":
+    main()
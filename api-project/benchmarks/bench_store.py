@@ -0,0 +1,46 @@
+"""Store footprint and list latency: `uv run python -m benchmarks.bench_store`."""
+
+import gc
+import tracemalloc
+
+from app.models.service_order import ServiceOrderCreate
+from app.repositories.memory_store import InMemoryStore
+from app.services.service_order_service import ServiceOrderService
+from benchmarks.harness import measure
+from benchmarks.payloads import service_order_payload
+
+
+def _populated_service(count: int, order_items: int) -> tuple[ServiceOrderService, int]:
+    payloads = [
+        ServiceOrderCreate.model_validate(service_order_payload(order_items, index))
+        for index in range(count)
+    ]
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    service = ServiceOrderService(store=InMemoryStore())
+    for payload in payloads:
+        service.create_service_order(payload)
+    del payloads
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return service, retained
+
+
+def main() -> None:
+    for count, order_items in ((10_000, 1), (1000, 10), (100, 100)):
+        service, retained = _populated_service(count, order_items)
+        print(f"orders={count} items={order_items}: {retained / count:,.0f} bytes/order retained")
+        for filters, fields in (
+            ({}, None),
+            ({}, ["id", "href", "state"]),
+            ({"state": "acknowledged", "category": "none"}, None),
+        ):
+            label = f"list orders={count} items={order_items} filters={len(filters)}"
+            label += f" fields={','.join(fields or ['*'])}"
+            print(measure(label, lambda: service.list_service_orders(filters, fields)).format())
+
+
+if __name__ == "__main__":
+    main()
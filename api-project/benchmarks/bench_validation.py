@@ -0,0 +1,25 @@
+"""Create/patch payload validation: `uv run python -m benchmarks.bench_validation`."""
+
+from app.models.service_order import ServiceOrderCreate, ServiceOrderPatch
+from benchmarks.harness import measure
+from benchmarks.payloads import service_order_patch_payload, service_order_payload
+
+
+def main() -> None:
+    for order_items in (1, 10, 100, 1000, 5000):
+        create_payload = service_order_payload(order_items)
+        patch_payload = service_order_patch_payload(order_items)
+        create = measure(
+            f"ServiceOrderCreate items={order_items}",
+            lambda: ServiceOrderCreate.model_validate(create_payload),
+        )
+        patch = measure(
+            f"ServiceOrderPatch items={order_items}",
+            lambda: ServiceOrderPatch.model_validate(patch_payload),
+        )
+        print(create.format())
+        print(patch.format())
+
+
+if __name__ == "__main__":
+    main()
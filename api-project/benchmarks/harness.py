@@ -0,0 +1,116 @@
+import gc
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    iterations: int
+    seconds: float
+    # Set by `with_allocations`: highest traced memory during one call above the level
+    # before it, and memory blocks still allocated per call afterwards.
+    peak_bytes: int | None = None
+    retained_blocks: float | None = None
+
+    @property
+    def ops_per_second(self) -> float:
+        return self.iterations / self.seconds if self.seconds > 0 else float("inf")
+
+    def format(self) -> str:
+        per_op_us = self.seconds / self.iterations * 1_000_000
+        line = f"{self.name:<56} {self.ops_per_second:>12,.1f} ops/s {per_op_us:>12,.1f} us/op"
+        if self.peak_bytes is not None:
+            line += f" {self.peak_bytes / 1024:>10,.1f} KiB peak"
+        if self.retained_blocks is not None:
+            line += f" {self.retained_blocks:>8,.1f} blocks kept"
+        return line
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "iterations": self.iterations,
+            "seconds": self.seconds,
+            "ops_per_second": self.ops_per_second,
+            "peak_bytes": self.peak_bytes,
+            "retained_blocks": self.retained_blocks,
+        }
+
+
+def measure(
+    name: str, operation: Callable[[], object], min_seconds: float = 0.5
+) -> BenchmarkResult:
+    """Run `operation` repeatedly for at least `min_seconds` after one warm-up call."""
+
+    operation()
+    iterations = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_seconds:
+        operation()
+        iterations += 1
+        elapsed = time.perf_counter() - started
+    return BenchmarkResult(name=name, iterations=iterations, seconds=elapsed)
+
+
+def with_allocations(
+    result: BenchmarkResult, operation: Callable[[], object], calls: int = 5
+) -> BenchmarkResult:
+    """
+    Add allocation figures for `operation` to a timing result.
+
+    CPython 3.11 has no per-call allocation counter, so this reports the peak of
+    tracemalloc's traced memory during a call (how much the call allocates at
+    once) and the change in `sys.getallocatedblocks()` per call (what it keeps).
+    Tracing is slow, so it runs separately from `measure` and only a few calls.
+    """
+
+    gc.collect()
+    tracemalloc.start()
+    peak = 0
+    for _ in range(calls):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        operation()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    for _ in range(calls):
+        operation()
+    gc.collect()
+    # Less one block: the int holding the first count.
+    retained = (sys.getallocatedblocks() - blocks - 1) / calls
+    return replace(result, peak_bytes=peak, retained_blocks=retained)
+
+
+class _ListenerHandler(BaseHTTPRequestHandler):
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@contextmanager
+def local_listener() -> Iterator[str]:
+    """Stand-in notification listener on a loopback port that accepts every event."""
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ListenerHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/listener"
+    finally:
+        server.shutdown()
+        server.server_close()
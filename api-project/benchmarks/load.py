@@ -0,0 +1,303 @@
+"""
+End-to-end load driver: `uv run python -m benchmarks.load --duration 30 --concurrency 32`.
+
+Virtual users replay a weighted mix of create, filtered list, get, patch, delete
+and hub (register + unregister) requests built by `benchmarks.workload`, and the
+driver reports throughput and p50/p95/p99 latency per endpoint. The target is
+the app in-process over ASGI (default, settings from the `APP_*` environment), a
+running server (`--url`), or a uvicorn started for the run (`--spawn`, honouring
+`APP_WORKERS` and `APP_STORAGE_BACKEND`). Notifications go to a local stand-in
+listener.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from app.main import create_app
+from benchmarks.harness import local_listener
+from benchmarks.workload import WorkloadGenerator, WorkloadShape
+
+DEFAULT_MIX = {"create": 20, "list": 10, "get": 40, "patch": 20, "delete": 5, "hub": 5}
+_PATCH_HEADERS = {"Content-Type": "application/merge-patch+json"}
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class EndpointStats:
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter[str] = field(default_factory=Counter)
+
+    def summary(self, elapsed_seconds: float) -> dict[str, Any]:
+        ordered = sorted(self.latencies)
+        return {
+            "requests": len(ordered),
+            "requests_per_second": len(ordered) / elapsed_seconds,
+            "p50_ms": _percentile(ordered, 50) * 1000,
+            "p95_ms": _percentile(ordered, 95) * 1000,
+            "p99_ms": _percentile(ordered, 99) * 1000,
+            "max_ms": (ordered[-1] if ordered else 0.0) * 1000,
+            "statuses": dict(sorted(self.statuses.items())),
+        }
+
+
+class LoadDriver:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        generator: WorkloadGenerator,
+        mix: dict[str, int],
+        listener_url: str,
+        seed: int = 0,
+    ) -> None:
+        self._client = client
+        self._generator = generator
+        self._operations = list(mix)
+        self._weights = list(mix.values())
+        self._listener_url = listener_url
+        self._random = random.Random(seed)
+        self._order_ids: list[str] = []
+        self._created = 0
+        self.stats: dict[str, EndpointStats] = {}
+
+    async def preload(self, orders: int, concurrency: int) -> None:
+        """Create `orders` orders before the measured run; their latencies are discarded."""
+
+        remaining = iter(range(orders))
+
+        async def worker() -> None:
+            for _ in remaining:
+                await self._create()
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        self.stats.clear()
+
+    async def run(self, duration_seconds: float, concurrency: int) -> float:
+        """Run `concurrency` virtual users for `duration_seconds`; returns the elapsed time."""
+
+        started = time.perf_counter()
+        deadline = started + duration_seconds
+        await asyncio.gather(*(self._user(deadline) for _ in range(concurrency)))
+        return time.perf_counter() - started
+
+    async def _user(self, deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            operation = self._random.choices(self._operations, self._weights)[0]
+            if operation != "create" and operation != "hub" and not self._order_ids:
+                operation = "create"
+            await getattr(self, f"_{operation}")()
+
+    async def _create(self) -> None:
+        self._created += 1
+        payload = self._generator.create_payload(self._created)
+        response = await self._send("POST /serviceOrder", "POST", "/serviceOrder", json=payload)
+        if response is not None and response.status_code == 201:
+            self._order_ids.append(response.json()["id"])
+
+    async def _list(self) -> None:
+        query = self._generator.list_query()
+        await self._send("GET /serviceOrder", "GET", "/serviceOrder", params=query)
+
+    async def _get(self) -> None:
+        order_id = self._random.choice(self._order_ids)
+        await self._send("GET /serviceOrder/{id}", "GET", f"/serviceOrder/{order_id}")
+
+    async def _patch(self) -> None:
+        order_id = self._random.choice(self._order_ids)
+        await self._send(
+            "PATCH /serviceOrder/{id}",
+            "PATCH",
+            f"/serviceOrder/{order_id}",
+            content=json.dumps(self._generator.patch_payload()),
+            headers=_PATCH_HEADERS,
+        )
+
+    async def _delete(self) -> None:
+        index = self._random.randrange(len(self._order_ids))
+        order_id = self._order_ids[index]
+        self._order_ids[index] = self._order_ids[-1]
+        self._order_ids.pop()
+        await self._send("DELETE /serviceOrder/{id}", "DELETE", f"/serviceOrder/{order_id}")
+
+    async def _hub(self) -> None:
+        payload = self._generator.hub_payload(self._listener_url)
+        response = await self._send("POST /hub", "POST", "/hub", json=payload)
+        if response is not None and response.status_code == 201:
+            await self._send("DELETE /hub/{id}", "DELETE", f"/hub/{response.json()['id']}")
+
+    async def _send(
+        self, endpoint: str, method: str, url: str, **kwargs: Any
+    ) -> httpx.Response | None:
+        stats = self.stats.setdefault(endpoint, EndpointStats())
+        started = time.perf_counter()
+        try:
+            response = await self._client.request(method, url, **kwargs)
+        except httpx.HTTPError as exc:
+            stats.latencies.append(time.perf_counter() - started)
+            stats.statuses[type(exc).__name__] += 1
+            return None
+        stats.latencies.append(time.perf_counter() - started)
+        stats.statuses[str(response.status_code)] += 1
+        return response
+
+
+@asynccontextmanager
+async def asgi_client() -> AsyncIterator[httpx.AsyncClient]:
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            yield client
+
+
+@asynccontextmanager
+async def http_client(base_url: str, concurrency: int) -> AsyncIterator[httpx.AsyncClient]:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        yield client
+
+
+@contextmanager
+def spawned_server(startup_timeout_seconds: float = 30.0) -> Iterator[str]:
+    """Start `main.py` (uvicorn) on a free loopback port for the duration of the run."""
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    env = {**os.environ, "APP_HOST": "127.0.0.1", "APP_PORT": str(port), "APP_RELOAD": "false"}
+    env.setdefault("APP_LOG_LEVEL", "WARNING")
+    process = subprocess.Popen([sys.executable, "main.py"], cwd=_PROJECT_ROOT, env=env)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout_seconds
+        while True:
+            try:
+                if httpx.get(f"{base_url}/health").status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError(f"uvicorn did not become healthy on {base_url}.")
+            time.sleep(0.1)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+async def run_load(args: argparse.Namespace, base_url: str | None) -> dict[str, Any]:
+    shape = WorkloadShape(
+        order_items=args.items,
+        related_parties=args.parties,
+        notes=args.notes,
+        characteristics=args.characteristics,
+    )
+    generator = WorkloadGenerator(shape, seed=args.seed)
+    client_context = (
+        asgi_client() if base_url is None else http_client(base_url, args.concurrency)
+    )
+    with local_listener() as listener_url:
+        async with client_context as client:
+            driver = LoadDriver(client, generator, args.mix, listener_url, seed=args.seed)
+            await driver.preload(args.preload, args.concurrency)
+            elapsed = await driver.run(args.duration, args.concurrency)
+
+    total = EndpointStats()
+    for stats in driver.stats.values():
+        total.latencies.extend(stats.latencies)
+        total.statuses.update(stats.statuses)
+    return {
+        "target": base_url or "asgi",
+        "duration_seconds": elapsed,
+        "concurrency": args.concurrency,
+        "preload": args.preload,
+        "mix": args.mix,
+        "shape": asdict(shape),
+        "endpoints": {
+            endpoint: stats.summary(elapsed) for endpoint, stats in sorted(driver.stats.items())
+        },
+        "total": total.summary(elapsed),
+    }
+
+
+def format_report(report: dict[str, Any]) -> str:
+    lines = [
+        f"{'endpoint':<28} {'requests':>9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9}"
+        f" {'p99 ms':>9}  statuses"
+    ]
+    rows = [*report["endpoints"].items(), ("total", report["total"])]
+    for endpoint, summary in rows:
+        statuses = " ".join(f"{status}:{count}" for status, count in summary["statuses"].items())
+        lines.append(
+            f"{endpoint:<28} {summary['requests']:>9,} {summary['requests_per_second']:>9,.1f}"
+            f" {summary['p50_ms']:>9.2f} {summary['p95_ms']:>9.2f} {summary['p99_ms']:>9.2f}"
+            f"  {statuses}"
+        )
+    return "\n".join(lines)
+
+
+def _percentile(ordered: list[float], percent: float) -> float:
+    # Nearest-rank percentile of an already sorted sample.
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def _parse_mix(value: str) -> dict[str, int]:
+    mix: dict[str, int] = {}
+    for item in value.split(","):
+        operation, _, weight = item.partition("=")
+        if operation not in DEFAULT_MIX or not weight.isdigit():
+            raise argparse.ArgumentTypeError(
+                f"Expected operation=weight with operations {', '.join(DEFAULT_MIX)}."
+            )
+        mix[operation] = int(weight)
+    return mix
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="TMF641 end-to-end load driver.")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="Base URL of a running server (default: in-process).")
+    target.add_argument("--spawn", action="store_true", help="Start uvicorn for the run.")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--preload", type=int, default=1000)
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX)
+    parser.add_argument("--items", type=int, default=1, help="orderItem entries per order")
+    parser.add_argument("--parties", type=int, default=1, help="relatedParty entries per order")
+    parser.add_argument("--notes", type=int, default=1, help="note entries per order/patch")
+    parser.add_argument("--characteristics", type=int, default=1, help="per order item")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="Also write the report as JSON.")
+    args = parser.parse_args(argv)
+
+    if args.spawn:
+        with spawned_server() as base_url:
+            report = asyncio.run(run_load(args, base_url))
+    else:
+        report = asyncio.run(run_load(args, args.url))
+
+    print(format_report(report))
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Wrote report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from typing import Any
+
+
+def service_order_payload(order_items: int = 1, index: int = 0) -> dict[str, Any]:
+    """Valid ServiceOrderCreate payload with `order_items` entries (Postman suite shape)."""
+
+    return {
+        "externalId": f"bench-{index}",
+        "category": "TMF resource illustration",
+        "priority": "1",
+        "description": "Service order description",
+        "requestedCompletionDate": "2030-01-01T00:00:00Z",
+        "relatedParty": [{"id": f"customer-{index % 100}", "role": "customer", "name": "Jean"}],
+        "note": [{"author": "Jean", "date": "2030-01-01T00:00:00Z", "text": "Bench note"}],
+        "orderItem": [_order_item(item_index) for item_index in range(order_items)],
+    }
+
+
+def service_order_patch_payload(order_items: int = 1) -> dict[str, Any]:
+    """Valid ServiceOrderPatch payload replacing the patchable collections of an order."""
+
+    payload = service_order_payload(order_items)
+    for order_item in payload["orderItem"]:
+        del order_item["id"]
+        del order_item["action"]
+    return {
+        "description": "patched",
+        "relatedParty": payload["relatedParty"],
+        "note": payload["note"],
+        "orderItem": payload["orderItem"],
+    }
+
+
+def _order_item(item_index: int) -> dict[str, Any]:
+    return {
+        "id": str(item_index + 1),
+        "action": "add",
+        "service": {
+            "serviceType": "CFS",
+            "name": f"Fiber upgrade {item_index}",
+            "serviceSpecification": {"id": "spec-1", "name": "Fiber"},
+            "serviceCharacteristic": [
+                {"name": "speed", "valueType": "string", "value": "1Gbps"},
+            ],
+            "place": [{"id": "place-1", "role": "installation"}],
+        },
+    }
@@ -0,0 +1,185 @@
+"""
+Hot-path regression suite: `uv run python -m benchmarks.suite --output results.json`.
+
+Store-size benchmarks (InMemoryStore CRUD and list, apply_order_filters) run on
+stores of 1k to 1M single-item orders; order-shape benchmarks (create/patch
+validation, project_order, _merge_patch, NotificationService._emit) run on one
+order of 1 to 1,000 items. Every result has ops/s and allocation figures and is
+written to a JSON file; `--compare old.json new.json` prints the change per
+benchmark between two runs.
+"""
+
+import argparse
+import json
+import platform
+import sys
+from collections.abc import Callable, Iterator
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from app.models.enums import ServiceOrderStateType
+from app.models.notifications import ServiceOrderCreateNotification, ServiceOrderEvent
+from app.models.service_order import ServiceOrder, ServiceOrderCreate, ServiceOrderPatch
+from app.repositories.memory_store import InMemoryStore, ServiceOrderRecord
+from app.services.notification_service import NotificationService
+from app.services.query_service import apply_order_filters, project_order
+from app.services.service_order_service import _build_service_order, _merge_patch
+from benchmarks.harness import local_listener, measure, with_allocations
+from benchmarks.payloads import service_order_patch_payload, service_order_payload
+
+DEFAULT_STORE_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_ORDER_ITEMS = (1, 10, 100, 1000)
+_ORDER_DATE = datetime(2030, 1, 1, tzinfo=UTC)
+_REGRESSION_RATIO = 0.9
+
+Case = tuple[str, dict[str, int], Callable[[], object]]
+
+
+def _order(order_items: int, index: int) -> ServiceOrder:
+    return _build_service_order(
+        ServiceOrderCreate.model_validate(service_order_payload(order_items, index)),
+        service_order_id=str(index),
+        href=f"/serviceOrder/{index}",
+        order_date=_ORDER_DATE + timedelta(minutes=index),
+    )
+
+
+def _populated_store(size: int) -> InMemoryStore:
+    store = InMemoryStore()
+    template = _order(1, 0)
+    for index in range(size):
+        store.create_service_order(
+            template.model_copy(
+                update={
+                    "id": str(index),
+                    "href": f"/serviceOrder/{index}",
+                    "external_id": f"bench-{index}",
+                    "category": f"category-{index % 10}",
+                    "order_date": _ORDER_DATE + timedelta(minutes=index),
+                }
+            )
+        )
+    return store
+
+
+def store_cases(size: int) -> Iterator[Case]:
+    store = _populated_store(size)
+    records: list[ServiceOrderRecord] = store.list_service_order_records()
+    middle = str(size // 2)
+    existing = store.get_service_order(middle)
+    assert existing is not None
+    extra = _order(1, size)
+    exact_filters = {"state": "acknowledged", "category": "category-3"}
+    date_filters = {"orderDate.gte": (_ORDER_DATE + timedelta(minutes=size // 2)).isoformat()}
+
+    def create_and_delete() -> None:
+        store.create_service_order(extra)
+        store.delete_service_order(str(size))
+
+    params = {"orders": size}
+    yield "store.get", params, lambda: store.get_service_order_record(middle)
+    yield "store.update", params, lambda: store.update_service_order(existing)
+    yield "store.create_delete", params, create_and_delete
+    yield "store.list", params, store.list_service_order_records
+    yield "filter.exact", params, lambda: apply_order_filters(records, exact_filters)
+    yield "filter.date", params, lambda: apply_order_filters(records, date_filters)
+
+
+def shape_cases(order_items: int, listener_url: str) -> Iterator[Case]:
+    create_payload = service_order_payload(order_items)
+    patch_payload = service_order_patch_payload(order_items)
+    context = {"order_state": ServiceOrderStateType.ACKNOWLEDGED}
+    order = _order(order_items, 1)
+    stored = json.loads(ServiceOrderRecord.from_order(order).payload)
+    patch_data = ServiceOrderPatch.model_validate(patch_payload, context=context).model_dump(
+        by_alias=True, mode="python", exclude_unset=True
+    )
+
+    store = InMemoryStore()
+    store.create_hub_listener(callback=listener_url, query=None)
+    notification_service = NotificationService(store=store)
+    notification = ServiceOrderCreateNotification(
+        eventId="00001", eventTime=_ORDER_DATE, event=ServiceOrderEvent(serviceOrder=order)
+    )
+
+    params = {"items": order_items}
+    yield "validate.create", params, lambda: ServiceOrderCreate.model_validate(create_payload)
+    yield (
+        "validate.patch",
+        params,
+        lambda: ServiceOrderPatch.model_validate(patch_payload, context=context),
+    )
+    yield "project.full", params, lambda: project_order(order, None)
+    yield "project.fields", params, lambda: project_order(order, ["id", "href", "state"])
+    yield "merge_patch", params, lambda: _merge_patch(stored, patch_data)
+    yield "notify.emit", params, lambda: notification_service._emit(notification)
+
+
+def run(
+    store_sizes: tuple[int, ...], order_items: tuple[int, ...], min_seconds: float
+) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+
+    def record(cases: Iterator[Case]) -> None:
+        for benchmark, params, operation in cases:
+            label = " ".join([benchmark, *(f"{key}={value}" for key, value in params.items())])
+            result = with_allocations(measure(label, operation, min_seconds), operation)
+            print(result.format(), flush=True)
+            results.append({"benchmark": benchmark, "params": params, **result.to_dict()})
+
+    for size in store_sizes:
+        record(store_cases(size))
+    with local_listener() as listener_url:
+        for items in order_items:
+            record(shape_cases(items, listener_url))
+    return results
+
+
+def compare(baseline_path: Path, current_path: Path) -> None:
+    """Print ops/s and peak allocation changes for benchmarks present in both runs."""
+
+    baseline = {entry["name"]: entry for entry in json.loads(baseline_path.read_text())["results"]}
+    for entry in json.loads(current_path.read_text())["results"]:
+        before = baseline.get(entry["name"])
+        if before is None:
+            continue
+        ratio = entry["ops_per_second"] / before["ops_per_second"]
+        peak_change = (entry["peak_bytes"] or 0) - (before["peak_bytes"] or 0)
+        flag = "  slower" if ratio < _REGRESSION_RATIO else ""
+        print(
+            f"{entry['name']:<56} {before['ops_per_second']:>12,.1f} -> "
+            f"{entry['ops_per_second']:>12,.1f} ops/s ({ratio:5.2f}x)"
+            f" {peak_change / 1024:>+10,.1f} KiB peak{flag}"
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1] if __doc__ else None)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_STORE_SIZES)
+    parser.add_argument("--items", type=int, nargs="+", default=DEFAULT_ORDER_ITEMS)
+    parser.add_argument("--min-seconds", type=float, default=0.5)
+    parser.add_argument("--output", type=Path, default=Path("benchmark-results.json"))
+    parser.add_argument(
+        "--compare", type=Path, nargs=2, metavar=("BASELINE", "CURRENT"), default=None
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare is not None:
+        compare(*args.compare)
+        return
+
+    started = datetime.now(UTC)
+    results = run(tuple(args.sizes), tuple(args.items), args.min_seconds)
+    report = {
+        "started": started.isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Synthetic TMF641 traffic built from the Postman collection's request shapes.
+
+The create, patch, list-filter and hub requests of
+`postman/TMF641_Demo.postman_collection.json` are the templates; the generator
+scales them to a configurable number of order items, related parties, notes and
+service characteristics. Every generated create payload is a valid
+ServiceOrderCreate.
+"""
+
+import copy
+import json
+import random
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+POSTMAN_COLLECTION = (
+    Path(__file__).resolve().parent.parent / "postman" / "TMF641_Demo.postman_collection.json"
+)
+_VARIABLE = re.compile(r"\{\{(\w+)\}\}")
+
+
+@dataclass(frozen=True)
+class WorkloadShape:
+    order_items: int = 1
+    related_parties: int = 1
+    notes: int = 1
+    characteristics: int = 1
+    # Orders are spread over this many categories, so category filters are selective.
+    categories: int = 10
+
+
+@dataclass(frozen=True)
+class PostmanTemplates:
+    create: dict[str, Any]
+    patch: dict[str, Any]
+    list_query: dict[str, str]
+    hub: dict[str, Any]
+
+
+def load_postman_templates(path: Path = POSTMAN_COLLECTION) -> PostmanTemplates:
+    """Valid create/patch/list/hub request shapes from the collection, variables resolved."""
+
+    collection = json.loads(path.read_text())
+    variables = {item["key"]: item["value"] for item in collection.get("variable", [])}
+    create = patch = hub = None
+    list_query: dict[str, str] | None = None
+    for item in _requests(collection["item"]):
+        request = item["request"]
+        url = request["url"]["raw"] if isinstance(request["url"], dict) else request["url"]
+        path_part, _, query = _resolve(url, variables).partition("?")
+        body_text = request.get("body", {}).get("raw")
+        body = json.loads(_resolve(body_text, variables)) if body_text else None
+        method = request["method"]
+
+        if method == "POST" and path_part.endswith("/serviceOrder") and body is not None:
+            # The first create is the valid one; later ones are negative cases.
+            create = create or (body if "orderItem" in body else None)
+        elif method == "PATCH" and body is not None and "description" in body:
+            patch = patch or body
+        elif method == "GET" and path_part.endswith("/serviceOrder") and query:
+            list_query = list_query or dict(
+                pair.split("=", maxsplit=1) for pair in query.split("&")
+            )
+        elif method == "POST" and path_part.endswith("/hub") and body is not None:
+            hub = hub or body
+
+    if create is None or patch is None or list_query is None or hub is None:
+        raise ValueError(f"{path} lacks a create, patch, filtered list or hub request.")
+    return PostmanTemplates(create=create, patch=patch, list_query=list_query, hub=hub)
+
+
+class WorkloadGenerator:
+    """Request bodies and query strings for a load run, reproducible from `seed`."""
+
+    def __init__(
+        self,
+        shape: WorkloadShape,
+        templates: PostmanTemplates | None = None,
+        seed: int = 0,
+    ) -> None:
+        self.shape = shape
+        self.templates = templates or load_postman_templates()
+        self._random = random.Random(seed)
+
+    def create_payload(self, index: int) -> dict[str, Any]:
+        template = self.templates.create
+        payload = copy.deepcopy(template)
+        payload["externalId"] = f"{template['externalId']}-{index}"
+        payload["category"] = self._category(index % self.shape.categories)
+        payload["orderItem"] = [
+            self._order_item(template["orderItem"][0], item_index)
+            for item_index in range(self.shape.order_items)
+        ]
+        if self.shape.related_parties:
+            payload["relatedParty"] = [
+                {
+                    "id": f"party-{self._random.randrange(10_000)}",
+                    "role": "customer" if party_index == 0 else "contact",
+                    "name": f"Party {party_index}",
+                    "@referredType": "Individual",
+                }
+                for party_index in range(self.shape.related_parties)
+            ]
+        if self.shape.notes:
+            payload["note"] = self._notes("Created")
+        return payload
+
+    def patch_payload(self) -> dict[str, Any]:
+        payload = copy.deepcopy(self.templates.patch)
+        if self.shape.notes:
+            payload["note"] = self._notes("Patched")
+        return payload
+
+    def list_query(self) -> dict[str, str]:
+        query = dict(self.templates.list_query)
+        if "category" in query:
+            query["category"] = self._category(self._random.randrange(self.shape.categories))
+        return query
+
+    def hub_payload(self, callback: str | None = None) -> dict[str, Any]:
+        payload = copy.deepcopy(self.templates.hub)
+        if callback is not None:
+            payload["callback"] = callback
+        return payload
+
+    def _category(self, index: int) -> str:
+        return f"{self.templates.create['category']} {index}"
+
+    def _order_item(self, template: dict[str, Any], item_index: int) -> dict[str, Any]:
+        order_item = copy.deepcopy(template)
+        order_item["id"] = str(item_index + 1)
+        service = order_item.setdefault("service", {})
+        service["name"] = f"Service {item_index + 1}"
+        if self.shape.characteristics:
+            service["serviceCharacteristic"] = [
+                {"name": f"characteristic-{index}", "valueType": "string", "value": str(index)}
+                for index in range(self.shape.characteristics)
+            ]
+        return order_item
+
+    def _notes(self, text: str) -> list[dict[str, Any]]:
+        return [
+            {"author": "load-driver", "date": "2030-01-01T00:00:00Z", "text": f"{text} {index}"}
+            for index in range(self.shape.notes)
+        ]
+
+
+def _requests(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    found: list[dict[str, Any]] = []
+    for item in items:
+        found.extend(_requests(item["item"]) if "item" in item else [item])
+    return found
+
+
+def _resolve(text: str, variables: dict[str, str]) -> str:
+    return _VARIABLE.sub(lambda match: variables.get(match.group(1), match.group(0)), text)
@@ -4,13 +4,21 @@ from app.settings import get_settings
 
 
 def main() -> None:
-    """Local launcher for development."""
+    """
+    Local launcher.
+
+    With APP_WORKERS > 1 uvicorn forks that many worker processes sharing the
+    listening socket; state then lives in the shared SQLite backend. Auto-reload
+    only works with a single worker, so it is disabled in multi-worker mode.
+    """
     settings = get_settings()
     uvicorn.run(
-        "app.main:app",
+        "app.main:create_app",
+        factory=True,
         host=settings.host,
         port=settings.port,
-        reload=settings.reload,
+        reload=settings.reload and settings.workers == 1,
+        workers=settings.workers,
     )
 
 
@@ -1,46 +1,35 @@
 from collections.abc import Callable, Iterator
-from itertools import count
 from typing import Any, TypeAlias
 
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from app.main import app
-from app.services.service_order_service import get_notification_service, get_store
+from app.container import AppContainer, get_app_container
+from app.main import create_app
+from app.settings import Settings
 
 ServiceOrderPayloadFactory: TypeAlias = Callable[..., dict[str, Any]]
 
 
-@pytest.fixture(autouse=True)
-def reset_in_memory_state() -> Iterator[None]:
-    """
-    Reset singleton in-memory state between tests.
-
-    The app intentionally uses process-level singletons for demo runtime.
-    Tests clear and reset counters to keep cases isolated and deterministic.
-    """
-
-    store = get_store()
-    notification_service = get_notification_service()
-
-    with store._lock:  # noqa: SLF001 - test-only access to singleton state
-        store._service_orders.clear()  # noqa: SLF001
-        store._hub_listeners.clear()  # noqa: SLF001
-        store._service_order_sequence = count(1)  # noqa: SLF001
-        store._hub_sequence = count(1)  # noqa: SLF001
-
-    with notification_service._event_lock:  # noqa: SLF001 - test-only reset
-        notification_service._event_id_sequence = count(1)  # noqa: SLF001
+@pytest.fixture
+def app() -> FastAPI:
+    """Fresh app per test; its container (store, services) is built in the lifespan."""
 
-    yield
+    return create_app(Settings(environment="test", reload=False))
 
 
 @pytest.fixture
-def client() -> Iterator[TestClient]:
+def client(app: FastAPI) -> Iterator[TestClient]:
     with TestClient(app) as test_client:
         yield test_client
 
 
+@pytest.fixture
+def container(app: FastAPI, client: TestClient) -> AppContainer:
+    return get_app_container(app)
+
+
 @pytest.fixture
 def service_order_payload_factory() -> ServiceOrderPayloadFactory:
     def _factory(
@@ -64,4 +53,3 @@ def service_order_payload_factory() -> ServiceOrderPayloadFactory:
         }
 
     return _factory
-
@@ -0,0 +1,124 @@
+import asyncio
+
+import httpx
+import pytest
+from starlette.types import Receive, Scope, Send
+
+from app.api.admission import (
+    BULK,
+    READ,
+    WRITE,
+    AdmissionLimits,
+    AdmissionMiddleware,
+    classify_request,
+)
+
+
+def test_admission_queues_then_sheds_with_retry_after() -> None:
+    release = asyncio.Event()
+
+    async def slow_app(scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["path"] != "/health":
+            await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    limits = {name: AdmissionLimits(max_concurrent=1, max_queue=1) for name in (READ, WRITE, BULK)}
+    middleware = AdmissionMiddleware(slow_app, limits=limits, retry_after_seconds=2)
+    bulk = middleware.limiters[BULK]
+
+    async def scenario() -> list[httpx.Response]:
+        transport = httpx.ASGITransport(app=middleware)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            running = asyncio.create_task(client.get("/serviceOrder"))
+            queued = asyncio.create_task(client.get("/serviceOrder"))
+            while bulk.queued < 1:
+                await asyncio.sleep(0)
+            shed = await client.get("/serviceOrder")
+            health = await asyncio.wait_for(client.get("/health"), timeout=0.01)
+            release.set()
+            return [await running, await queued, shed, health]
+
+    running, queued, shed, health = asyncio.run(scenario())
+
+    assert (running.status_code, queued.status_code) == (200, 200)
+    assert shed.status_code == 429
+    assert shed.headers["Retry-After"] == "2"
+    assert shed.json()["code"] == "TOO_MANY_REQUESTS"
+    assert health.status_code == 200
+    assert (bulk.active, bulk.queued) == (0, 0)
+
+
+def test_admission_times_out_queued_requests_with_503() -> None:
+    async def stuck_app(scope: Scope, receive: Receive, send: Send) -> None:
+        await asyncio.sleep(1)
+
+    limits = {name: AdmissionLimits(max_concurrent=1, max_queue=4) for name in (READ, WRITE, BULK)}
+    middleware = AdmissionMiddleware(stuck_app, limits=limits, queue_timeout_seconds=0.05)
+
+    async def scenario() -> httpx.Response:
+        transport = httpx.ASGITransport(app=middleware)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            holder = asyncio.create_task(client.post("/serviceOrder"))
+            await asyncio.sleep(0.01)
+            timed_out = await client.patch("/serviceOrder/1")
+            holder.cancel()
+            return timed_out
+
+    timed_out = asyncio.run(scenario())
+
+    assert timed_out.status_code == 503
+    assert "Retry-After" in timed_out.headers
+    assert middleware.limiters[WRITE].queued == 0
+
+
+@pytest.mark.parametrize(
+    ("method", "path", "query", "expected"),
+    [
+        ("GET", "/serviceOrder/42", b"waitFor=state&timeout=30", None),
+        ("GET", "/serviceOrder/42", b"timeout=30&waitFor=change", None),
+        ("GET", "/serviceOrder/42", b"waitFor=other", READ),
+        ("GET", "/serviceOrder/42", b"xwaitFor=state", READ),
+        ("GET", "/serviceOrder/changes", b"waitFor=state", BULK),
+        ("GET", "/serviceOrder", b"waitFor=state", BULK),
+        ("POST", "/serviceOrder", b"waitFor=state", WRITE),
+        ("PATCH", "/serviceOrder/42", b"waitFor=change", WRITE),
+        ("DELETE", "/serviceOrder/42", b"waitFor=", WRITE),
+        ("GET", "/serviceOrder/stats", b"", BULK),
+        ("POST", "/serviceOrder/batchGet", b"", BULK),
+        ("HEAD", "/serviceOrder", b"", BULK),
+        ("GET", "/serviceOrder/42/orderItem/1", b"", READ),
+        ("GET", "/health", b"", None),
+    ],
+)
+def test_requests_are_classified_and_only_order_watches_bypass_admission(
+    method: str, path: str, query: bytes, expected: str | None
+) -> None:
+    scope = {"type": "http", "method": method, "path": path, "query_string": query}
+
+    assert classify_request(scope) == expected
+
+
+def test_writes_with_wait_for_are_still_shed() -> None:
+    release = asyncio.Event()
+
+    async def slow_app(scope: Scope, receive: Receive, send: Send) -> None:
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    limits = {name: AdmissionLimits(max_concurrent=1, max_queue=0) for name in (READ, WRITE, BULK)}
+    middleware = AdmissionMiddleware(slow_app, limits=limits)
+
+    async def scenario() -> httpx.Response:
+        transport = httpx.ASGITransport(app=middleware)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            running = asyncio.create_task(client.post("/serviceOrder"))
+            while middleware.limiters[WRITE].active < 1:
+                await asyncio.sleep(0)
+            shed = await client.post("/serviceOrder", params={"waitFor": "state"})
+            release.set()
+            await running
+            return shed
+
+    assert asyncio.run(scenario()).status_code == 429
@@ -0,0 +1,61 @@
+from collections.abc import Callable
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.settings import Settings
+
+
+def test_app_instances_do_not_share_state(
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    settings = Settings(environment="test", reload=False)
+
+    with TestClient(create_app(settings)) as first, TestClient(create_app(settings)) as second:
+        assert first.post("/serviceOrder", json=service_order_payload_factory()).status_code == 201
+        assert len(first.get("/serviceOrder").json()) == 1
+        assert second.get("/serviceOrder").json() == []
+
+
+def test_sqlite_backend_keeps_orders_across_app_restarts(
+    tmp_path: Path,
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    settings = Settings(
+        environment="test",
+        reload=False,
+        storage_backend="sqlite",
+        sqlite_path=str(tmp_path / "state.sqlite3"),
+    )
+
+    with TestClient(create_app(settings)) as client:
+        created = client.post("/serviceOrder", json=service_order_payload_factory())
+        order_id = created.json()["id"]
+
+    with TestClient(create_app(settings)) as restarted:
+        fetched = restarted.get(f"/serviceOrder/{order_id}")
+        assert fetched.status_code == 200
+        assert fetched.json() == created.json()
+
+
+def test_sqlite_workers_replay_idempotent_creates_from_each_other(
+    tmp_path: Path,
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    settings = Settings(
+        environment="test",
+        reload=False,
+        storage_backend="sqlite",
+        sqlite_path=str(tmp_path / "state.sqlite3"),
+    )
+    payload = service_order_payload_factory()
+    headers = {"Idempotency-Key": "retry-on-another-worker"}
+
+    with TestClient(create_app(settings)) as first, TestClient(create_app(settings)) as second:
+        created = first.post("/serviceOrder", json=payload, headers=headers)
+        retried = second.post("/serviceOrder", json=payload, headers=headers)
+
+        assert retried.status_code == 201
+        assert retried.json() == created.json()
+        assert len(second.get("/serviceOrder").json()) == 1
@@ -0,0 +1,126 @@
+import json
+from collections.abc import Callable, Iterator
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.container import get_app_container
+from app.main import create_app
+from app.models.enums import ServiceOrderStateType
+from app.models.service_order import ServiceOrder
+from app.repositories.archive import SegmentArchive
+from app.repositories.memory_store import InMemoryStore
+from app.settings import Settings
+
+_ORDERED = datetime(2030, 1, 1, tzinfo=UTC)
+
+
+def _order(order_id: str, state: ServiceOrderStateType, description: str) -> ServiceOrder:
+    return ServiceOrder.model_validate(
+        {
+            "id": order_id,
+            "href": f"/serviceOrder/{order_id}",
+            "state": state.value,
+            "orderDate": _ORDERED.isoformat(),
+            "description": description,
+            "orderItem": [{"id": "1", "action": "add", "service": {"serviceType": "CFS"}}],
+        }
+    )
+
+
+def test_store_moves_old_terminal_orders_to_segments(tmp_path: Path) -> None:
+    archive = SegmentArchive(str(tmp_path), segment_bytes=256)
+    store = InMemoryStore(compact=True, archive=archive)
+    for index in range(20):
+        store.create_service_order(
+            _order(str(index), ServiceOrderStateType.COMPLETED, f"order {index} fibre")
+        )
+    store.create_service_order(_order("open", ServiceOrderStateType.IN_PROGRESS, "open fibre"))
+    archived_record = store.get_service_order_record("3")
+
+    assert store.archive_service_orders(_ORDERED) == 0
+    assert store.archive_service_orders(_ORDERED + timedelta(days=1)) == 20
+    assert store.count_service_orders() == 1
+    hot = store.search_service_order_records(frozenset({"fibre"}))
+    assert [record.id for record in hot] == ["open"]
+    assert store.get_service_order_record("3") == archived_record
+    assert set(store.get_service_order_records(["3", "open", "missing"])) == {"3", "open"}
+    archived = store.list_archived_service_order_records(frozenset({"3"}))
+    assert [record.id for record in archived] == ["3"]
+    assert len(list(tmp_path.glob("archive-*/segment-*.seg"))) > 1
+
+    # Updating an archived order makes it hot again; deleting one drops it from its segment.
+    store.update_service_order(_order("3", ServiceOrderStateType.COMPLETED, "order 3 copper"))
+    assert store.delete_service_order("4")
+    assert not store.delete_service_order("4")
+    assert {record.id for record in store.list_service_order_records()} == {"3", "open"}
+    assert len(store.list_archived_service_order_records()) == 18
+    changes, _ = store.list_service_order_changes(since=0, limit=100)
+    assert {change.id: change.kind for change in changes}["3"] == "update"
+    assert {change.id: change.record is not None for change in changes}["5"]
+
+    for index in range(5, 20):
+        store.delete_service_order(str(index))
+    assert len(list(tmp_path.glob("archive-*/segment-*.seg"))) <= 2
+    store.close()
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.fixture
+def archive_app(tmp_path: Path) -> FastAPI:
+    return create_app(Settings(environment="test", reload=False, archive_path=str(tmp_path)))
+
+
+@pytest.fixture
+def archive_client(archive_app: FastAPI) -> Iterator[TestClient]:
+    with TestClient(archive_app) as test_client:
+        yield test_client
+
+
+def test_archived_orders_are_read_by_id_and_listed_on_request(
+    archive_app: FastAPI,
+    archive_client: TestClient,
+    service_order_payload_factory: Callable[..., dict[str, Any]],
+) -> None:
+    container = get_app_container(archive_app)
+    archiver = container.archiver
+    assert archiver is not None
+    order_ids = [
+        archive_client.post(
+            "/serviceOrder", json=service_order_payload_factory(external_id=f"ext-{index}")
+        ).json()["id"]
+        for index in range(3)
+    ]
+    for order_id in order_ids[:2]:
+        order = container.store.get_service_order(order_id)
+        assert order is not None
+        container.store.update_service_order(
+            order.model_copy(update={"state": ServiceOrderStateType.CANCELLED})
+        )
+    before = archive_client.get(f"/serviceOrder/{order_ids[0]}").json()
+
+    assert archiver.archive_due(datetime.now(UTC) + timedelta(days=30)) == 2
+
+    assert archive_client.get(f"/serviceOrder/{order_ids[0]}").json() == before
+    listed = archive_client.get("/serviceOrder", params={"fields": "id"}).json()
+    assert [order["id"] for order in listed] == order_ids[2:]
+    query = {"includeArchived": "true", "state": "cancelled", "sort": "externalId"}
+    everything = archive_client.get("/serviceOrder", params=query).json()
+    assert [order["id"] for order in everything] == order_ids[:2]
+    batch = archive_client.post("/serviceOrder/batchGet", json={"id": order_ids}).json()
+    assert [order["id"] for order in batch["serviceOrder"]] == order_ids
+
+    patched = archive_client.patch(
+        f"/serviceOrder/{order_ids[0]}",
+        content=json.dumps({"description": "reopened for audit"}),
+        headers={"Content-Type": "application/merge-patch+json"},
+    )
+    assert patched.status_code == 200
+    listed = archive_client.get("/serviceOrder", params={"fields": "id"}).json()
+    assert {order["id"] for order in listed} == {order_ids[0], order_ids[2]}
+    assert archive_client.delete(f"/serviceOrder/{order_ids[1]}").status_code == 204
+    assert archive_client.get(f"/serviceOrder/{order_ids[1]}").status_code == 404
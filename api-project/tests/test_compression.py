@@ -0,0 +1,92 @@
+import asyncio
+import zlib
+from collections.abc import Callable, Iterator
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from starlette.types import Receive, Scope, Send
+
+from app.api.compression import CompressionMiddleware, available_codecs, negotiate_encoding
+from app.main import create_app
+from app.settings import Settings
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("gzip", "gzip"),
+        ("gzip;q=0.5, identity", "gzip"),
+        ("gzip;q=0", None),
+        ("identity", None),
+        ("", None),
+        ("*", "gzip"),
+    ],
+)
+def test_negotiate_encoding(accept_encoding: str, expected: str | None) -> None:
+    # Only gzip is always installed; br and zstd come with the `compression` extra.
+    codecs = {"gzip": available_codecs()["gzip"]}
+    codec = negotiate_encoding(accept_encoding, codecs)
+    assert (codec.name if codec else None) == expected
+
+
+@pytest.fixture
+def compressing_client() -> Iterator[TestClient]:
+    with TestClient(create_app(Settings(environment="test", compression=True))) as test_client:
+        yield test_client
+
+
+def test_compression_is_off_by_default(client: TestClient) -> None:
+    response = client.get("/serviceOrder", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+
+
+def test_large_list_is_gzip_compressed_and_small_bodies_are_not(
+    compressing_client: TestClient,
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    client = compressing_client
+    for index in range(20):
+        client.post("/serviceOrder", json=service_order_payload_factory(external_id=f"bss-{index}"))
+
+    listed = client.get("/serviceOrder", headers={"Accept-Encoding": "gzip"})
+    single = client.get("/serviceOrder/1", headers={"Accept-Encoding": "gzip"})
+
+    assert listed.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in listed.headers["vary"]
+    assert len(listed.json()) == 20
+    assert "content-encoding" not in single.headers
+    assert single.json()["id"] == "1"
+
+
+def test_streamed_bodies_are_compressed_chunk_by_chunk() -> None:
+    chunks = [b'{"items":[', b"1," * 2000, b"2]}"]
+
+    async def streaming_app(scope: Scope, receive: Receive, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        for index, chunk in enumerate(chunks):
+            more_body = index < len(chunks) - 1
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    middleware = CompressionMiddleware(streaming_app, minimum_size=16, offload_size=1024)
+
+    async def fetch() -> tuple[httpx.Headers, bytes]:
+        transport = httpx.ASGITransport(app=middleware)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            headers = {"Accept-Encoding": "gzip"}
+            async with client.stream("GET", "/", headers=headers) as response:
+                return response.headers, b"".join([raw async for raw in response.aiter_raw()])
+
+    headers, raw = asyncio.run(fetch())
+
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    assert len(raw) < sum(map(len, chunks))
+    assert zlib.decompress(raw, wbits=31) == b"".join(chunks)
@@ -0,0 +1,56 @@
+from collections.abc import Callable
+
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.settings import Settings
+
+ADMIN_TOKEN = "test-admin-token-0123456789"
+
+
+def _phases(header: str) -> set[str]:
+    return {entry.split(";", maxsplit=1)[0] for entry in header.split(", ")}
+
+
+def test_server_timing_header_breaks_down_request_phases(
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    settings = Settings(environment="test", reload=False, server_timing=True)
+
+    with TestClient(create_app(settings)) as client:
+        created = client.post("/serviceOrder", json=service_order_payload_factory())
+        listed = client.get("/serviceOrder", params={"state": "acknowledged", "fields": "id"})
+
+    assert {"validate", "store", "total"} <= _phases(created.headers["Server-Timing"])
+    assert {"store", "filter", "project", "serialize", "total"} <= _phases(
+        listed.headers["Server-Timing"]
+    )
+
+
+def test_server_timing_header_is_off_by_default(client: TestClient) -> None:
+    assert "Server-Timing" not in client.get("/serviceOrder").headers
+
+
+def test_profiler_is_hidden_without_admin_token(client: TestClient) -> None:
+    assert client.get("/admin/profile", params={"seconds": 0.1}).status_code == 404
+
+
+def test_profiler_requires_matching_admin_token() -> None:
+    settings = Settings(environment="test", reload=False, admin_token=ADMIN_TOKEN)
+
+    with TestClient(create_app(settings)) as client:
+        rejected = client.get(
+            "/admin/profile", params={"seconds": 0.1}, headers={"X-Admin-Token": "wrong"}
+        )
+        profiled = client.get(
+            "/admin/profile",
+            params={"seconds": 0.2, "idle": "true"},
+            headers={"X-Admin-Token": ADMIN_TOKEN},
+        )
+
+    assert rejected.status_code == 403
+    assert profiled.status_code == 200
+    assert profiled.headers["content-type"].startswith("text/plain")
+    stack, count = profiled.text.splitlines()[0].rsplit(" ", maxsplit=1)
+    assert ";" in stack
+    assert int(count) >= 1
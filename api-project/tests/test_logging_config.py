@@ -0,0 +1,89 @@
+import json
+import logging
+from logging.handlers import QueueHandler
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.logging_config import (
+    RateLimitFilter,
+    configure_logging,
+    start_logging_queue,
+    stop_logging_queue,
+)
+from app.main import create_app
+from app.settings import Settings
+
+
+def _record(message: str, *args: object) -> logging.LogRecord:
+    return logging.LogRecord(
+        "app.error_handlers", logging.WARNING, __file__, 1, message, args, None
+    )
+
+
+def test_rate_limit_filter_collapses_repeated_templates() -> None:
+    now = [0.0]
+    rate_limit = RateLimitFilter(burst=2, interval_seconds=10.0, clock=lambda: now[0])
+
+    allowed = [rate_limit.filter(_record("Validation failed on %s", f"/o/{i}")) for i in range(5)]
+    other_template = rate_limit.filter(_record("Conflict on %s", "/o/1"))
+    now[0] = 10.0
+    next_window = _record("Validation failed on %s", "/o/6")
+
+    assert allowed == [True, True, False, False, False]
+    assert other_template is True
+    assert rate_limit.filter(next_window) is True
+    assert next_window.getMessage() == "Validation failed on /o/6 (3 similar messages suppressed)"
+
+
+def test_queued_json_logging_writes_structured_records(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    configure_logging("INFO", "json")
+    start_logging_queue()
+    try:
+        logging.getLogger("app.test").info("order %s created", "42", extra={"order_id": "42"})
+        stop_logging_queue()
+        lines = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+    finally:
+        configure_logging("INFO")
+
+    entry = next(line for line in lines if line["logger"] == "app.test")
+    assert entry["level"] == "INFO"
+    assert entry["message"] == "order 42 created"
+    assert entry["order_id"] == "42"
+
+
+def test_logging_queue_runs_for_the_app_lifespan() -> None:
+    settings = Settings(environment="test", reload=False, log_queue=True)
+    first, second = create_app(settings), create_app(settings)
+    assert not _queued(logging.getLogger())
+
+    with TestClient(first), TestClient(second):
+        assert _queued(logging.getLogger())
+        assert _queued(logging.getLogger("uvicorn.access"))
+
+    assert not _queued(logging.getLogger())
+
+
+def test_only_error_handler_warnings_are_rate_limited() -> None:
+    configure_logging("INFO")
+
+    def rate_limited(name: str) -> bool:
+        return any(isinstance(entry, RateLimitFilter) for entry in logging.getLogger(name).filters)
+
+    assert rate_limited("app.error_handlers")
+    assert not rate_limited("app.services.notification_service")
+
+
+def test_rate_limit_filter_lets_errors_through() -> None:
+    rate_limit = RateLimitFilter(burst=1, interval_seconds=10.0, clock=lambda: 0.0)
+    errors = [_record("Unhandled error on %s", "/o/1") for _ in range(3)]
+    for record in errors:
+        record.levelno = logging.ERROR
+
+    assert all(rate_limit.filter(record) for record in errors)
+
+
+def _queued(logger: logging.Logger) -> bool:
+    return any(isinstance(handler, QueueHandler) for handler in logger.handlers)
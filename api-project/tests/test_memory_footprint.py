@@ -0,0 +1,129 @@
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import pytest
+from pytest import MonkeyPatch
+
+from app.models.service_order import ServiceOrder
+from app.repositories import memory_store
+from app.repositories.memory_store import InMemoryStore, ServiceOrderRecord
+from benchmarks.bench_memory import bytes_per_order, keep_models, keep_store
+
+_ORDERED = datetime(2030, 1, 1, tzinfo=UTC)
+
+
+def _order(order_items: int, index: int, category: str = "residential") -> ServiceOrder:
+    return ServiceOrder.model_validate(
+        {
+            "id": str(index),
+            "href": f"/serviceOrder/{index}",
+            "state": "acknowledged",
+            "orderDate": (_ORDERED + timedelta(minutes=index)).isoformat(),
+            "externalId": f"ext-{index}",
+            "category": category,
+            "priority": "1",
+            "description": "Service order description",
+            "relatedParty": [{"id": f"customer-{index % 100}", "role": "customer"}],
+            "note": [{"author": "Jean", "date": _ORDERED.isoformat(), "text": "Note"}],
+            "orderItem": [_order_item(item_index) for item_index in range(order_items)],
+        }
+    )
+
+
+def _order_item(item_index: int) -> dict[str, Any]:
+    return {
+        "id": str(item_index + 1),
+        "action": "add",
+        "service": {
+            "serviceType": "CFS",
+            "name": f"Fiber upgrade {item_index}",
+            "serviceSpecification": {"id": "spec-1", "name": "Fiber"},
+            "serviceCharacteristic": [{"name": "speed", "valueType": "string", "value": "1Gbps"}],
+            "place": [{"id": "place-1", "role": "installation"}],
+        },
+    }
+
+
+@pytest.mark.parametrize("order_items", [1, 10])
+def test_stored_orders_are_at_least_three_times_smaller_than_models(order_items: int) -> None:
+    payloads = [
+        _order(order_items, index).model_dump_json(by_alias=True, exclude_none=True).encode()
+        for index in range(200)
+    ]
+    model = bytes_per_order(keep_models, payloads)
+    record = bytes_per_order(keep_store(compact=False), payloads)
+    compact = bytes_per_order(keep_store(compact=True), payloads)
+
+    assert record * 3 <= model
+    assert compact * 3 <= model
+    assert compact < record
+
+
+def test_compact_store_returns_the_stored_payloads() -> None:
+    plain, compact = InMemoryStore(), InMemoryStore(compact=True)
+    for store in (plain, compact):
+        store.create_service_order(_order(3, 1))
+        store.create_service_order(_order(1, 2))
+        store.update_service_order(_order(2, 2))
+
+    assert compact.get_service_order_record("2") == plain.get_service_order_record("2")
+    assert compact.list_service_order_records() == plain.list_service_order_records()
+    assert compact.list_service_order_changes(0, 10) == plain.list_service_order_changes(0, 10)
+    assert compact.service_order_stats() == plain.service_order_stats()
+
+
+def test_compact_store_inflates_only_the_selected_orders(monkeypatch: MonkeyPatch) -> None:
+    store = InMemoryStore(compact=True)
+    for index in range(20):
+        store.create_service_order(_order(1, index, category="b" if index % 5 == 0 else "a"))
+    inflated: list[str] = []
+    unpack_record = memory_store.unpack_record
+
+    def counting_unpack(record: ServiceOrderRecord) -> ServiceOrderRecord:
+        inflated.append(record.id)
+        return unpack_record(record)
+
+    monkeypatch.setattr(memory_store, "unpack_record", counting_unpack)
+
+    def select(records: list[ServiceOrderRecord]) -> list[ServiceOrderRecord]:
+        return [record for record in records if record.category == "b"]
+
+    listed = store.list_service_order_records(select)
+    searched = store.search_service_order_records(frozenset({"fiber"}), select=select)
+    ordered = list(store.iter_service_order_records_by_order_date(select=select))
+
+    assert [record.id for record in listed] == ["0", "5", "10", "15"]
+    assert searched == listed
+    assert ordered == listed
+    assert inflated == ["0", "5", "10", "15"] * 3
+
+
+def test_superseded_index_entries_are_skipped_and_compacted() -> None:
+    store = InMemoryStore()
+    for index in range(300):
+        store.create_service_order(_order(1, index))
+    for _ in range(3):
+        for index in range(0, 300, 3):
+            store.update_service_order(_order(1, index, category="business"))
+    # "60" comes back while its old entry is still marked stale, "150" after compaction.
+    for index in range(50, 100):
+        store.delete_service_order(str(index))
+    store.create_service_order(_order(1, 60))
+    for index in range(100, 300):
+        store.delete_service_order(str(index))
+    store.create_service_order(_order(1, 150))
+
+    changes, last = store.list_service_order_changes(since=0, limit=1000)
+    latest = {change.id: change.kind for change in changes}
+    assert len(changes) == 300
+    assert [change.sequence for change in changes] == sorted(change.sequence for change in changes)
+    assert latest["0"] == "update" and latest["1"] == "create"
+    assert latest["60"] == latest["150"] == "create" and latest["299"] == "delete"
+    assert changes[-1].sequence == last
+    page, _ = store.list_service_order_changes(since=changes[9].sequence, limit=5)
+    assert page == changes[10:15]
+
+    ordered = [record.id for record in store.iter_service_order_records_by_order_date()]
+    assert ordered == [str(index) for index in (*range(50), 60, 150)]
+    newest_first = store.iter_service_order_records_by_order_date(descending=True)
+    assert [record.id for record in newest_first] == ordered[::-1]
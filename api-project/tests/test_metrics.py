@@ -0,0 +1,82 @@
+from collections.abc import Callable
+from urllib.error import URLError
+
+from fastapi.testclient import TestClient
+from pytest import MonkeyPatch
+
+from app.main import create_app
+from app.observability.metrics import MetricsRegistry
+from app.services import notification_service
+from app.settings import Settings
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    registry = MetricsRegistry()
+    latency = registry.histogram("demo_seconds", "Demo latency.", ("route",), buckets=(0.1, 1.0))
+    latency.labels("/a").observe(0.05)
+    latency.labels("/a").observe(0.5)
+    latency.labels("/a").observe(5.0)
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE demo_seconds histogram" in lines
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{route="/a"} 3' in lines
+
+
+def test_metrics_endpoint_reports_route_templates_and_store_size(
+    client: TestClient,
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    created = client.post("/serviceOrder", json=service_order_payload_factory())
+    client.get(f"/serviceOrder/{created.json()['id']}")
+    client.get("/serviceOrder", params={"state": "acknowledged"})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert (
+        'tmf641_http_request_duration_seconds_count{method="GET",route="/serviceOrder/{id}",'
+        'status="2xx"}' in body
+    )
+    assert f"/serviceOrder/{created.json()['id']}\"" not in body
+    assert "tmf641_store_service_orders 1" in body
+    assert 'tmf641_filter_orders_scanned_total{kind="exact"}' in body
+    assert (
+        'tmf641_validation_duration_seconds_count{model="ServiceOrderCreate",outcome="valid"}'
+        in body
+    )
+
+
+def test_apps_in_one_process_report_their_own_store_size(
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    settings = Settings(environment="test", reload=False)
+    with TestClient(create_app(settings)) as first:
+        with TestClient(create_app(settings)) as second:
+            first.post("/serviceOrder", json=service_order_payload_factory())
+            assert "tmf641_store_service_orders 0" in second.get("/metrics").text
+        assert "tmf641_store_service_orders 1" in first.get("/metrics").text
+
+
+def test_delivery_failures_are_counted_per_listener_until_it_is_unregistered(
+    client: TestClient,
+    monkeypatch: MonkeyPatch,
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    def refuse(*args: object, **kwargs: object) -> None:
+        raise URLError("connection refused")
+
+    monkeypatch.setattr(notification_service.request, "urlopen", refuse)
+    hub = client.post("/hub", json={"callback": "http://listener.example.com/events"})
+    listener_id = hub.json()["id"]
+    client.post("/serviceOrder", json=service_order_payload_factory())
+    series = f'tmf641_notification_delivery_failures_total{{listener="{listener_id}"}} 1'
+
+    assert series in client.get("/metrics").text
+    client.delete(f"/hub/{listener_id}")
+    assert f'listener="{listener_id}"' not in client.get("/metrics").text
@@ -5,16 +5,17 @@ from typing import Any
 from fastapi.testclient import TestClient
 from pytest import MonkeyPatch
 
-from app.services.service_order_service import get_notification_service
+from app.container import AppContainer
 
 
 def test_notifications_emitted_for_create_patch_delete(
     client: TestClient,
+    container: AppContainer,
     monkeypatch: MonkeyPatch,
     service_order_payload_factory: Callable[..., dict[str, Any]],
 ) -> None:
     captured_payloads: list[dict[str, Any]] = []
-    notification_service = get_notification_service()
+    notification_service = container.notification_service
 
     def fake_publish(
         callback: str,
@@ -64,11 +65,12 @@ def test_notifications_emitted_for_create_patch_delete(
 
 def test_listener_query_filters_notifications_by_event_type(
     client: TestClient,
+    container: AppContainer,
     monkeypatch: MonkeyPatch,
     service_order_payload_factory: Callable[..., dict[str, Any]],
 ) -> None:
     captured_event_types: list[str] = []
-    notification_service = get_notification_service()
+    notification_service = container.notification_service
 
     def fake_publish(
         callback: str,
@@ -106,3 +108,36 @@ def test_listener_query_filters_notifications_by_event_type(
 
     assert captured_event_types == ["ServiceOrderDeleteNotification"]
 
+
+def test_order_item_patch_emits_attribute_value_change_with_whole_order(
+    client: TestClient,
+    container: AppContainer,
+    monkeypatch: MonkeyPatch,
+    service_order_payload_factory: Callable[..., dict[str, Any]],
+) -> None:
+    captured_payloads: list[dict[str, Any]] = []
+
+    def fake_publish(
+        callback: str,
+        payload: dict[str, Any],
+        event_type: str,
+        listener_id: str,
+    ) -> None:
+        captured_payloads.append(payload)
+
+    monkeypatch.setattr(container.notification_service, "_publish_to_listener", fake_publish)
+    client.post("/hub", json={"callback": "http://listener.example.com/events"})
+    order_id = client.post("/serviceOrder", json=service_order_payload_factory()).json()["id"]
+
+    client.patch(
+        f"/serviceOrder/{order_id}/orderItem/1",
+        content=json.dumps({"service": {"name": "Renamed"}}),
+        headers={"Content-Type": "application/merge-patch+json"},
+    )
+
+    created, changed = captured_payloads
+    assert list(changed) == list(created)
+    assert changed["eventType"] == "ServiceOrderAttributeValueChangeNotification"
+    assert changed["eventTime"].endswith("Z")
+    assert changed["event"]["serviceOrder"] == client.get(f"/serviceOrder/{order_id}").json()
+    assert changed["event"]["serviceOrder"]["orderItem"][0]["service"]["name"] == "Renamed"
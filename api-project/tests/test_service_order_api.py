@@ -3,6 +3,9 @@ from collections.abc import Callable
 
 from fastapi.testclient import TestClient
 
+from app.main import create_app
+from app.settings import Settings
+
 
 def test_create_service_order_returns_201_with_server_managed_fields(
     client: TestClient,
@@ -19,6 +22,37 @@ def test_create_service_order_returns_201_with_server_managed_fields(
     assert body["orderItem"][0]["state"] == "acknowledged"
 
 
+def test_create_service_order_replays_response_for_same_idempotency_key(
+    client: TestClient,
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    headers = {"Idempotency-Key": "retry-1"}
+    first = client.post("/serviceOrder", json=service_order_payload_factory(), headers=headers)
+    retried = client.post("/serviceOrder", json=service_order_payload_factory(), headers=headers)
+
+    assert first.status_code == 201
+    assert retried.status_code == 201
+    assert retried.json() == first.json()
+    assert len(client.get("/serviceOrder").json()) == 1
+
+
+def test_create_service_order_rejects_reused_idempotency_key_with_other_payload(
+    client: TestClient,
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    headers = {"Idempotency-Key": "retry-2"}
+    first = client.post(
+        "/serviceOrder", json=service_order_payload_factory(external_id="a"), headers=headers
+    )
+    assert first.status_code == 201
+
+    response = client.post(
+        "/serviceOrder", json=service_order_payload_factory(external_id="b"), headers=headers
+    )
+    assert response.status_code == 409
+    assert response.json()["code"] == "CONFLICT"
+
+
 def test_create_service_order_rejects_server_managed_input(
     client: TestClient,
     service_order_payload_factory: Callable[..., dict[str, object]],
@@ -93,6 +127,180 @@ def test_list_filters_by_datetime_comparison(
     assert len(filtered.json()) == 2
 
 
+def test_list_searches_text_and_combines_with_filters(
+    client: TestClient,
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    first = service_order_payload_factory(external_id="x1", category="A")
+    first["description"] = "Fibre upgrade in Vilnius"
+    second = service_order_payload_factory(external_id="x2", category="B")
+    second["note"] = [
+        {"author": "ops", "date": "2030-01-01T00:00:00Z", "text": "Upgrade by VILNIUS office"}
+    ]
+    third = service_order_payload_factory(external_id="x3", category="A")
+    third["orderItem"][0]["service"]["name"] = "Kaunas upgrade"  # type: ignore[index]
+    for payload in (first, second, third):
+        client.post("/serviceOrder", json=payload)
+
+    def found(query: str) -> list[str]:
+        response = client.get(f"/serviceOrder?{query}")
+        assert response.status_code == 200
+        return [order["externalId"] for order in response.json()]
+
+    assert found("q=upgrade") == ["x1", "x2", "x3"]
+    assert found("q=vilnius%20Upgrade") == ["x1", "x2"]
+    assert found("q=upgrade&category=A") == ["x1", "x3"]
+    assert found("q=riga") == []
+
+    client.patch(
+        "/serviceOrder/1",
+        json={"description": "Copper repair"},
+        headers={"Content-Type": "application/merge-patch+json"},
+    )
+    assert found("q=vilnius") == ["x2"]
+    assert found("q=copper") == ["x1"]
+
+    response = client.get("/serviceOrder?q=%20-%20")
+    assert response.status_code == 400
+    assert response.json()["code"] == "INVALID_FILTER"
+
+
+def test_list_filters_by_nested_attributes(
+    client: TestClient,
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    for external_id, category, party, service_ids in (
+        ("x1", "A", "cust-1", ["svc-1"]),
+        ("x2", "B", "cust-1", ["svc-2", "svc-1"]),
+        ("x3", "A", "cust-2", ["svc-2"]),
+    ):
+        payload = service_order_payload_factory(external_id=external_id, category=category)
+        payload["relatedParty"] = [{"id": party, "role": "customer", "@referredType": "Individual"}]
+        payload["orderItem"] = [
+            {"id": str(index), "action": "add", "service": {"id": service_id, "serviceType": "CFS"}}
+            for index, service_id in enumerate(service_ids, start=1)
+        ]
+        client.post("/serviceOrder", json=payload)
+
+    def found(query: str) -> list[str]:
+        response = client.get(f"/serviceOrder?{query}")
+        assert response.status_code == 200
+        return [order["externalId"] for order in response.json()]
+
+    assert found("relatedParty.id=cust-1") == ["x1", "x2"]
+    assert found("orderItem.service.id=svc-1") == ["x1", "x2"]
+    assert found("orderItem.service.id=svc-2&relatedParty.id=cust-1") == ["x2"]
+    assert found("orderItem.service.id=svc-2&category=A") == ["x3"]
+    assert found("relatedParty.id=cust-3") == []
+
+    stats = client.get("/serviceOrder/stats?relatedParty.id=cust-1").json()
+    assert stats["total"] == 2
+    assert stats["category"] == {"A": 1, "B": 1}
+
+
+def test_list_sorts_and_limits(
+    client: TestClient,
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    for external_id, category, priority in (
+        ("x1", "A", "2"),
+        ("x2", "B", "1"),
+        ("x3", "A", "1"),
+        ("x4", "A", "3"),
+        ("x5", "B", "2"),
+    ):
+        payload = service_order_payload_factory(external_id=external_id, category=category)
+        payload["priority"] = priority
+        client.post("/serviceOrder", json=payload)
+
+    def found(query: str) -> list[str]:
+        response = client.get(f"/serviceOrder?{query}")
+        assert response.status_code == 200
+        return [order["externalId"] for order in response.json()]
+
+    assert found("sort=-orderDate&limit=2") == ["x5", "x4"]
+    assert found("sort=orderDate&limit=2&category=A") == ["x1", "x3"]
+    assert found("sort=-orderDate,priority&limit=3&category=A") == ["x4", "x3", "x1"]
+    assert found("sort=priority,-orderDate") == ["x3", "x2", "x5", "x1", "x4"]
+    assert found("sort=-priority,externalId&limit=3") == ["x4", "x1", "x5"]
+    assert found("q=service&sort=-orderDate&limit=1") == ["x5"]
+    assert found("limit=2") == ["x1", "x2"]
+
+    response = client.get("/serviceOrder?sort=-description")
+    assert response.status_code == 400
+    assert response.json()["code"] == "INVALID_FILTER"
+    assert client.get("/serviceOrder?limit=0").status_code == 400
+
+
+def test_batch_get_returns_found_orders_and_missing_ids(
+    client: TestClient,
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    for external_id in ("x1", "x2", "x3"):
+        client.post("/serviceOrder", json=service_order_payload_factory(external_id=external_id))
+
+    response = client.post("/serviceOrder/batchGet", json={"id": ["3", "9", "1", "3"]})
+    assert response.status_code == 200
+    body = response.json()
+    assert [order["externalId"] for order in body["serviceOrder"]] == ["x3", "x1"]
+    assert body["missing"] == ["9"]
+
+    projected = client.post("/serviceOrder/batchGet?fields=id,state", json={"id": ["2"]})
+    assert projected.json() == {
+        "serviceOrder": [{"id": "2", "state": "acknowledged"}],
+        "missing": [],
+    }
+    assert client.post("/serviceOrder/batchGet", json={"id": []}).status_code == 400
+
+
+def test_order_item_sub_resource_reads_and_patches_one_item(
+    client: TestClient,
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    payload = service_order_payload_factory()
+    payload["orderItem"] = [
+        {"id": "1", "action": "add", "service": {"name": "Fibre", "serviceType": "CFS"}},
+        {"id": "2", "action": "add", "service": {"name": "Router", "serviceType": "RFS"}},
+    ]
+    # Item lookups walk the stored JSON; text that looks like an item must not match.
+    payload["description"] = 'Replaces "orderItem":[{"id":"2"}] of order 7'
+    created = client.post("/serviceOrder", json=payload).json()
+    order_id = created["id"]
+    headers = {"Content-Type": "application/merge-patch+json"}
+
+    item = client.get(f"/serviceOrder/{order_id}/orderItem/2")
+    assert item.status_code == 200
+    assert item.json() == {
+        "id": "2",
+        "action": "add",
+        "service": {"name": "Router", "serviceType": "RFS"},
+        "state": "acknowledged",
+    }
+
+    patched = client.patch(
+        f"/serviceOrder/{order_id}/orderItem/2",
+        json={"service": {"name": "Mesh router", "serviceType": None}},
+        headers=headers,
+    )
+    assert patched.status_code == 200
+    assert patched.json()["service"] == {"name": "Mesh router"}
+
+    order = client.get(f"/serviceOrder/{order_id}").json()
+    assert [item["service"] for item in order["orderItem"]] == [
+        {"name": "Fibre", "serviceType": "CFS"},
+        {"name": "Mesh router"},
+    ]
+    assert {**order, "orderItem": None} == {**created, "orderItem": None}
+    assert [found["id"] for found in client.get("/serviceOrder?q=mesh").json()] == [order_id]
+
+    not_patchable = client.patch(
+        f"/serviceOrder/{order_id}/orderItem/2", json={"state": "completed"}, headers=headers
+    )
+    assert not_patchable.status_code == 400
+    assert client.get(f"/serviceOrder/{order_id}/orderItem/9").status_code == 404
+    assert client.get("/serviceOrder/999/orderItem/1").status_code == 404
+
+
 def test_list_rejects_unsupported_filter(
     client: TestClient,
     service_order_payload_factory: Callable[..., dict[str, object]],
@@ -116,6 +324,37 @@ def test_get_service_order_with_fields_projection(
     assert set(projected.json().keys()) == {"id", "href"}
 
 
+def test_list_service_orders_with_fields_projection(
+    client: TestClient,
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    client.post("/serviceOrder", json=service_order_payload_factory())
+
+    projected = client.get("/serviceOrder?fields=id,state,completionDate")
+    assert projected.status_code == 200
+    assert projected.headers["content-type"] == "application/json"
+    assert projected.json() == [{"id": "1", "state": "acknowledged", "completionDate": None}]
+
+
+def test_fields_projection_keeps_requested_order_and_routes_document_schemas(
+    client: TestClient,
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    order_id = client.post("/serviceOrder", json=service_order_payload_factory()).json()["id"]
+
+    # Header-only and payload projections both follow the order of `fields`.
+    for fields in ("state,id,priority", "orderItem,state,id,description"):
+        expected = fields.split(",")
+        assert list(client.get(f"/serviceOrder/{order_id}?fields={fields}").json()) == expected
+        assert list(client.get(f"/serviceOrder?fields={fields}").json()[0]) == expected
+
+    paths = client.get("/openapi.json").json()["paths"]
+    schema = paths["/serviceOrder/{id}"]["get"]["responses"]["200"]["content"]
+    assert schema["application/json"]["schema"]["$ref"].endswith("/ServiceOrder")
+    listed = paths["/serviceOrder"]["get"]["responses"]["200"]["content"]
+    assert listed["application/json"]["schema"]["items"]["$ref"].endswith("/ServiceOrder")
+
+
 def test_get_service_order_rejects_invalid_field_selection(
     client: TestClient,
     service_order_payload_factory: Callable[..., dict[str, object]],
@@ -200,3 +439,96 @@ def test_delete_non_existing_service_order_returns_404(client: TestClient) -> No
     assert response.status_code == 404
     assert response.json()["code"] == "NOT_FOUND"
 
+
+def test_change_feed_returns_latest_change_per_order_with_tombstones(
+    client: TestClient,
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    for external_id in ("a", "b", "c"):
+        client.post("/serviceOrder", json=service_order_payload_factory(external_id=external_id))
+    client.patch(
+        "/serviceOrder/1",
+        content=json.dumps({"description": "patched"}),
+        headers={"Content-Type": "application/merge-patch+json"},
+    )
+    client.delete("/serviceOrder/2")
+
+    first_page = client.get("/serviceOrder/changes", params={"limit": 2}).json()
+    assert [(c["id"], c["type"], c["sequence"]) for c in first_page["changes"]] == [
+        ("3", "create", 3),
+        ("1", "update", 4),
+    ]
+    assert first_page["changes"][1]["serviceOrder"]["description"] == "patched"
+    assert first_page == {**first_page, "nextSince": 4, "hasMore": True}
+
+    second_page = client.get(
+        "/serviceOrder/changes", params={"since": first_page["nextSince"], "fields": "id"}
+    ).json()
+    assert second_page == {
+        "changes": [{"sequence": 5, "type": "delete", "id": "2"}],
+        "nextSince": 5,
+        "hasMore": False,
+    }
+
+    caught_up = client.get("/serviceOrder/changes", params={"since": 5}).json()
+    assert caught_up == {"changes": [], "nextSince": 5, "hasMore": False}
+
+
+def test_change_feed_asks_clients_behind_dropped_tombstones_to_resync(
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    settings = Settings(environment="test", reload=False, change_retention_seconds=0)
+    with TestClient(create_app(settings)) as client:
+        for _ in range(2):
+            client.post("/serviceOrder", json=service_order_payload_factory())
+        client.delete("/serviceOrder/2")
+
+        expired = client.get("/serviceOrder/changes", params={"since": 1})
+        resync = client.get("/serviceOrder/changes").json()
+        current = client.get("/serviceOrder/changes", params={"since": 3}).json()
+
+    assert expired.status_code == 410
+    assert expired.json()["code"] == "RESYNC_REQUIRED"
+    assert [(c["id"], c["type"]) for c in resync["changes"]] == [("1", "create")]
+    assert resync["nextSince"] == 3
+    assert current == {"changes": [], "nextSince": 3, "hasMore": False}
+
+
+def test_stats_counts_orders_from_counters_and_falls_back_for_other_filters(
+    client: TestClient,
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    for external_id, category in (("a", "fiber"), ("b", "fiber"), ("c", "mobile")):
+        client.post(
+            "/serviceOrder",
+            json=service_order_payload_factory(external_id=external_id, category=category),
+        )
+    client.patch(
+        "/serviceOrder/1",
+        content=json.dumps({"category": "mobile"}),
+        headers={"Content-Type": "application/merge-patch+json"},
+    )
+    client.delete("/serviceOrder/3")
+
+    stats = client.get("/serviceOrder/stats").json()
+    assert stats == {
+        "total": 2,
+        "state": {"acknowledged": 2},
+        "category": {"fiber": 1, "mobile": 1},
+        "priority": {"1": 2},
+    }
+
+    by_day = client.get("/serviceOrder/stats", params={"bucket": "day"}).json()
+    assert len(by_day["buckets"]) == 1
+    assert by_day["buckets"][0]["start"].endswith("T00:00:00Z")
+    assert by_day["buckets"][0]["total"] == 2
+
+    filtered = client.get("/serviceOrder/stats", params={"category": "mobile"}).json()
+    assert filtered["total"] == 1
+    assert filtered["category"] == {"mobile": 1}
+
+    by_external_id = client.get("/serviceOrder/stats", params={"externalId": "b"}).json()
+    assert by_external_id["category"] == {"fiber": 1}
+
+    assert client.get("/serviceOrder/stats", params={"bucket": "week"}).status_code == 400
+    assert client.get("/serviceOrder/stats", params={"color": "red"}).status_code == 400
@@ -0,0 +1,172 @@
+import json
+from collections.abc import Callable, Iterator
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pytest import MonkeyPatch
+
+from app.container import AppContainer, get_app_container
+from app.main import create_app
+from app.services.sla_service import DeadlineTimers
+from app.settings import Settings
+
+_DEADLINE = datetime(2030, 1, 1, tzinfo=UTC)
+
+
+def test_deadline_timers_fire_once_and_follow_reschedules() -> None:
+    timers = DeadlineTimers(resolution_seconds=1.0)
+    timers.schedule("a", _DEADLINE)
+    timers.schedule("b", _DEADLINE + timedelta(seconds=0.5))
+    timers.schedule("c", _DEADLINE)
+    timers.schedule("c", _DEADLINE + timedelta(hours=1))
+    timers.cancel("b")
+
+    assert timers.pop_due(_DEADLINE - timedelta(seconds=1)) == []
+    assert timers.pop_due(_DEADLINE) == ["a"]
+    assert timers.pop_due(_DEADLINE + timedelta(minutes=59)) == []
+    assert len(timers) == 1
+    assert timers.pop_due(_DEADLINE + timedelta(days=1)) == ["c"]
+    assert len(timers) == 0
+
+
+def test_sla_alerts_are_off_by_default(container: AppContainer) -> None:
+    assert container.sla_monitor is None
+
+
+@pytest.fixture
+def sla_app() -> FastAPI:
+    # A long resolution keeps the background task from firing before the test does.
+    settings = Settings(
+        environment="test", reload=False, sla_alerts=True, sla_resolution_seconds=3600
+    )
+    return create_app(settings)
+
+
+@pytest.fixture
+def sla_client(sla_app: FastAPI) -> Iterator[TestClient]:
+    with TestClient(sla_app) as test_client:
+        yield test_client
+
+
+def test_open_order_past_its_deadline_emits_one_jeopardy_alert(
+    sla_app: FastAPI,
+    sla_client: TestClient,
+    monkeypatch: MonkeyPatch,
+    service_order_payload_factory: Callable[..., dict[str, Any]],
+) -> None:
+    client = sla_client
+    container = get_app_container(sla_app)
+    captured_payloads: list[dict[str, Any]] = []
+
+    def fake_publish(
+        callback: str,
+        payload: dict[str, Any],
+        event_type: str,
+        listener_id: str,
+    ) -> None:
+        captured_payloads.append(payload)
+
+    monkeypatch.setattr(container.notification_service, "_publish_to_listener", fake_publish)
+    client.post(
+        "/hub",
+        json={
+            "callback": "http://listener.example.com/events",
+            "query": "eventType=ServiceOrderJeopardyAlertNotification",
+        },
+    )
+    monitor = container.sla_monitor
+    assert monitor is not None
+
+    payload = service_order_payload_factory()
+    payload["requestedCompletionDate"] = "2030-01-01T00:00:00Z"
+    order_ids = [client.post("/serviceOrder", json=payload).json()["id"] for _ in range(3)]
+    client.post("/serviceOrder", json=service_order_payload_factory())
+    # Create copies the requested date into expectedCompletionDate: one timer per order.
+    assert len(monitor) == 3
+
+    # Without an expected date the requested date is the deadline.
+    client.patch(
+        f"/serviceOrder/{order_ids[1]}",
+        content=json.dumps(
+            {"expectedCompletionDate": None, "requestedCompletionDate": "2030-06-01T00:00:00Z"}
+        ),
+        headers={"Content-Type": "application/merge-patch+json"},
+    )
+    client.delete(f"/serviceOrder/{order_ids[2]}")
+
+    assert monitor.fire_due(_DEADLINE + timedelta(days=1)) == 1
+    alert = captured_payloads[0]
+    assert alert["eventType"] == "ServiceOrderJeopardyAlertNotification"
+    assert alert["event"]["deadline"] == "expectedCompletionDate"
+    assert alert["event"]["serviceOrder"] == client.get(f"/serviceOrder/{order_ids[0]}").json()
+
+    assert monitor.fire_due(_DEADLINE + timedelta(days=1)) == 0
+    assert monitor.fire_due(_DEADLINE + timedelta(days=365)) == 1
+    assert captured_payloads[-1]["event"]["deadline"] == "requestedCompletionDate"
+    assert captured_payloads[-1]["event"]["serviceOrder"]["id"] == order_ids[1]
+    assert len(monitor) == 0
+
+
+def test_breached_order_is_not_alerted_again_after_unrelated_changes(
+    sla_app: FastAPI,
+    sla_client: TestClient,
+    service_order_payload_factory: Callable[..., dict[str, Any]],
+) -> None:
+    monitor = get_app_container(sla_app).sla_monitor
+    assert monitor is not None
+    payload = service_order_payload_factory()
+    payload["requestedCompletionDate"] = "2020-01-01T00:00:00Z"
+    order_id = sla_client.post("/serviceOrder", json=payload).json()["id"]
+    headers = {"Content-Type": "application/merge-patch+json"}
+
+    assert monitor.fire_due() == 1
+    sla_client.patch(
+        f"/serviceOrder/{order_id}",
+        content=json.dumps({"description": "Still waiting on the fiber crew"}),
+        headers=headers,
+    )
+    assert len(monitor) == 0
+    assert monitor.fire_due() == 0
+
+    # A new deadline value is tracked and alerted on its own.
+    sla_client.patch(
+        f"/serviceOrder/{order_id}",
+        content=json.dumps({"expectedCompletionDate": "2021-01-01T00:00:00Z"}),
+        headers=headers,
+    )
+    assert monitor.fire_due() == 1
+    assert monitor.fire_due() == 0
+
+
+def test_breached_orders_are_not_alerted_again_after_a_restart(
+    tmp_path: Path,
+    service_order_payload_factory: Callable[..., dict[str, Any]],
+) -> None:
+    settings = Settings(
+        environment="test",
+        reload=False,
+        storage_backend="sqlite",
+        sqlite_path=str(tmp_path / "state.sqlite3"),
+        sla_alerts=True,
+        sla_resolution_seconds=3600,
+    )
+    payload = service_order_payload_factory()
+    payload["requestedCompletionDate"] = "2020-01-01T00:00:00Z"
+
+    app = create_app(settings)
+    with TestClient(app) as client:
+        client.post("/serviceOrder", json=payload)
+        monitor = get_app_container(app).sla_monitor
+        assert monitor is not None
+        assert monitor.fire_due() == 1
+
+    restarted = create_app(settings)
+    with TestClient(restarted):
+        monitor = get_app_container(restarted).sla_monitor
+        assert monitor is not None
+        assert len(monitor) == 0
+        assert monitor.fire_due() == 0
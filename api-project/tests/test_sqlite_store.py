@@ -0,0 +1,239 @@
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from app.models.common import RelatedParty
+from app.models.enums import ServiceOrderStateType
+from app.models.service_order import ServiceOrder
+from app.repositories.sqlite_idempotency_cache import SQLiteIdempotencyCache
+from app.repositories.sqlite_store import SQLiteStore
+from app.utils.errors import ChangeHistoryExpiredError, ConflictError
+
+
+def _service_order(
+    service_order_id: str, description: str = "created", state: str = "acknowledged"
+) -> ServiceOrder:
+    return ServiceOrder.model_validate(
+        {
+            "id": service_order_id,
+            "href": f"/serviceOrder/{service_order_id}",
+            "state": state,
+            "description": description,
+            "orderDate": datetime(2030, 1, 1, tzinfo=UTC),
+            "orderItem": [{"id": "1", "action": "add", "state": "acknowledged"}],
+        }
+    )
+
+
+def test_stores_on_the_same_file_share_orders_and_listeners(tmp_path: Path) -> None:
+    database = tmp_path / "state.sqlite3"
+    first_worker = SQLiteStore(database)
+    second_worker = SQLiteStore(database)
+
+    order_id = first_worker.next_service_order_id()
+    assert second_worker.next_service_order_id() != order_id
+
+    first_worker.create_service_order(_service_order(order_id))
+    listener = second_worker.create_hub_listener(callback="http://listener/events", query=None)
+    assert list(second_worker.get_service_order_records([order_id, "missing"])) == [order_id]
+
+    record = second_worker.get_service_order_record(order_id)
+    assert record is not None
+    assert record.state == ServiceOrderStateType.ACKNOWLEDGED
+    assert record.order_date == datetime(2030, 1, 1, tzinfo=UTC)
+    assert record.to_order().order_item is not None
+    assert first_worker.list_hub_listeners() == [listener]
+
+    second_worker.update_service_order(_service_order(order_id, description="patched"))
+    updated = first_worker.get_service_order(order_id)
+    assert updated is not None
+    assert updated.description == "patched"
+
+    assert first_worker.delete_service_order(order_id)
+    assert second_worker.get_service_order_record(order_id) is None
+    assert not second_worker.delete_service_order(order_id)
+
+    first_worker.close()
+    second_worker.close()
+
+
+def test_create_existing_order_raises_conflict(tmp_path: Path) -> None:
+    store = SQLiteStore(tmp_path / "state.sqlite3")
+    store.create_service_order(_service_order("1"))
+
+    with pytest.raises(ConflictError):
+        store.create_service_order(_service_order("1"))
+    with pytest.raises(KeyError):
+        store.update_service_order(_service_order("2"))
+
+    store.close()
+
+
+def test_change_feed_is_shared_between_stores(tmp_path: Path) -> None:
+    database = tmp_path / "state.sqlite3"
+    first_worker = SQLiteStore(database)
+    second_worker = SQLiteStore(database)
+
+    first_worker.create_service_order(_service_order("1"))
+    second_worker.create_service_order(_service_order("2"))
+    first_worker.update_service_order(_service_order("2", description="patched"))
+    second_worker.delete_service_order("1")
+
+    changes, head = first_worker.list_service_order_changes(since=0, limit=10)
+
+    assert head == 4
+    assert [(change.id, change.kind, change.sequence) for change in changes] == [
+        ("2", "update", 3),
+        ("1", "delete", 4),
+    ]
+    assert changes[0].record is not None
+    assert changes[0].record.to_order().description == "patched"
+    assert changes[1].record is None
+    assert second_worker.list_service_order_changes(since=3, limit=10)[0] == changes[1:]
+
+    first_worker.close()
+    second_worker.close()
+
+
+def test_change_feed_drops_expired_tombstones(tmp_path: Path) -> None:
+    store = SQLiteStore(tmp_path / "state.sqlite3", change_retention_seconds=0)
+    store.create_service_order(_service_order("1"))
+    store.create_service_order(_service_order("2"))
+    store.delete_service_order("2")
+
+    changes, head = store.list_service_order_changes(since=0, limit=10)
+
+    assert [(change.id, change.kind) for change in changes] == [("1", "create")]
+    assert head == 3
+    with pytest.raises(ChangeHistoryExpiredError):
+        store.list_service_order_changes(since=2, limit=10)
+    assert store.list_service_order_changes(since=3, limit=10) == ([], 3)
+
+    store.close()
+
+
+def test_stats_counters_follow_writes_and_persist(tmp_path: Path) -> None:
+    database = tmp_path / "state.sqlite3"
+    store = SQLiteStore(database)
+    store.create_service_order(_service_order("1"))
+    store.create_service_order(_service_order("2"))
+    store.update_service_order(_service_order("2", state="inProgress"))
+
+    order_hour = datetime(2030, 1, 1, tzinfo=UTC)
+    expected = {
+        ("acknowledged", None, None, order_hour): 1,
+        ("inProgress", None, None, order_hour): 1,
+    }
+    assert store.service_order_stats() == expected
+
+    reopened = SQLiteStore(database)
+    assert reopened.service_order_stats() == expected
+    reopened.close()
+
+    store.delete_service_order("1")
+    assert store.service_order_stats() == {("inProgress", None, None, order_hour): 1}
+    store.close()
+
+
+def test_text_search_follows_writes_and_persists(tmp_path: Path) -> None:
+    database = tmp_path / "state.sqlite3"
+    store = SQLiteStore(database)
+    store.create_service_order(_service_order("1", description="Fibre upgrade in Vilnius"))
+    store.create_service_order(_service_order("2", description="Upgrade in Kaunas"))
+
+    def found(*terms: str) -> list[str]:
+        return [record.id for record in store.search_service_order_records(frozenset(terms))]
+
+    assert found("upgrade") == ["1", "2"]
+    assert found("upgrade", "vilnius") == ["1"]
+
+    store.update_service_order(_service_order("1", description="Copper repair"))
+    assert found("upgrade") == ["2"]
+    assert found("copper") == ["1"]
+
+    reopened = SQLiteStore(database)
+    matched = reopened.search_service_order_records(frozenset({"kaunas"}))
+    assert [record.id for record in matched] == ["2"]
+    reopened.close()
+
+    store.delete_service_order("2")
+    assert found("upgrade") == []
+    store.close()
+
+
+def test_attribute_index_follows_writes_and_persists(tmp_path: Path) -> None:
+    database = tmp_path / "state.sqlite3"
+    store = SQLiteStore(database)
+    for order_id, party in (("1", "cust-1"), ("2", "cust-1"), ("3", "cust-2")):
+        order = _service_order(order_id)
+        order.related_party = [RelatedParty.model_validate({"id": party})]
+        store.create_service_order(order)
+
+    def found(store: SQLiteStore, *attributes: tuple[str, str]) -> list[str]:
+        records = store.search_service_order_records(attributes=frozenset(attributes))
+        return [record.id for record in records]
+
+    customer = ("relatedParty.id", "cust-1")
+    assert found(store, customer) == ["1", "2"]
+    assert found(store, customer, ("orderItem.service.id", "svc")) == []
+
+    store.update_service_order(_service_order("1"))
+    store.delete_service_order("3")
+    assert found(store, customer) == ["2"]
+    assert found(store, ("relatedParty.id", "cust-2")) == []
+
+    reopened = SQLiteStore(database)
+    assert found(reopened, customer) == ["2"]
+    reopened.close()
+    store.close()
+
+
+def test_orders_are_read_in_order_date_order(tmp_path: Path) -> None:
+    store = SQLiteStore(tmp_path / "state.sqlite3")
+    for order_id, hour in (("1", 3), ("2", 1), ("3", 2)):
+        order = _service_order(order_id)
+        order.order_date = datetime(2030, 1, 1, hour, tzinfo=UTC)
+        store.create_service_order(order)
+
+    ascending = store.iter_service_order_records_by_order_date()
+    descending = store.iter_service_order_records_by_order_date(descending=True)
+    assert [record.id for record in ascending] == ["2", "3", "1"]
+    assert [record.id for record in descending] == ["1", "3", "2"]
+    store.close()
+
+
+def test_idempotency_keys_are_shared_through_the_database(tmp_path: Path) -> None:
+    database = tmp_path / "state.sqlite3"
+    now = [1000.0]
+    first = SQLiteIdempotencyCache(database, max_entries=2, clock=lambda: now[0])
+    second = SQLiteIdempotencyCache(database, max_entries=2, ttl_seconds=60, clock=lambda: now[0])
+    calls: list[str] = []
+
+    def create(response: bytes) -> Callable[[], bytes]:
+        def operation() -> bytes:
+            calls.append(response.decode())
+            return response
+
+        return operation
+
+    assert first.run_once("a", "fp-a", create(b"order-1")) == b"order-1"
+    assert second.run_once("a", "fp-a", create(b"order-2")) == b"order-1"
+    with pytest.raises(ConflictError):
+        second.run_once("a", "other", create(b"order-3"))
+
+    def fail() -> bytes:
+        raise RuntimeError("store unavailable")
+
+    with pytest.raises(RuntimeError):
+        first.run_once("b", "fp-b", fail)
+    assert second.run_once("b", "fp-b", create(b"order-4")) == b"order-4"
+
+    # Both keys expired for `second`; its claim of "a" evicts "b" too.
+    now[0] += 61
+    assert second.run_once("a", "fp-a", create(b"order-5")) == b"order-5"
+    assert calls == ["order-1", "order-4", "order-5"]
+    assert len(first) == 1
+    first.close()
+    second.close()
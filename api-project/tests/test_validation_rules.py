@@ -0,0 +1,84 @@
+import re
+from typing import Any
+
+import pytest
+from pydantic import ValidationError
+
+from app.models.service_order import (
+    ServiceOrderCreate,
+    ServiceOrderItemCreate,
+    ServiceOrderItemPatch,
+    ServiceOrderPatch,
+)
+
+
+def _order_item(**overrides: Any) -> dict[str, Any]:
+    order_item: dict[str, Any] = {"id": "1", "action": "add", "service": {"serviceType": "CFS"}}
+    order_item.update(overrides)
+    return order_item
+
+
+@pytest.mark.parametrize(
+    ("payload", "message"),
+    [
+        (
+            {"orderItem": [_order_item()], "relatedParty": [{"id": "1"}]},
+            "relatedParty[0].role is required.",
+        ),
+        (
+            {"orderItem": [_order_item()], "note": [{"author": "a", "text": "t"}]},
+            "note[0] requires date, author, and text.",
+        ),
+        (
+            {"orderItem": [_order_item(action="modify")]},
+            "For orderItem.action different from 'add', "
+            "service.id and/or service.href is required.",
+        ),
+        (
+            {"orderItem": [_order_item(orderItemRelationship=[{"relationshipType": "x"}])]},
+            "orderItem.orderItemRelationship[0].id is required.",
+        ),
+        (
+            {
+                "orderItem": [
+                    _order_item(
+                        service={"place": [{"id": "p", "role": "r"}, {"role": "r"}]},
+                    )
+                ]
+            },
+            "orderItem.service.place[1] requires id and/or href.",
+        ),
+        (
+            {
+                "orderItem": [
+                    _order_item(service={"serviceRelationship": [{"relationshipType": "x"}]})
+                ]
+            },
+            "orderItem.service.serviceRelationship[0].service requires id and/or href.",
+        ),
+    ],
+)
+def test_create_rules_report_original_messages(payload: dict[str, Any], message: str) -> None:
+    with pytest.raises(ValidationError, match=re.escape(message)):
+        ServiceOrderCreate.model_validate(payload)
+
+
+def test_patch_rules_validate_order_items_and_collections() -> None:
+    with pytest.raises(ValidationError, match=r"orderItem\.appointment requires id and/or href\."):
+        ServiceOrderPatch.model_validate({"orderItem": [{"appointment": {"description": "x"}}]})
+
+    with pytest.raises(ValidationError, match=r"orderRelationship\[0\] requires id and/or href\."):
+        ServiceOrderPatch.model_validate({"orderRelationship": [{"relationshipType": "x"}]})
+
+
+def test_order_item_models_enforce_their_rules_on_their_own() -> None:
+    with pytest.raises(ValidationError, match=r"orderItem\.relatedParty\[0\]\.role is required\."):
+        ServiceOrderItemCreate.model_validate(_order_item(relatedParty=[{"id": "1"}]))
+
+    with pytest.raises(ValidationError, match=r"orderItem\.appointment requires id and/or href\."):
+        ServiceOrderItemPatch.model_validate({"appointment": {"description": "x"}})
+
+
+def test_valid_payload_with_many_items_passes() -> None:
+    payload = {"orderItem": [_order_item(id=str(index)) for index in range(2000)]}
+    assert len(ServiceOrderCreate.model_validate(payload).order_item) == 2000
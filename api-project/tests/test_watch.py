@@ -0,0 +1,65 @@
+import asyncio
+import json
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.watch_service import OrderWatchers
+from app.utils.errors import CapacityExceededError
+
+
+def test_watch_returns_when_the_order_changes(
+    client: TestClient,
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    client.post("/serviceOrder", json=service_order_payload_factory())
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        started = time.monotonic()
+        watch = executor.submit(
+            client.get, "/serviceOrder/1", params={"waitFor": "change", "timeout": 10}
+        )
+        time.sleep(0.2)
+        assert not watch.done()
+        client.patch(
+            "/serviceOrder/1",
+            content=json.dumps({"description": "patched"}),
+            headers={"Content-Type": "application/merge-patch+json"},
+        )
+        response = watch.result(timeout=5)
+
+    assert time.monotonic() - started < 5
+    assert response.status_code == 200
+    assert response.json()["description"] == "patched"
+
+
+def test_watch_returns_current_order_on_timeout_and_404_for_unknown_orders(
+    client: TestClient,
+    service_order_payload_factory: Callable[..., dict[str, object]],
+) -> None:
+    client.post("/serviceOrder", json=service_order_payload_factory())
+
+    unchanged = client.get("/serviceOrder/1", params={"waitFor": "state", "timeout": 0.1})
+    missing = client.get("/serviceOrder/404", params={"waitFor": "state", "timeout": 0.1})
+
+    assert unchanged.status_code == 200
+    assert unchanged.json()["state"] == "acknowledged"
+    assert missing.status_code == 404
+
+
+def test_watchers_enforce_capacity_and_release_slots() -> None:
+    watchers = OrderWatchers(max_waiters=1)
+
+    async def scenario() -> None:
+        with watchers.watch("1") as changed:
+            with pytest.raises(CapacityExceededError):
+                with watchers.watch("2"):
+                    pass
+            watchers.notify("1")
+            await asyncio.wait_for(changed, timeout=1)
+        assert len(watchers) == 0
+
+    asyncio.run(scenario())